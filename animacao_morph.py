@@ -0,0 +1,195 @@
+# animacao_morph.py
+# [mvfm] - Animação do morph gravada em arquivo (quadros prontos) e reprodução direto do mapeamento
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# O morph de A para B é sempre o mesmo, então ele pode ser calculado uma vez: gravar_animacao avalia K
+# instantes (avaliar_morph, nucleo_morph.py) e grava as posições e normais por vértice de cada um,
+# exatamente no formato dos buffers do morpher, em float16 (padrão) ou float32. Na reprodução
+# (morphing3d.py --animacao=ARQ) não há modelos, associação nem avaliação: o quadro sai do arquivo
+# mapeado em memória direto para o buffer object (float16 vai como GL_HALF_FLOAT, sem conversão).
+# Entre dois quadros gravados, amostrar interpola os dois vizinhos (a menos que interpolarQuadros seja
+# False, e aí vale o quadro mais próximo).
+#
+# Formato: MAGICO + cabeçalho JSON completados até CABECALHO bytes, depois os blocos. Cada bloco tem
+# até 'quadros_por_bloco' quadros seguidos e começa num múltiplo de mmap.ALLOCATIONGRANULARITY; cada
+# quadro é um array (2, 3F, 3) (posições, normais). Só os blocos em uso ficam mapeados (no máximo
+# BLOCOS_ABERTOS), então a animação nunca é carregada inteira na memória.
+#
+# Uso (gravação): python animacao_morph.py [opções] modeloA.obj modeloB.obj saida.anim
+#    --quadros=K   - quadros gravados de t = 0 a t = 1 (padrão: 120)
+#    --float32     - grava em float32 (padrão: float16, metade do tamanho)
+#    --vizinhos=K  - como no morpher
+#    --no-cache / --rebuild-cache
+#
+# Opções do morphing3d.py (tratadas por opcoes_animacao):
+#    --animacao=ARQ       - reproduz ARQ em vez de calcular o morph (os modelos não são pedidos)
+#    --sem-interpolacao   - usa o quadro gravado mais próximo de t, sem interpolar
+
+import collections
+import json
+import mmap
+import os
+import sys
+import time
+
+import numpy as np
+
+MAGICO = b'MVFMANIM'
+VERSAO = 1
+CABECALHO = 4096            # bytes (MAGICO + JSON + espaços)
+QUADROS = 120
+BYTES_POR_BLOCO = 16 << 20  # tamanho aproximado de cada bloco
+BLOCOS_ABERTOS = 2          # o do quadro atual e o do vizinho, na fronteira entre blocos
+TOLERANCIA = 1e-3           # fração de quadro considerada "em cima" de um quadro gravado
+
+arquivoAnimacao = None
+interpolarQuadros = True
+
+
+def opcoes_animacao(argv):
+    """Remove as opções --animacao= e --sem-interpolacao de argv, aplicando-as, e retorna os argumentos restantes."""
+    global arquivoAnimacao, interpolarQuadros
+    restantes = []
+    for arg in argv:
+        if arg.startswith('--animacao='):
+            arquivoAnimacao = arg.split('=', 1)[1]
+        elif arg == '--sem-interpolacao':
+            interpolarQuadros = False
+        else:
+            restantes.append(arg)
+    return restantes
+
+
+def _alinhar(n):
+    g = mmap.ALLOCATIONGRANULARITY
+    return -(-n // g) * g
+
+
+def gravar_animacao(caminho, morph, quadros=QUADROS, dtype=np.float16):
+    """Avalia o morph em `quadros` instantes de 0 a 1 e grava o arquivo, um quadro por vez (sem guardar a
+    animação inteira na memória). Retorna o tamanho do arquivo em bytes."""
+    from nucleo_morph import criar_buffers, avaliar_morph
+
+    quadros = max(2, int(quadros))
+    dtype = np.dtype(dtype)
+    F = len(morph['inicio'])
+    bytes_quadro = 2 * 3 * F * 3 * dtype.itemsize
+    por_bloco = max(1, min(quadros, BYTES_POR_BLOCO // max(bytes_quadro, 1)))
+    cabecalho = {'versao': VERSAO, 'faces': F, 'quadros': quadros, 'dtype': dtype.str,
+                 'quadros_por_bloco': por_bloco, 'bytes_quadro': bytes_quadro,
+                 'bytes_bloco': _alinhar(por_bloco * bytes_quadro), 'inicio': _alinhar(CABECALHO)}
+    texto = json.dumps(cabecalho).encode()
+    if len(MAGICO) + len(texto) > CABECALHO:
+        raise ValueError("cabeçalho da animação grande demais")
+
+    buffers = criar_buffers(morph)
+    saida = np.empty((2, 3 * F, 3), dtype=dtype)
+    tmp = caminho + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write((MAGICO + texto).ljust(cabecalho['inicio'], b' '))
+        for q in range(quadros):
+            avaliar_morph(morph, q / (quadros - 1), buffers)
+            saida[0] = buffers['vertices'].reshape(-1, 3)
+            saida[1] = buffers['normais_vertices'].reshape(-1, 3)
+            f.write(saida.tobytes())
+            # completa o bloco até o alinhamento do próximo
+            if (q + 1) % por_bloco == 0 or q == quadros - 1:
+                usados = ((q % por_bloco) + 1) * bytes_quadro
+                f.write(b'\0' * (cabecalho['bytes_bloco'] - usados))
+    os.replace(tmp, caminho)
+    return os.path.getsize(caminho)
+
+
+def abrir_animacao(caminho):
+    """Lê o cabeçalho e prepara a reprodução; os blocos são mapeados sob demanda (quadro)."""
+    with open(caminho, 'rb') as f:
+        inicio = f.read(CABECALHO)
+    if not inicio.startswith(MAGICO):
+        raise ValueError(f"{caminho} não é uma animação de morph")
+    anim = json.loads(inicio[len(MAGICO):].decode().strip())
+    if anim.get('versao') != VERSAO:
+        raise ValueError(f"versão de animação não suportada: {anim.get('versao')}")
+    F = anim['faces']
+    anim.update(caminho=caminho, dtype=np.dtype(anim['dtype']), blocos=collections.OrderedDict(),
+                saida=np.empty((2, 3 * F, 3), dtype=anim['dtype']),
+                rascunho=np.empty((2, 2, 3 * F, 3), dtype=np.float32))
+    return anim
+
+
+def fechar_animacao(anim):
+    """Solta os mapeamentos abertos (aceita None)."""
+    if anim is None:
+        return
+    anim['blocos'].clear()
+
+
+def quadro(anim, i):
+    """Quadro i (array (2, 3F, 3): posições e normais), uma vista do bloco mapeado, sem cópia."""
+    b, dentro = divmod(int(i), anim['quadros_por_bloco'])
+    blocos = anim['blocos']
+    if b in blocos:
+        blocos.move_to_end(b)
+    else:
+        n = min(anim['quadros_por_bloco'], anim['quadros'] - b * anim['quadros_por_bloco'])
+        blocos[b] = np.memmap(anim['caminho'], dtype=anim['dtype'], mode='r',
+                              offset=anim['inicio'] + b * anim['bytes_bloco'], shape=(n, 2, 3 * anim['faces'], 3))
+        while len(blocos) > BLOCOS_ABERTOS:
+            blocos.popitem(last=False)
+    return blocos[b][dentro]
+
+
+def posicao(anim, t, interpolar=None):
+    """(i, fração) do instante t entre os quadros gravados; fração 0 quando t cai num quadro (ou sem
+    interpolação, no quadro mais próximo)."""
+    interpolar = interpolarQuadros if interpolar is None else interpolar
+    f = min(max(t, 0.0), 1.0) * (anim['quadros'] - 1)
+    i = round(f)
+    if not interpolar or abs(f - i) < TOLERANCIA:
+        return i, 0.0
+    i = min(int(f), anim['quadros'] - 2)
+    return i, f - i
+
+
+def amostrar(anim, t, interpolar=None):
+    """Posições e normais (2, 3F, 3) no dtype do arquivo no instante t: o próprio quadro gravado (sem
+    cópia) ou a interpolação dos dois vizinhos, escrita em anim['saida']."""
+    i, a = posicao(anim, t, interpolar)
+    if a == 0.0:
+        return quadro(anim, i)
+    r0, r1 = anim['rascunho']
+    np.multiply(quadro(anim, i), 1.0 - a, out=r0)
+    np.multiply(quadro(anim, i + 1), a, out=r1)
+    np.add(r0, r1, out=r0)
+    np.copyto(anim['saida'], r0, casting='unsafe')
+    return anim['saida']
+
+
+def main():
+    from cache_malha import opcoes_cache
+    from nucleo_morph import carregar_par
+
+    args = opcoes_cache(sys.argv[1:])
+    valor = lambda nome, padrao: next((a.split('=', 1)[1] for a in args if a.startswith(f'--{nome}=')), padrao)
+    quadros = int(valor('quadros', QUADROS))
+    vizinhos = int(valor('vizinhos', 1))
+    dtype = np.float32 if '--float32' in args else np.float16
+    arquivos = [a for a in args if not a.startswith('--')]
+    if len(arquivos) != 3:
+        print("Uso: python animacao_morph.py [--quadros=K] [--float32] [--vizinhos=K] [--no-cache] "
+              "[--rebuild-cache] modeloA.obj modeloB.obj saida.anim")
+        sys.exit(1)
+
+    try:
+        _, _, _, morph = carregar_par(arquivos[0], arquivos[1], vizinhos)
+    except ValueError as e:
+        print(f"Erro: {e}.")
+        sys.exit(1)
+    inicio = time.perf_counter()
+    tamanho = gravar_animacao(arquivos[2], morph, quadros, dtype)
+    print(f"{arquivos[2]}: {quadros} quadros, {len(morph['inicio'])} faces, {np.dtype(dtype).name}, "
+          f"{tamanho / (1024 * 1024):.1f} MiB em {time.perf_counter() - inicio:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+# associacao_paralela.py
+# [mvfm] - Associação das faces A -> B em vários processos, com os arrays em memória compartilhada
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Cada face de A é consultada na árvore k-d dos centróides de B independentemente das outras, então as
+# faces de A são divididas em pedaços e distribuídas entre processos. A árvore (indice_espacial.py), os
+# centróides de A, as normais das faces (com k > 1) e o array de saída ficam em blocos de
+# multiprocessing.shared_memory: cada processo abre os blocos uma vez, ao iniciar, e cada tarefa é só o
+# intervalo [inicio, fim) de faces; nada é copiado (pickle) por tarefa e o resultado é escrito direto
+# na saída compartilhada.
+#
+# Os processos são criados com forkserver (ou spawn), nunca com fork: carregar_par associa numa thread
+# do grafo de tarefas, e fork de um processo com várias threads pode travar. Abaixo de MINIMO_PARALELO
+# faces o custo de criar os processos não compensa e a associação roda no próprio processo.
+#
+# Opções de linha de comando (tratadas por opcoes_associacao):
+#    --processos=N  - processos na associação (padrão: 0 = um por núcleo; 1 = no próprio processo)
+
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from indice_espacial import vizinhos_mais_proximos
+
+MINIMO_PARALELO = 100_000  # faces de A
+PEDACOS_POR_PROCESSO = 4   # pedaços menores equilibram processos com regiões mais caras da árvore
+
+processosAssociacao = 0
+
+# estado de cada processo do pool (_iniciar_trabalhador)
+_trabalho = None
+
+
+def opcoes_associacao(argv):
+    """Remove a opção --processos= de argv, aplicando-a, e retorna os argumentos restantes."""
+    global processosAssociacao
+    restantes = []
+    for arg in argv:
+        if arg.startswith('--processos='):
+            processosAssociacao = max(0, int(arg.split('=', 1)[1]))
+        else:
+            restantes.append(arg)
+    return restantes
+
+
+def numero_processos(faces, processos=None):
+    """Quantos processos usar para associar `faces` faces de A (1 = no próprio processo)."""
+    processos = processosAssociacao if processos is None else processos
+    if processos == 0:
+        processos = 1 if faces < MINIMO_PARALELO else (os.cpu_count() or 1)
+    return max(1, min(processos, faces))
+
+
+def escolher_por_normal(idx, dist, normaisA, normaisB, peso_normal=0.5):
+    """Entre os k candidatos (idx, dist (Q,k)) de cada face de A, o de menor
+    distância * (1 + peso_normal * (1 - cos)), com cos entre as normais das duas faces."""
+    validos = idx >= 0
+    cos = np.einsum('ij,ikj->ik', normaisA, normaisB[np.where(validos, idx, 0)])
+    custo = np.where(validos, dist * (1 + peso_normal * (1 - cos)), np.inf)
+    escolha = np.argmin(custo, axis=1)
+    return idx[np.arange(len(idx)), escolha]
+
+
+def associar_pedaco(arvore, centA, k=1, normaisA=None, normaisB=None, peso_normal=0.5):
+    """Face de B escolhida (int64, -1 sem vizinho) para cada centróide de `centA`."""
+    idx, dist = vizinhos_mais_proximos(arvore, centA, k)
+    if k == 1:
+        return idx[:, 0]
+    return escolher_por_normal(idx, dist, normaisA, normaisB, peso_normal)
+
+
+def associar_paralelo(arvore, centA, k=1, normaisA=None, normaisB=None, peso_normal=0.5, processos=None):
+    """Como associar_pedaco para todas as faces de A, dividindo-as entre `processos` processos
+    (numero_processos). Retorna o array (F,) int64 de faces de B."""
+    centA = np.ascontiguousarray(centA).reshape(-1, 3)
+    processos = numero_processos(len(centA), processos)
+    if processos <= 1:
+        return associar_pedaco(arvore, centA, k, normaisA, normaisB, peso_normal)
+
+    arrays = {'arvore_' + nome: v for nome, v in arvore.items() if isinstance(v, np.ndarray)}
+    arrays['centA'] = centA
+    if k > 1:
+        arrays['normaisA'], arrays['normaisB'] = normaisA, normaisB
+    arrays['saida'] = np.empty(len(centA), dtype=np.int64)
+    blocos = {}
+    try:
+        for nome, v in arrays.items():
+            blocos[nome] = _compartilhar(v)
+        descritores = {nome: (bloco.name, arrays[nome].shape, arrays[nome].dtype.str)
+                       for nome, bloco in blocos.items()}
+        pedaco = -(-len(centA) // (processos * PEDACOS_POR_PROCESSO))
+        intervalos = [(i, min(i + pedaco, len(centA))) for i in range(0, len(centA), pedaco)]
+        with _contexto().Pool(processos, _iniciar_trabalhador,
+                              (descritores, arvore['prof'], k, peso_normal)) as pool:
+            pool.map(_trabalhar, intervalos, chunksize=1)
+        return _vista(blocos['saida'], descritores['saida']).copy()
+    finally:
+        for bloco in blocos.values():
+            bloco.close()
+            bloco.unlink()
+
+
+def _contexto():
+    metodos = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in metodos else 'spawn')
+
+
+def _compartilhar(v):
+    """Bloco de memória compartilhada com uma cópia de `v`."""
+    v = np.ascontiguousarray(v)
+    bloco = shared_memory.SharedMemory(create=True, size=max(v.nbytes, 1))
+    np.ndarray(v.shape, v.dtype, buffer=bloco.buf)[...] = v
+    return bloco
+
+
+def _vista(bloco, descritor):
+    _, forma, dtype = descritor
+    return np.ndarray(forma, np.dtype(dtype), buffer=bloco.buf)
+
+
+def _iniciar_trabalhador(descritores, prof, k, peso_normal):
+    global _trabalho
+    blocos, vistas = {}, {}
+    for nome, descritor in descritores.items():
+        # forkserver e spawn dividem o resource_tracker com o processo principal, que apaga os blocos
+        blocos[nome] = shared_memory.SharedMemory(name=descritor[0])
+        vistas[nome] = _vista(blocos[nome], descritor)
+    arvore = {nome[len('arvore_'):]: v for nome, v in vistas.items() if nome.startswith('arvore_')}
+    arvore['prof'] = prof
+    _trabalho = {'blocos': blocos, 'vistas': vistas, 'arvore': arvore, 'k': k, 'peso_normal': peso_normal}
+
+
+def _trabalhar(intervalo):
+    inicio, fim = intervalo
+    v = _trabalho['vistas']
+    v['saida'][inicio:fim] = associar_pedaco(
+        _trabalho['arvore'], v['centA'][inicio:fim], _trabalho['k'],
+        v['normaisA'][inicio:fim] if 'normaisA' in v else None, v.get('normaisB'), _trabalho['peso_normal'])
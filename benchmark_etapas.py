@@ -0,0 +1,569 @@
+# benchmark_etapas.py
+# [mvfm] - Benchmark reproduzível de cada etapa do visualizador e do morpher sobre os modelos de obj/
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Mede separadamente, em cada modelo de obj/ e em pares A/B escolhidos:
+#    leitura            - carregar_obj (leitura do .OBJ, sem o cache de malhas)
+#    normalizar_modelo  - normalização de um modelo recém-lido
+#    simplificacao      - cadeia de níveis de detalhe (simplificacao.cadeia_lod, sem cache); o resultado
+#                         traz os triângulos de cada nível
+#    indexacao          - indexar (indexacao.py) de um .OBJ lido com ler_obj, já soldado e com as normais
+#                         geradas (fora do tempo); o resultado traz vértices, KiB e ACMR dos três leiautes:
+#                         'soltos' (um vértice por canto), 'so_v' (índices de posição do .OBJ) e 'indexado'
+#    associate_faces    - associação das faces A -> B (par)
+#    associacao_paralela - associar_paralelo com cada quantidade de processos, sobre o mesmo problema (par e
+#                         esferas sintéticas de ~N faces; par:processos); a árvore k-d de B fica fora do
+#                         tempo, a criação dos processos e da memória compartilhada entra. O resultado traz
+#                         a aceleração em relação à primeira quantidade; um resultado diferente do dela
+#                         vai para "ignoradas"
+#    alinhamento        - preparar_morph (par)
+#    avaliar_morph      - um quadro do morph em CPU (par)
+#    avaliar_morph_sintetico - o mesmo num morph aleatório de N faces, sem e com os segmentos da
+#                         sobreposição de normais (N e N:linhas; tamanhos em --faces-morph)
+#    desenho            - um quadro do visualizador3D fora da tela, até o glFinish (modelo)
+#    desenho_lod        - o mesmo com níveis de detalhe, um item por nível forçado (modelo:nível), com a
+#                         câmera a 2,5 raios do modelo
+#    recorte            - o mesmo sem níveis de detalhe, em cada modo de recorte (visibilidade.MODOS) com a
+#                         câmera a DISTANCIAS raios do modelo (modelo:modo:distância); o resultado traz a
+#                         fração dos triângulos enviados
+#    desenho_morph      - um quadro do morphing3d fora da tela, até o glFinish (par)
+# As etapas de desenho usam renderizador_offscreen.py (EGL); sem contexto elas são puladas e listadas
+# em "ignoradas".
+#
+# Para cada etapa e item: mediana e p95 do tempo (depois de uma execução de aquecimento), pico de memória
+# alocada numa execução extra com tracemalloc (fora da medição de tempo) e vazão (faces, vértices ou
+# triângulos por segundo, pela mediana). O resultado sai em JSON.
+#
+# Com --baseline=ARQ, compara as medianas com as de um JSON salvo antes e termina com código 1 se alguma
+# etapa ficar mais lenta que o limite (medianas abaixo de RUIDO_MS de diferença não contam).
+#
+# Uso: python benchmark_etapas.py [opções] [modelos.obj ...]
+#    --repeticoes=N     - execuções medidas por etapa e item (padrão: 9)
+#    --etapas=E1,E2     - só estas etapas (padrão: todas)
+#    --par=A.obj,B.obj  - par para as etapas de morph (pode repetir; padrão: PARES)
+#    --saida=ARQ        - grava o JSON em ARQ (padrão: mostra na saída padrão)
+#    --baseline=ARQ     - compara com um resultado anterior
+#    --limite=PCT       - regressão aceita em %, sobre a mediana (padrão: 20)
+#    --tamanho=LxA      - tamanho do framebuffer das etapas de desenho (padrão: 1024x700)
+#    --processos=P1,P2  - processos de associacao_paralela (padrão: 1, 2, 4... até o número de núcleos)
+#    --sinteticas=N1,N2 - faces das esferas de associacao_paralela (padrão: SINTETICAS; 0 = nenhuma)
+#    --faces-morph=N1,N2 - faces dos morphs de avaliar_morph_sintetico (padrão: FACES_MORPH)
+#    --lod=F1,F2,...    - frações de triângulos dos níveis de detalhe (simplificacao.py)
+#    --soldar=EPS       - solda das posições (indexacao.py)
+#    --dobra=GRAUS, --normais-planas - geração de normais (normais_suaves.py)
+# Os parâmetros do preparo das malhas vão para o JSON ('parametros'), para comparar com a baseline certa.
+
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import cache_malha
+import indexacao
+from associacao_paralela import associar_paralelo
+import normais_suaves
+import visibilidade
+from carregador_obj import ler_obj
+from indice_espacial import construir_kdtree
+from indexacao import indexar, acmr, soldar_posicoes, opcoes_indexacao, parametros_indexacao
+from normais_suaves import completar_normais, opcoes_normais, parametros_normais
+from simplificacao import cadeia_lod, opcoes_lod, parametros_lod
+from malha import Malha
+from nucleo_morph import (NORMALIZACAO, carregar_obj, carregar_modelo, normalizar_modelo, associate_faces,
+                          centroides_associacao, preparar_morph, criar_buffers, avaliar_morph, carregar_par)
+
+DIRETORIO_OBJ = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'obj')
+PARES = [('cactus.obj', 'moai.obj'), ('teapot.obj', 'easy1.obj'), ('hard1.obj', 'skeleton.obj')]
+ETAPAS = ('leitura', 'normalizar_modelo', 'simplificacao', 'indexacao', 'associate_faces', 'associacao_paralela',
+          'alinhamento', 'avaliar_morph', 'avaliar_morph_sintetico',
+          'desenho', 'desenho_lod', 'recorte', 'desenho_morph')
+ETAPAS_DESENHO = ('desenho', 'desenho_lod', 'recorte', 'desenho_morph')
+REPETICOES = 9
+SINTETICAS = (250_000,)  # faces das esferas de associacao_paralela
+FACES_MORPH = (1000, 10_000, 100_000, 1_000_000)  # avaliar_morph_sintetico
+LIMITE = 20.0   # %
+RUIDO_MS = 0.05
+VERSAO = 1
+DISTANCIAS = (4.0, 2.0, 1.0, 0.5, 0.25)  # em raios do modelo, etapa recorte
+DIRECAO = np.array([0.3, 0.35, 1.0]) / np.linalg.norm([0.3, 0.35, 1.0])
+
+
+def medir(funcao, repeticoes, preparar=None):
+    """Executa funcao(*preparar()) uma vez para aquecer e `repeticoes` vezes medindo; `preparar` fica fora
+    do tempo. Retorna (tempos em segundos, pico de memória alocada em bytes)."""
+    preparar = preparar or tuple
+    funcao(*preparar())
+    tempos = []
+    for _ in range(repeticoes):
+        args = preparar()
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+
+    args = preparar()
+    tracemalloc.start()
+    try:
+        funcao(*args)
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return tempos, pico
+
+
+def resumo(tempos, pico, quantidade, unidade):
+    mediana = float(np.median(tempos))
+    return {
+        'mediana_ms': mediana * 1000.0,
+        'p95_ms': float(np.percentile(tempos, 95)) * 1000.0,
+        'pico_memoria_kb': pico / 1024.0,
+        'vazao': quantidade / mediana if mediana > 0 else None,
+        'unidade': unidade,
+        'repeticoes': len(tempos),
+    }
+
+
+def etapas_modelo(caminho, etapas, repeticoes):
+    """leitura, normalizar_modelo, simplificacao e indexacao de um modelo."""
+    resultados = {}
+    modelo = carregar_obj(caminho)
+    faces, vertices = len(modelo['faces']), len(modelo['vertices'])
+
+    if 'leitura' in etapas:
+        tempos, pico = medir(lambda: carregar_obj(caminho), repeticoes)
+        resultados['leitura'] = resumo(tempos, pico, faces, 'faces/s')
+    if 'normalizar_modelo' in etapas and vertices:
+        tempos, pico = medir(lambda m: normalizar_modelo(m, **NORMALIZACAO), repeticoes,
+                             lambda: (modelo.copia(),))
+        resultados['normalizar_modelo'] = resumo(tempos, pico, vertices, 'vértices/s')
+    if 'simplificacao' in etapas and faces:
+        ultima = {}
+
+        def simplificar():
+            ultima['cadeia'] = cadeia_lod(modelo['vertices'], modelo['faces'])
+        tempos, pico = medir(simplificar, repeticoes)
+        resultados['simplificacao'] = resumo(tempos, pico, faces, 'faces/s')
+        resultados['simplificacao']['triangulos_niveis'] = [len(n['faces']) for n in ultima['cadeia']]
+    if 'indexacao' in etapas and faces:
+        resultados['indexacao'] = etapa_indexacao(caminho, repeticoes)
+    return resultados
+
+
+def etapa_indexacao(caminho, repeticoes):
+    """indexar de um .OBJ, com os tamanhos e o ACMR dos leiautes soltos, só v e indexado."""
+    malha = ler_obj(caminho)
+    if indexacao.soldaEpsilon is not None:
+        malha['vertices'], malha['faces'] = soldar_posicoes(malha['vertices'], malha['faces'], indexacao.soldaEpsilon)
+    completar_normais(malha, normais_suaves.anguloDobra)
+    tem_vt = len(malha['texcoords']) > 0 and (malha['faces_texcoords'] >= 0).any()
+    bytes_vertice = 4 * (3 + 3 + (malha['texcoords'].shape[1] if tem_vt else 0))
+    ultimo = {}
+
+    def indexar_malha():
+        ultimo['indexada'] = indexar(malha['vertices'], malha['faces'], malha['normais'], malha['faces_normais'],
+                                     malha['texcoords'] if tem_vt else None,
+                                     malha['faces_texcoords'] if tem_vt else None)
+    T = len(malha['faces'])
+    tempos, pico = medir(indexar_malha, repeticoes)
+    posicoes, _, _, indices = ultimo['indexada']
+    r = resumo(tempos, pico, T, 'faces/s')
+    r['leiautes'] = {
+        forma: {'vertices': int(n), 'kib': tamanho / 1024.0, 'acmr': float(razao)}
+        for forma, n, tamanho, razao in (
+            ('soltos', 3 * T, 3 * T * bytes_vertice, 3.0),
+            ('so_v', len(malha['vertices']), len(malha['vertices']) * bytes_vertice + indices.nbytes,
+             acmr(malha['faces'])),
+            ('indexado', len(posicoes), len(posicoes) * bytes_vertice + indices.nbytes, acmr(indices)))}
+    return r
+
+
+def etapas_par(caminhoA, caminhoB, etapas, repeticoes):
+    """associate_faces, alinhamento e avaliar_morph de um par A/B."""
+    resultados = {}
+    modelA, modelB, associations, morph = carregar_par(caminhoA, caminhoB)
+    faces = len(modelA['faces'])
+
+    if 'associate_faces' in etapas:
+        tempos, pico = medir(lambda: associate_faces(modelA, modelB), repeticoes)
+        resultados['associate_faces'] = resumo(tempos, pico, faces, 'faces/s')
+    if 'alinhamento' in etapas:
+        tempos, pico = medir(lambda: preparar_morph(modelA, modelB, associations), repeticoes)
+        resultados['alinhamento'] = resumo(tempos, pico, faces, 'faces/s')
+    if 'avaliar_morph' in etapas:
+        buffers = criar_buffers(morph)
+        quadro = iter(range(10 ** 9))
+        tempos, pico = medir(lambda: avaliar_morph(morph, (next(quadro) % 100) / 99.0, buffers), repeticoes)
+        resultados['avaliar_morph'] = resumo(tempos, pico, faces, 'faces/s')
+    return resultados
+
+
+def morph_aleatorio(faces, semente=0):
+    """Morph de `faces` triângulos com início e fim aleatórios (só para medir avaliar_morph)."""
+    rng = np.random.default_rng(semente)
+    return {'inicio': rng.random((faces, 3, 3), dtype=np.float32),
+            'fim': rng.random((faces, 3, 3), dtype=np.float32)}
+
+
+def etapa_avaliar_morph_sintetico(faces, repeticoes):
+    """avaliar_morph num morph aleatório, sem e com os segmentos das normais; retorna {item: resumo}."""
+    morph = morph_aleatorio(faces)
+    buffers = criar_buffers(morph)
+    resultados = {}
+    for item, linhas in (('', False), (':linhas', True)):
+        quadro = iter(range(10 ** 9))
+        tempos, pico = medir(lambda: avaliar_morph(morph, (next(quadro) % 100) / 99.0, buffers, linhas), repeticoes)
+        resultados[f"{faces}{item}"] = resumo(tempos, pico, faces, 'faces/s')
+    return resultados
+
+
+def esfera_uv(faces, ruido=0.0, angulo=0.0, semente=0):
+    """Esfera UV de raio 1 com ~`faces` triângulos, girada de `angulo` radianos em y e com os vértices
+    deslocados até `ruido` em cada eixo."""
+    lados = max(3, int(np.sqrt(faces / 4)))
+    aneis = max(2, int(faces / (2 * lados)))
+    theta = np.linspace(0, np.pi, aneis + 1)[:, None]
+    phi = np.linspace(0, 2 * np.pi, lados, endpoint=False)[None, :] + angulo
+    v = np.stack([np.sin(theta) * np.cos(phi), np.cos(theta) * np.ones_like(phi),
+                  np.sin(theta) * np.sin(phi)], axis=-1).reshape(-1, 3)
+    if ruido:
+        v += np.random.default_rng(semente).uniform(-ruido, ruido, v.shape)
+    i, j = np.meshgrid(np.arange(aneis), np.arange(lados), indexing='ij')
+    a = i * lados + j
+    b = i * lados + (j + 1) % lados
+    c, d = a + lados, b + lados
+    faces = np.concatenate([np.stack([a, c, b], -1), np.stack([b, c, d], -1)]).reshape(-1, 3)
+    return Malha(v, faces)
+
+
+def processos_padrao():
+    """1, 2, 4... até o número de núcleos (que entra mesmo se não for potência de 2)."""
+    nucleos = os.cpu_count() or 1
+    processos = [2 ** i for i in range(nucleos.bit_length()) if 2 ** i <= nucleos]
+    if processos[-1] != nucleos:
+        processos.append(nucleos)
+    return processos
+
+
+def etapa_associacao_paralela(modelA, modelB, processos, repeticoes):
+    """associar_paralelo de A -> B com cada quantidade de `processos`; retorna {Pp: resumo}."""
+    centA = centroides_associacao(modelA)
+    arvore = construir_kdtree(centroides_associacao(modelB))
+    ultimo = {}
+    resultados, base, referencia = {}, None, None
+    for p in processos:
+        def associar(p=p):
+            ultimo['assoc'] = associar_paralelo(arvore, centA, processos=p)
+        tempos, pico = medir(associar, repeticoes)
+        if referencia is None:
+            referencia = ultimo['assoc']
+        elif not np.array_equal(ultimo['assoc'], referencia):
+            raise ValueError(f"resultado com {p} processos difere do com {processos[0]}")
+        r = resumo(tempos, pico, len(centA), 'faces/s')
+        base = base or r['mediana_ms']
+        r['processos'] = p
+        r['aceleracao'] = base / r['mediana_ms'] if r['mediana_ms'] > 0 else None
+        resultados[f"{p}p"] = r
+    return resultados
+
+
+def preparar_desenho(largura, altura):
+    """Cria o contexto fora da tela; retorna o contexto ou a mensagem de erro."""
+    import renderizador_offscreen
+    try:
+        return renderizador_offscreen.criar_contexto(largura, altura, 'egl'), None
+    except RuntimeError as e:
+        return None, str(e)
+
+
+def etapa_desenho(caminho, ctx, repeticoes):
+    """Um quadro do visualizador3D (desenharCena + glFinish)."""
+    import renderizador_offscreen
+    from OpenGL.GL import glFinish
+    programa = renderizador_offscreen.carregar_programa('visualizador3D')
+    renderizador_offscreen.preparar_cena(programa, [caminho], ctx)
+
+    def quadro():
+        programa.rotation += 0.3
+        programa.desenharCena()
+        glFinish()
+    tempos, pico = medir(quadro, repeticoes)
+    return resumo(tempos, pico, len(programa.faces), 'triângulos/s')
+
+
+def enquadrar(programa, raios=2.5):
+    """Põe a câmera do visualizador3D de frente para o modelo, a `raios` raios do centro da caixa."""
+    minimo, maximo = np.asarray(programa.limitesModelo, dtype=np.float64)
+    centro = (minimo + maximo) / 2
+    raio = np.linalg.norm(maximo - minimo) / 2
+    programa.cameraPos = [0.0, float(centro[1]), float(centro[2] + raios * raio)]
+    programa.altVisao = float(centro[1])
+
+
+def etapa_desenho_lod(caminho, ctx, repeticoes):
+    """Um quadro do visualizador3D com cada nível de detalhe forçado; retorna {nível: resumo}."""
+    import renderizador_offscreen
+    from OpenGL.GL import glFinish
+    programa = renderizador_offscreen.carregar_programa('visualizador3D')
+    renderizador_offscreen.preparar_cena(programa, [caminho], ctx, lod=True)
+    enquadrar(programa)
+
+    def quadro():
+        programa.rotation += 7.0
+        programa.desenharCena()
+        glFinish()
+    resultados = {}
+    try:
+        for nivel, (_, faces) in enumerate(programa.niveis):
+            programa.nivelForcado = nivel
+            tempos, pico = medir(quadro, repeticoes)
+            resultados[str(nivel)] = resumo(tempos, pico, len(faces), 'triângulos/s')
+    finally:
+        programa.nivelForcado = None
+    return resultados
+
+
+def etapa_recorte(caminho, ctx, repeticoes):
+    """Um quadro do visualizador3D em cada modo de recorte, com a câmera se aproximando do modelo;
+    retorna {modo:distância: resumo}."""
+    import renderizador_offscreen
+    from OpenGL.GL import glFinish
+    programa = renderizador_offscreen.carregar_programa('visualizador3D')
+    renderizador_offscreen.preparar_cena(programa, [caminho], ctx)
+    minimo, maximo = np.asarray(programa.limitesModelo, dtype=np.float64)
+    centro = (minimo + maximo) / 2
+    raio = np.linalg.norm(maximo - minimo) / 2
+    enviados = []
+
+    def quadro():
+        programa.rotation += 7.0
+        programa.desenharCena()
+        glFinish()
+        recorte = programa.recorte
+        enviados.append(recorte['triangulos'] / max(recorte['total'], 1) if recorte else 1.0)
+    resultados = {}
+    modo_anterior = visibilidade.modoRecorte
+    try:
+        for distancia in DISTANCIAS:
+            # a câmera olha para (0, altVisao, 0): o centro fica no eixo Y para o modelo não sair da tela
+            programa.altVisao = float(centro[1])
+            programa.cameraPos = [float(x) for x in np.array([0.0, centro[1], 0.0]) + DIRECAO * distancia * raio]
+            for modo in visibilidade.MODOS:
+                visibilidade.modoRecorte = modo
+                enviados.clear()
+                tempos, pico = medir(quadro, repeticoes)
+                r = resumo(tempos, pico, len(programa.faces), 'triângulos/s')
+                r['fracao_enviada'] = float(np.mean(enviados))
+                resultados[f"{modo}:{distancia:g}r"] = r
+    finally:
+        visibilidade.modoRecorte = modo_anterior
+    return resultados
+
+
+def etapa_desenho_morph(caminhoA, caminhoB, ctx, repeticoes):
+    """Um quadro do morphing3d (desenhar_cena em CPU + glFinish), com t variando."""
+    import renderizador_offscreen
+    from OpenGL.GL import glFinish
+    programa = renderizador_offscreen.carregar_programa('morphing3d')
+    renderizador_offscreen.preparar_cena(programa, [caminhoA, caminhoB], ctx)
+    quadro_atual = iter(range(10 ** 9))
+
+    def quadro():
+        programa.morph_t = (next(quadro_atual) % 100) / 99.0
+        programa.desenhar_cena()
+        glFinish()
+    tempos, pico = medir(quadro, repeticoes)
+    return resumo(tempos, pico, len(programa.morph['inicio']), 'triângulos/s')
+
+
+def executar(modelos, pares, etapas, repeticoes, largura=1024, altura=700, progresso=None, processos=None,
+             sinteticas=SINTETICAS, faces_morph=FACES_MORPH):
+    """Roda as etapas pedidas e retorna o dict do relatório (o que vai para o JSON). `processos` e
+    `sinteticas` são as quantidades de processos e as esferas de associacao_paralela; `faces_morph`, os
+    tamanhos de avaliar_morph_sintetico."""
+    progresso = progresso or (lambda texto: None)
+    processos = processos or processos_padrao()
+    cache_malha.usarCache = False
+    relatorio = {
+        'versao': VERSAO,
+        'ambiente': {'python': platform.python_version(), 'numpy': np.__version__,
+                     'sistema': platform.platform(), 'processador': platform.processor() or platform.machine(),
+                     'nucleos': os.cpu_count()},
+        'repeticoes': repeticoes,
+        'parametros': {**parametros_lod(), **parametros_indexacao(), **parametros_normais()},
+        'resultados': {},
+        'ignoradas': {},
+    }
+    resultados = relatorio['resultados']
+
+    for caminho in modelos:
+        nome = os.path.basename(caminho)
+        progresso(f"modelo {nome}")
+        try:
+            for etapa, r in etapas_modelo(caminho, etapas, repeticoes).items():
+                resultados[f"{etapa}:{nome}"] = r
+        except (OSError, ValueError) as e:
+            relatorio['ignoradas'][nome] = str(e)
+
+    for caminhoA, caminhoB in pares:
+        nome = f"{os.path.basename(caminhoA)}->{os.path.basename(caminhoB)}"
+        progresso(f"par {nome}")
+        try:
+            for etapa, r in etapas_par(caminhoA, caminhoB, etapas, repeticoes).items():
+                resultados[f"{etapa}:{nome}"] = r
+        except (OSError, ValueError) as e:
+            relatorio['ignoradas'][nome] = str(e)
+
+    if 'avaliar_morph_sintetico' in etapas:
+        for faces in faces_morph:
+            progresso(f"avaliar_morph_sintetico {faces}")
+            for item, r in etapa_avaliar_morph_sintetico(faces, repeticoes).items():
+                resultados[f"avaliar_morph_sintetico:{item}"] = r
+
+    if 'associacao_paralela' in etapas:
+        casos = [(f"{os.path.basename(a)}->{os.path.basename(b)}",
+                  lambda a=a, b=b: (carregar_modelo(a), carregar_modelo(b))) for a, b in pares]
+        casos += [(f"esfera_{n}", lambda n=n: (esfera_uv(n), esfera_uv(n, ruido=0.5 / np.sqrt(n), angulo=0.3)))
+                  for n in sinteticas]
+        for nome, carregar in casos:
+            progresso(f"associacao_paralela {nome}")
+            try:
+                for item, r in etapa_associacao_paralela(*carregar(), processos, repeticoes).items():
+                    resultados[f"associacao_paralela:{nome}:{item}"] = r
+            except (OSError, ValueError) as e:
+                relatorio['ignoradas'][f"associacao_paralela:{nome}"] = str(e)
+
+    if any(etapa in etapas for etapa in ETAPAS_DESENHO):
+        ctx, erro = preparar_desenho(largura, altura)
+        if ctx is None:
+            for etapa in ETAPAS_DESENHO:
+                if etapa in etapas:
+                    relatorio['ignoradas'][etapa] = erro
+        else:
+            relatorio['ambiente']['opengl'] = _descricao_gl()
+            if 'desenho' in etapas:
+                for caminho in modelos:
+                    nome = os.path.basename(caminho)
+                    progresso(f"desenho {nome}")
+                    try:
+                        resultados[f"desenho:{nome}"] = etapa_desenho(caminho, ctx, repeticoes)
+                    except (OSError, ValueError) as e:
+                        relatorio['ignoradas'][f"desenho:{nome}"] = str(e)
+            # etapas com vários itens por modelo (nível, modo de recorte...)
+            for etapa, funcao in (('desenho_lod', etapa_desenho_lod), ('recorte', etapa_recorte)):
+                if etapa not in etapas:
+                    continue
+                for caminho in modelos:
+                    nome = os.path.basename(caminho)
+                    progresso(f"{etapa} {nome}")
+                    try:
+                        for item, r in funcao(caminho, ctx, repeticoes).items():
+                            resultados[f"{etapa}:{nome}:{item}"] = r
+                    except (OSError, ValueError) as e:
+                        relatorio['ignoradas'][f"{etapa}:{nome}"] = str(e)
+            if 'desenho_morph' in etapas:
+                for caminhoA, caminhoB in pares:
+                    nome = f"{os.path.basename(caminhoA)}->{os.path.basename(caminhoB)}"
+                    progresso(f"desenho_morph {nome}")
+                    try:
+                        resultados[f"desenho_morph:{nome}"] = etapa_desenho_morph(caminhoA, caminhoB, ctx, repeticoes)
+                    except (OSError, ValueError) as e:
+                        relatorio['ignoradas'][f"desenho_morph:{nome}"] = str(e)
+    return relatorio
+
+
+def _descricao_gl():
+    from OpenGL.GL import glGetString, GL_RENDERER, GL_VERSION
+    return f"{(glGetString(GL_RENDERER) or b'').decode()} / {(glGetString(GL_VERSION) or b'').decode()}"
+
+
+def comparar(relatorio, baseline, limite=LIMITE):
+    """Compara as medianas com as da baseline. Retorna a lista de (chave, antes_ms, depois_ms, variação %)
+    das etapas que ficaram mais lentas que `limite` %."""
+    regressoes = []
+    for chave, atual in relatorio['resultados'].items():
+        anterior = baseline.get('resultados', {}).get(chave)
+        if anterior is None:
+            continue
+        antes, depois = anterior['mediana_ms'], atual['mediana_ms']
+        if depois - antes > RUIDO_MS and depois > antes * (1 + limite / 100.0):
+            regressoes.append((chave, antes, depois, (depois / antes - 1) * 100.0 if antes else float('inf')))
+    return regressoes
+
+
+def _valor(args, nome, padrao=None):
+    return next((a.split('=', 1)[1] for a in args if a.startswith(f'--{nome}=')), padrao)
+
+
+def main():
+    try:
+        args = opcoes_normais(opcoes_indexacao(opcoes_lod(sys.argv[1:])))
+        repeticoes = int(_valor(args, 'repeticoes', REPETICOES))
+        limite = float(_valor(args, 'limite', LIMITE))
+        largura, altura = (int(x) for x in _valor(args, 'tamanho', '1024x700').lower().split('x'))
+        etapas = _valor(args, 'etapas', ','.join(ETAPAS)).split(',')
+        desconhecidas = [e for e in etapas if e not in ETAPAS]
+        if desconhecidas or repeticoes < 1:
+            raise ValueError(f"etapa desconhecida: {', '.join(desconhecidas)}" if desconhecidas else "repetições < 1")
+        pares = [tuple(a.split('=', 1)[1].split(',')) for a in args if a.startswith('--par=')]
+        processos = [int(p) for p in _valor(args, 'processos', ','.join(map(str, processos_padrao()))).split(',')]
+        sinteticas = [n for n in (int(x) for x in _valor(args, 'sinteticas', ','.join(map(str, SINTETICAS))).split(','))
+                      if n > 0]
+        faces_morph = [n for n in (int(x) for x in _valor(args, 'faces-morph', ','.join(map(str, FACES_MORPH))).split(','))
+                       if n > 0]
+        if min(processos) < 1:
+            raise ValueError("processos < 1")
+        if any(len(p) != 2 for p in pares):
+            raise ValueError("--par precisa de dois modelos: --par=A.obj,B.obj")
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+    pares = pares or [(os.path.join(DIRETORIO_OBJ, a), os.path.join(DIRETORIO_OBJ, b)) for a, b in PARES]
+    modelos = [a for a in args if not a.startswith('--')] or sorted(glob.glob(os.path.join(DIRETORIO_OBJ, '*.obj')))
+    saida = _valor(args, 'saida')
+    caminho_baseline = _valor(args, 'baseline')
+
+    baseline = None
+    if caminho_baseline:
+        try:
+            with open(caminho_baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Erro: baseline {caminho_baseline}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    relatorio = executar(modelos, pares, etapas, repeticoes, largura, altura,
+                         lambda texto: print(texto, file=sys.stderr, flush=True), processos, sinteticas,
+                         faces_morph)
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if saida:
+        with open(saida, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+    else:
+        print(texto)
+
+    print(f"\n{'etapa:item':<48} {'mediana (ms)':>12} {'p95 (ms)':>10} {'pico (KB)':>10} {'vazão':>18}", file=sys.stderr)
+    for chave, r in relatorio['resultados'].items():
+        vazao = f"{r['vazao']:.3e} {r['unidade']}" if r['vazao'] else '-'
+        print(f"{chave:<48} {r['mediana_ms']:>12.3f} {r['p95_ms']:>10.3f} {r['pico_memoria_kb']:>10.0f} {vazao:>18}",
+              file=sys.stderr)
+    for chave, motivo in relatorio['ignoradas'].items():
+        print(f"ignorada {chave}: {motivo}", file=sys.stderr)
+
+    if baseline is not None:
+        regressoes = comparar(relatorio, baseline, limite)
+        for chave, antes, depois, variacao in regressoes:
+            print(f"REGRESSÃO {chave}: {antes:.3f} ms -> {depois:.3f} ms (+{variacao:.1f}%)", file=sys.stderr)
+        if regressoes:
+            print(f"{len(regressoes)} etapa(s) acima do limite de {limite:g}%", file=sys.stderr)
+            sys.exit(1)
+        print(f"nenhuma regressão acima de {limite:g}% em relação a {caminho_baseline}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# benchmark_rasterizador.py
+# [mvfm] - Benchmark do rasterizador em software (rasterizador.rasterizar)
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Desenha cada modelo (normalizado, como nos morphers) repetidamente, girando um pouco a cada quadro,
+# e mostra quadros por segundo, ms por quadro e triângulos por segundo. Só CPU, sem OpenGL.
+#
+# Uso: python benchmark_rasterizador.py [--tamanho=LxA] [--flat] [modelos.obj ...]
+#    --tamanho=LxA  - tamanho da imagem (padrão: 1024x700)
+#    --flat         - sombreamento flat em vez de gouraud
+#    modelos        - padrão: obj/hard2.obj obj/skeleton.obj obj/teapot.obj obj/cactus.obj
+
+import os
+import sys
+import time
+
+from rasterizador import rasterizar, triangulos_modelo
+
+MODELOS = ['hard2.obj', 'skeleton.obj', 'teapot.obj', 'cactus.obj']
+TEMPO_MINIMO = 1.0  # segundos medidos por modelo
+
+
+def medir(triangulos, largura, altura, sombreamento='gouraud'):
+    """Retorna (quadros por segundo, ms por quadro)."""
+    rasterizar(triangulos, None, largura, altura, sombreamento=sombreamento)
+
+    n = 0
+    inicio = time.perf_counter()
+    while True:
+        rasterizar(triangulos, None, largura, altura, rotacao=n * 7.0, sombreamento=sombreamento)
+        n += 1
+        decorrido = time.perf_counter() - inicio
+        if decorrido >= TEMPO_MINIMO:
+            break
+    return n / decorrido, decorrido / n * 1000.0
+
+
+def main():
+    args = sys.argv[1:]
+    tamanho = next((a.split('=', 1)[1] for a in args if a.startswith('--tamanho=')), '1024x700')
+    largura, altura = (int(x) for x in tamanho.lower().split('x'))
+    sombreamento = 'flat' if '--flat' in args else 'gouraud'
+    diretorio = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'obj')
+    modelos = [a for a in args if not a.startswith('--')] or [os.path.join(diretorio, m) for m in MODELOS]
+
+    print(f"{largura}x{altura}, {sombreamento}")
+    print(f"{'modelo':<20} {'triângulos':>10} {'quadros/s':>10} {'ms/quadro':>10} {'triângulos/s':>14}")
+    for caminho in modelos:
+        triangulos, _ = triangulos_modelo(caminho)
+        por_segundo, ms = medir(triangulos, largura, altura, sombreamento)
+        print(f"{os.path.basename(caminho):<20} {len(triangulos):>10} {por_segundo:>10.1f} {ms:>10.1f} "
+              f"{por_segundo * len(triangulos):>14.3e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+# cache_associacao.py
+# [mvfm] - Cache em disco das associações de faces e dos alinhamentos de cada par de modelos do morph
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# associate_faces e o alinhamento dos triângulos (nucleo_morph.py) são a parte mais cara da abertura do
+# morpher, e o resultado só depende dos dois modelos e dos parâmetros. Cada entrada guarda, por face de
+# A, a face de B associada ('associacoes', int32, -1 sem par) e a ordem dos vértices escolhida no
+# alinhamento ('permutacoes', uint8, índice em nucleo_morph.PERMUTACOES): 5 bytes por face. As entradas
+# ficam num subdiretório do cache de malhas, no mesmo formato (um .npy por array + meta.json), e são
+# identificadas pelos hashes do conteúdo dos dois .OBJ (cache_malha.hash_conteudo) + os parâmetros de
+# normalização e associação. --no-cache e --rebuild-cache (cache_malha.opcoes_cache) valem também aqui.
+# Passando de `tamanhoMaximo`, saem as entradas usadas há mais tempo.
+#
+# Uso: python cache_associacao.py [--limpar=MB] [--apagar-tudo]
+#    sem opções    - lista as entradas (da usada há mais tempo para a mais recente) e o total
+#    --limpar=MB   - apaga as entradas usadas há mais tempo até o total ficar abaixo de MB megabytes
+#    --apagar-tudo - apaga todas as entradas
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import cache_malha
+from cache_malha import entradas_cache, limpar_cache, hash_conteudo
+
+VERSAO = 2  # mudar quando o formato das entradas (ou o cálculo da associação) mudar
+
+tamanhoMaximo = 128 * 1024 * 1024  # bytes
+
+
+def diretorio():
+    """Diretório das entradas (dentro do cache de malhas, que pode ter sido trocado depois do import)."""
+    return os.path.join(cache_malha.diretorioCache, 'associacoes')
+
+
+def _pasta(caminhoA, caminhoB, parametros):
+    texto = json.dumps({'versao': VERSAO, 'parametros': parametros}, sort_keys=True)
+    return os.path.join(diretorio(), f"{hash_conteudo(caminhoA)}-{hash_conteudo(caminhoB)}-"
+                                     f"{hashlib.blake2b(texto.encode(), digest_size=8).hexdigest()}")
+
+
+def ler_associacao(caminhoA, caminhoB, parametros, faces):
+    """(associacoes (F,) int32, permutacoes (F,) uint8) guardadas para o par, ou None se não houver entrada
+    (ou se ela não servir para um modelo A de `faces` faces)."""
+    if not cache_malha.usarCache or cache_malha.reconstruirCache:
+        return None
+    try:
+        pasta = _pasta(caminhoA, caminhoB, parametros)
+        if not os.path.exists(os.path.join(pasta, 'meta.json')):
+            return None
+        associacoes = np.load(os.path.join(pasta, 'associacoes.npy'), mmap_mode='r')
+        permutacoes = np.load(os.path.join(pasta, 'permutacoes.npy'), mmap_mode='r')
+        # marca o uso para a política LRU
+        os.utime(os.path.join(pasta, 'meta.json'))
+    except (OSError, ValueError, KeyError):
+        return None
+    if len(associacoes) != faces or len(permutacoes) != faces:
+        return None
+    return associacoes, permutacoes
+
+
+def gravar_associacao(caminhoA, caminhoB, parametros, associacoes, permutacoes):
+    """Guarda a associação e as permutações do par e aplica o limite de tamanho do cache."""
+    if not cache_malha.usarCache:
+        return
+    try:
+        os.makedirs(diretorio(), exist_ok=True)
+        pasta = _pasta(caminhoA, caminhoB, parametros)
+        tmp = tempfile.mkdtemp(dir=diretorio(), prefix='.tmp-')
+        try:
+            associacoes = np.ascontiguousarray(associacoes, dtype=np.int32)
+            np.save(os.path.join(tmp, 'associacoes.npy'), associacoes)
+            np.save(os.path.join(tmp, 'permutacoes.npy'), np.ascontiguousarray(permutacoes, dtype=np.uint8))
+            meta = {'arrays': ['associacoes', 'permutacoes'], 'origem': [os.path.abspath(caminhoA),
+                    os.path.abspath(caminhoB)], 'parametros': parametros, 'faces': len(associacoes),
+                    'criado': time.time()}
+            with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+            if os.path.isdir(pasta):
+                shutil.rmtree(pasta, ignore_errors=True)
+            os.replace(tmp, pasta)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        limpar_cache(tamanhoMaximo, manter=(pasta,), diretorio=diretorio())
+    except OSError as e:
+        print(f"Aviso: não foi possível gravar o cache de associações ({e})")
+
+
+def main():
+    args = sys.argv[1:]
+    try:
+        if '--apagar-tudo' in args:
+            limite = 0
+        else:
+            limite = next((float(a.split('=', 1)[1]) * 1024 * 1024 for a in args if a.startswith('--limpar=')), None)
+    except ValueError as e:
+        print(f"Erro: {e}.")
+        print("Uso: python cache_associacao.py [--limpar=MB] [--apagar-tudo]")
+        sys.exit(1)
+    if limite is not None:
+        total = limpar_cache(limite, diretorio=diretorio())
+        print(f"Cache de associações: {total / 1024:.1f} KiB depois da limpeza")
+
+    entradas = entradas_cache(diretorio())
+    print(f"{'último uso':<19} {'KiB':>9} {'faces':>9}  par")
+    for pasta, tamanho, uso in entradas:
+        try:
+            with open(os.path.join(pasta, 'meta.json'), 'r') as f:
+                meta = json.load(f)
+            faces = meta['faces']
+            par = ' -> '.join(os.path.basename(c) for c in meta['origem'])
+        except (OSError, ValueError, KeyError):
+            faces, par = '?', os.path.basename(pasta)
+        print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(uso)):<19} {tamanho / 1024:>9.1f} "
+              f"{faces:>9}  {par}")
+    print(f"{len(entradas)} entrada(s), {sum(t for _, t, _ in entradas) / 1024:.1f} KiB em {diretorio()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+# cache_malha.py
+# [mvfm] - Cache persistente de malhas já lidas (e normalizadas) em arrays binários
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Cada entrada é um diretório com um .npy por array (vértices, normais, faces, limites...),
+# carregado depois com mmap sem precisar ler o .OBJ de novo. As entradas são identificadas
+# pelo hash do conteúdo do .OBJ + parâmetros de preparo (ex.: os de normalizar_modelo), e um
+# índice por caminho/tamanho/mtime evita reler o arquivo quando ele não mudou.
+#
+# Opções de linha de comando (tratadas por opcoes_cache):
+#    --no-cache       - não lê nem grava o cache
+#    --rebuild-cache  - ignora o que estiver no cache e grava de novo
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from carregador_obj import ler_obj
+
+VERSAO = 2  # mudar quando o formato das entradas (ou a leitura do .OBJ) mudar
+
+diretorioCache = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'visualizador3D')
+tamanhoMaximo = 512 * 1024 * 1024  # bytes; as entradas usadas há mais tempo saem primeiro
+usarCache = True
+reconstruirCache = False
+
+# o índice é lido, alterado e regravado inteiro: carregar_par lê os dois modelos em threads ao mesmo tempo
+_travaIndice = threading.Lock()
+
+
+def opcoes_cache(argv):
+    """Remove --no-cache/--rebuild-cache de argv, aplicando-as, e retorna os argumentos restantes."""
+    global usarCache, reconstruirCache
+    restantes = []
+    for arg in argv:
+        if arg == '--no-cache':
+            usarCache = False
+        elif arg == '--rebuild-cache':
+            reconstruirCache = True
+        else:
+            restantes.append(arg)
+    return restantes
+
+
+def _hash_arquivo(caminho):
+    h = hashlib.blake2b(digest_size=16)
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _chave(hashConteudo, parametros):
+    texto = json.dumps({'versao': VERSAO, 'parametros': parametros}, sort_keys=True)
+    return hashConteudo + '-' + hashlib.blake2b(texto.encode(), digest_size=8).hexdigest()
+
+
+def _ler_indice():
+    try:
+        with open(os.path.join(diretorioCache, 'indice.json'), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_json(caminho, dados):
+    """Grava um json de forma atômica (arquivo temporário + rename)."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(dados, f)
+    os.replace(tmp, caminho)
+
+
+def _hash_com_indice(caminho):
+    """Hash do conteúdo do .OBJ, reaproveitando o do índice se tamanho e mtime não mudaram."""
+    st = os.stat(caminho)
+    absoluto = os.path.abspath(caminho)
+    indice = _ler_indice()
+    item = indice.get(absoluto)
+    if item and item['tamanho'] == st.st_size and item['mtime'] == st.st_mtime_ns:
+        return item['hash']
+
+    hashConteudo = _hash_arquivo(caminho)
+    with _travaIndice:
+        # relido dentro da trava, para não apagar o que outra thread gravou enquanto este hash era calculado
+        indice = _ler_indice()
+        indice[absoluto] = {'tamanho': st.st_size, 'mtime': st.st_mtime_ns, 'hash': hashConteudo}
+        try:
+            _gravar_json(os.path.join(diretorioCache, 'indice.json'), indice)
+        except OSError:
+            pass
+    return hashConteudo
+
+
+def hash_conteudo(caminho):
+    """Hash do conteúdo de um arquivo (o mesmo da chave das entradas), sem reler arquivos que não mudaram."""
+    os.makedirs(diretorioCache, exist_ok=True)
+    return _hash_com_indice(caminho)
+
+
+def _abrir_entrada(pasta):
+    """Abre os arrays de uma entrada com mmap (somente leitura)."""
+    with open(os.path.join(pasta, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    malha = {}
+    for nome in meta['arrays']:
+        malha[nome] = np.load(os.path.join(pasta, nome + '.npy'), mmap_mode='r')
+    # marca o uso para a política LRU
+    os.utime(os.path.join(pasta, 'meta.json'))
+    return malha
+
+
+def _gravar_entrada(pasta, malha, caminho, parametros):
+    tmp = tempfile.mkdtemp(dir=diretorioCache, prefix='.tmp-')
+    try:
+        for nome, arr in malha.items():
+            np.save(os.path.join(tmp, nome + '.npy'), np.ascontiguousarray(arr))
+        meta = {'arrays': list(malha), 'origem': os.path.abspath(caminho), 'parametros': parametros,
+                'criado': time.time()}
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        if os.path.isdir(pasta):
+            shutil.rmtree(pasta, ignore_errors=True)
+        os.replace(tmp, pasta)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def _tamanho_entrada(pasta):
+    return sum(e.stat().st_size for e in os.scandir(pasta) if e.is_file())
+
+
+def entradas_cache(diretorio=None):
+    """Lista as entradas do cache como (pasta, bytes, último uso), da usada há mais tempo para a mais recente.
+    `diretorio` lista outro cache com entradas no mesmo formato (pasta com meta.json)."""
+    diretorio = diretorioCache if diretorio is None else diretorio
+    entradas = []
+    if not os.path.isdir(diretorio):
+        return entradas
+    for e in os.scandir(diretorio):
+        meta = os.path.join(e.path, 'meta.json')
+        if e.is_dir() and not e.name.startswith('.') and os.path.exists(meta):
+            entradas.append((e.path, _tamanho_entrada(e.path), os.path.getmtime(meta)))
+    entradas.sort(key=lambda x: x[2])
+    return entradas
+
+
+def limpar_cache(limite=None, manter=(), diretorio=None):
+    """Remove as entradas usadas há mais tempo até o total ficar abaixo de `limite` bytes."""
+    limite = tamanhoMaximo if limite is None else limite
+    entradas = entradas_cache(diretorio)
+    total = sum(tam for _, tam, _ in entradas)
+    for pasta, tam, _ in entradas:
+        if total <= limite:
+            break
+        if pasta in manter:
+            continue
+        shutil.rmtree(pasta, ignore_errors=True)
+        total -= tam
+    return total
+
+
+def em_cache(caminho, parametros=None):
+    """True se carregar_malha(caminho, ..., parametros) vai sair do cache, sem precisar de preparar."""
+    if not usarCache or reconstruirCache:
+        return False
+    try:
+        pasta = os.path.join(diretorioCache, _chave(_hash_com_indice(caminho), parametros or {}))
+        return os.path.exists(os.path.join(pasta, 'meta.json'))
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def carregar_malha(caminho, preparar=ler_obj, parametros=None):
+    """Retorna o dict de arrays de preparar(caminho), passando pelo cache.
+    `parametros` descreve o preparo (ex.: normalização) e faz parte da chave, então mudá-lo invalida a entrada.
+    Além dos arrays de `preparar`, a malha traz 'limites' (2,3): mínimo e máximo dos vértices."""
+    parametros = parametros or {}
+    if not usarCache:
+        return _preparar(caminho, preparar)
+
+    try:
+        os.makedirs(diretorioCache, exist_ok=True)
+        pasta = os.path.join(diretorioCache, _chave(_hash_com_indice(caminho), parametros))
+        if not reconstruirCache and os.path.exists(os.path.join(pasta, 'meta.json')):
+            return _abrir_entrada(pasta)
+    except (OSError, ValueError, KeyError):
+        return _preparar(caminho, preparar)
+
+    malha = _preparar(caminho, preparar)
+    try:
+        _gravar_entrada(pasta, malha, caminho, parametros)
+        limpar_cache(manter=(pasta,))
+        return _abrir_entrada(pasta)
+    except OSError as e:
+        print(f"Aviso: não foi possível gravar o cache de malhas ({e})")
+        return malha
+
+
+def _preparar(caminho, preparar):
+    malha = dict(preparar(caminho))
+    v = np.asarray(malha['vertices'], dtype=np.float32).reshape(-1, 3)
+    if len(v):
+        malha['limites'] = np.array([v.min(axis=0), v.max(axis=0)], dtype=np.float32)
+    else:
+        malha['limites'] = np.zeros((2, 3), dtype=np.float32)
+    return malha
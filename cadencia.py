@@ -0,0 +1,153 @@
+# cadencia.py
+# [mvfm] - Ritmo dos quadros: limite de quadros por segundo, vsync, animação pelo relógio e redesenho sob demanda
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# A animação dos programas (rotação, interpolação do morph) avança pelo tempo decorrido num relógio
+# monotônico (passo()), e não por quadro: a velocidade é a mesma a 30, 60 ou 144 quadros por segundo.
+# Os quadros são limitados a `quadrosPorSegundo` (esperar_quadro() nos laços GLFW, agendar_glut() no
+# GLUT, no lugar do glutIdleFunc que redesenhava sem parar). No modo sob demanda o programa só redesenha
+# quando há entrada do usuário ou enquanto alguma animação está ligada; parado, fica bloqueado esperando
+# eventos, sem gastar CPU.
+#
+# Opções de linha de comando (tratadas por opcoes_cadencia):
+#    --fps=N          - limite de quadros por segundo (padrão: 60; 0 = sem limite)
+#    --no-vsync       - não sincroniza a troca de buffers com a tela
+#    --sob-demanda    - só redesenha com entrada do usuário ou enquanto houver animação
+
+import math
+import sys
+import time
+
+quadrosPorSegundo = 60
+vsync = True
+sobDemanda = False
+
+PASSO_MAXIMO = 0.1    # segundos; evita saltos na animação depois de uma pausa (janela arrastada, espera)
+ESPERA_MAXIMA = 0.5   # segundos; tempo máximo bloqueado esperando eventos no modo sob demanda (GLFW)
+
+_anterior = None      # instante do último passo()
+_proximo = 0.0        # prazo do próximo quadro
+_agendado = False     # GLUT: já existe um glutTimerFunc pendente
+
+
+def opcoes_cadencia(argv):
+    """Remove as opções --fps, --vsync/--no-vsync e --sob-demanda de argv, aplicando-as, e retorna os
+    argumentos restantes."""
+    global quadrosPorSegundo, vsync, sobDemanda
+    restantes = []
+    for arg in argv:
+        if arg.startswith('--fps='):
+            quadrosPorSegundo = max(0.0, float(arg.split('=', 1)[1]))
+        elif arg == '--vsync':
+            vsync = True
+        elif arg == '--no-vsync':
+            vsync = False
+        elif arg == '--sob-demanda':
+            sobDemanda = True
+        else:
+            restantes.append(arg)
+    return restantes
+
+
+def passo():
+    """Segundos decorridos desde o passo anterior (0 no primeiro), limitados a PASSO_MAXIMO."""
+    global _anterior
+    agora = time.monotonic()
+    dt = 0.0 if _anterior is None else min(agora - _anterior, PASSO_MAXIMO)
+    _anterior = agora
+    return dt
+
+
+def reiniciar():
+    """Faz o próximo passo() valer 0 (depois de o programa ficar parado esperando eventos)."""
+    global _anterior
+    _anterior = None
+
+
+def intervalo_quadro():
+    """Duração mínima de um quadro em segundos (0 sem limite)."""
+    return 1.0 / quadrosPorSegundo if quadrosPorSegundo > 0 else 0.0
+
+
+def tempo_ate_proximo():
+    """Segundos que faltam para o prazo do próximo quadro."""
+    return max(0.0, _proximo - time.monotonic())
+
+
+def marcar_quadro():
+    """Registra que um quadro foi desenhado e calcula o prazo do próximo. Se o programa ficou para trás
+    (quadro lento, pausa), o prazo recomeça de agora em vez de tentar recuperar os quadros perdidos."""
+    global _proximo
+    agora = time.monotonic()
+    intervalo = intervalo_quadro()
+    _proximo = _proximo + intervalo if _proximo + intervalo > agora else agora + intervalo
+
+
+def esperar_quadro():
+    """Dorme até o prazo do próximo quadro e o marca (laços GLFW)."""
+    espera = tempo_ate_proximo()
+    if espera > 0:
+        time.sleep(espera)
+    marcar_quadro()
+
+
+def esperar_eventos_glfw(animando):
+    """Fim de um quadro no laço GLFW: processa os eventos e segura o ritmo. No modo sob demanda e sem
+    animação, bloqueia até chegar um evento (ou ESPERA_MAXIMA)."""
+    import glfw
+    if sobDemanda and not animando:
+        glfw.wait_events_timeout(ESPERA_MAXIMA)
+        reiniciar()
+        marcar_quadro()
+    else:
+        glfw.poll_events()
+        esperar_quadro()
+
+
+def ativar_vsync_glfw():
+    """Liga (ou desliga, conforme `vsync`) a sincronização com a tela no contexto GLFW atual."""
+    import glfw
+    glfw.swap_interval(1 if vsync else 0)
+
+
+def ativar_vsync_glut():
+    """Tenta ligar (ou desligar, conforme `vsync`) a sincronização com a tela no contexto GLUT atual,
+    pelas extensões WGL/GLX de swap interval. Retorna True se conseguiu."""
+    from OpenGL.error import GLError, NullFunctionError
+    intervalo = 1 if vsync else 0
+    try:
+        if sys.platform.startswith('win'):
+            from OpenGL.WGL.EXT.swap_control import wglSwapIntervalEXT
+            return bool(wglSwapIntervalEXT(intervalo))
+        from OpenGL.GLX.MESA.swap_control import glXSwapIntervalMESA
+        return glXSwapIntervalMESA(intervalo) == 0
+    except (ImportError, AttributeError, OSError, GLError, NullFunctionError):
+        return False
+
+
+def agendar_glut():
+    """Pede ao GLUT um redesenho no prazo do próximo quadro. Só um temporizador fica pendente por vez."""
+    global _agendado
+    if _agendado:
+        return
+    _agendado = True
+    from OpenGL.GLUT import glutTimerFunc
+    glutTimerFunc(int(math.ceil(tempo_ate_proximo() * 1000)), _disparar_glut, 0)
+
+
+def _disparar_glut(valor):
+    global _agendado
+    from OpenGL.GLUT import glutPostRedisplay
+    _agendado = False
+    glutPostRedisplay()
+
+
+def fim_quadro_glut(animando):
+    """Fim do display no GLUT: marca o quadro e agenda o próximo, a menos que o modo seja sob demanda e
+    nada esteja animando (aí o próximo redesenho vem da entrada do usuário, via glutPostRedisplay)."""
+    marcar_quadro()
+    if animando or not sobDemanda:
+        agendar_glut()
+    else:
+        reiniciar()
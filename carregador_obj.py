@@ -0,0 +1,217 @@
+# carregador_obj.py
+# [mvfm] - Leitor de .OBJ vetorizado, compartilhado pelos visualizadores e pelos morphers
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Em vez de ler linha a linha com split()/float(), o arquivo inteiro é lido como bytes,
+# as linhas 'v'/'vn'/'vt' e 'f' são separadas por máscaras do NumPy e os números de cada
+# grupo são convertidos numa única chamada. Comentários ('#' até o fim da linha) são apagados antes.
+# ler_obj_blocos faz o mesmo bloco a bloco, para quem quer mostrar a malha enquanto ela chega
+# (carregamento_progressivo.py).
+
+import os
+
+import numpy as np
+
+TAMANHO_BLOCO = 4 << 20  # bytes por bloco em ler_obj_blocos
+
+NL = ord('\n')
+ESPACO = ord(' ')
+BARRA = ord('/')
+CERQUILHA = ord('#')
+
+# tipos de linha
+V, VN, VT, F = 1, 2, 3, 4
+
+
+def _tipos_de_linha(buf, inicios):
+    """Classifica cada linha pelo prefixo (0 para linhas ignoradas)."""
+    c0, c1, c2 = buf[inicios], buf[inicios + 1], buf[inicios + 2]
+    branco1 = (c1 == ESPACO) | (c1 == ord('\t'))
+    branco2 = (c2 == ESPACO) | (c2 == ord('\t'))
+    tipos = np.zeros(len(inicios), dtype=np.int8)
+    tipos[(c0 == ord('v')) & branco1] = V
+    tipos[(c0 == ord('v')) & (c1 == ord('n')) & branco2] = VN
+    tipos[(c0 == ord('v')) & (c1 == ord('t')) & branco2] = VT
+    tipos[(c0 == ord('f')) & branco1] = F
+    return tipos
+
+
+def _sem_comentarios(buf, fins):
+    """Troca por espaços tudo de '#' até o fim da linha (comentários no fim de linhas 'v'/'f' etc.)."""
+    cerquilhas = np.flatnonzero(buf == CERQUILHA)
+    if len(cerquilhas) == 0:
+        return buf
+    # primeira '#' de cada linha até o '\n' dela: +1 no início e -1 no fim, acumulados
+    linhas, primeira = np.unique(np.searchsorted(fins, cerquilhas), return_index=True)
+    marca = np.zeros(len(buf) + 1, dtype=np.int32)
+    np.add.at(marca, cerquilhas[primeira], 1)
+    np.add.at(marca, fins[linhas], -1)
+    buf = buf.copy()
+    buf[np.cumsum(marca[:-1]) > 0] = ESPACO
+    return buf
+
+
+def _resolver_indices(idx, vistos):
+    """Converte índices do OBJ (1-based, negativos relativos, 0 = ausente) para 0-based, com -1 para ausente."""
+    idx = idx.astype(np.int64)
+    return np.where(idx > 0, idx - 1, np.where(idx < 0, vistos + idx, -1)).astype(np.int32)
+
+
+def _vetores(valores, primeiro_valor, contagem, minimo):
+    """Monta um array (N,3) float32 a partir das linhas 'v'/'vn'/'vt'.
+    Linhas com menos de `minimo` componentes são descartadas; as com menos de 3 são completadas com 0."""
+    validas = contagem >= minimo
+    primeiro_valor, contagem = primeiro_valor[validas], contagem[validas]
+    saida = np.zeros((len(contagem), 3), dtype=np.float32)
+    for c in range(3):
+        tem = contagem > c
+        saida[tem, c] = valores[primeiro_valor[tem] + c]
+    return saida
+
+
+def _bloco(buf, tamanhos, selecao):
+    """Junta as linhas selecionadas num bloco de texto, trocando o prefixo ('v', 'vn', 'f', ...) por espaços."""
+    texto = buf[np.repeat(selecao, tamanhos)]
+    tamanhos = tamanhos[selecao]
+    offs = np.cumsum(tamanhos) - tamanhos
+    texto[offs] = ESPACO
+    texto[offs + 1] = ESPACO
+    return texto, offs
+
+
+def _tokens(texto, offs):
+    """Localiza os tokens separados por brancos. Retorna a posição de cada token e, por linha,
+    o índice do primeiro token e quantos tokens ela tem."""
+    branco = texto <= ESPACO
+    inicio_token = ~branco
+    inicio_token[1:] &= branco[:-1]
+    tokens = np.flatnonzero(inicio_token)
+    primeiro_token = np.searchsorted(tokens, offs)
+    tokens_por_linha = np.diff(np.append(primeiro_token, len(tokens)))
+    return tokens, primeiro_token, tokens_por_linha
+
+
+def _numeros(texto, dtype, esperado, caminho):
+    """Converte o bloco de texto em números de uma só vez (com 2 zeros extras no fim)."""
+    try:
+        valores = np.fromstring(texto.tobytes().decode('ascii', errors='replace'), dtype=dtype, sep=' ')
+    except ValueError:
+        valores = None
+    if valores is None or len(valores) != esperado:
+        raise ValueError(f"{caminho}: valor inválido no arquivo .OBJ")
+    return np.append(valores, np.zeros(2, dtype=dtype))
+
+
+def ler_obj(caminho):
+    """Lê um arquivo .OBJ inteiro e retorna um dict de arrays contíguos:
+    'vertices', 'normais', 'texcoords' (float32, (N,3)); 'faces', 'faces_texcoords', 'faces_normais'
+    (int32, (T,3), -1 quando ausente) já trianguladas em leque; e 'poligonos' (int32, (T,)),
+    o índice da face original de cada triângulo."""
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    return _ler_dados(dados, caminho)[0]
+
+
+def ler_obj_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """Lê o .OBJ em blocos de ~tamanho_bloco bytes (cortados em fim de linha), gerando para cada um
+    (modelo parcial, bytes lidos até aqui, tamanho do arquivo). O modelo parcial tem os mesmos arrays de
+    ler_obj, só com as linhas do bloco; os índices das faces já são globais (contam os v/vt/vn dos
+    blocos anteriores), assim como 'poligonos'."""
+    total = os.path.getsize(caminho)
+    vistos = {V: 0, VT: 0, VN: 0, F: 0}
+    resto = b''
+    with open(caminho, 'rb') as f:
+        while True:
+            bloco = f.read(tamanho_bloco)
+            dados = resto + bloco
+            if bloco:
+                corte = dados.rfind(b'\n') + 1
+                dados, resto = dados[:corte], dados[corte:]
+            if dados:
+                modelo, contagens = _ler_dados(dados, caminho, vistos)
+                for t in vistos:
+                    vistos[t] += contagens[t]
+                yield modelo, f.tell() - len(resto), total
+            if not bloco:
+                return
+
+
+def juntar_blocos(modelos):
+    """Junta os modelos parciais de ler_obj_blocos no mesmo dict que ler_obj retornaria."""
+    modelos = list(modelos)
+    if not modelos:
+        return _ler_dados(b'', '')[0]
+    return {chave: np.concatenate([m[chave] for m in modelos]) for chave in modelos[0]}
+
+
+def _ler_dados(dados, caminho, antes=None):
+    """Interpreta o texto de um .OBJ (inteiro ou um bloco de linhas completas). `antes` conta as linhas
+    v/vt/vn/f de blocos anteriores, para os índices negativos e a numeração dos polígonos. Retorna o
+    modelo e as contagens de linhas de cada tipo neste bloco."""
+    antes = antes or {V: 0, VT: 0, VN: 0, F: 0}
+    if not dados.endswith(b'\n'):
+        dados += b'\n'
+    # 3 bytes extras para poder olhar o prefixo de linhas curtas sem sair do buffer
+    buf = np.frombuffer(dados + b'\0\0\0', dtype=np.uint8)
+
+    fins = np.flatnonzero(buf == NL)
+    inicios = np.empty_like(fins)
+    inicios[0] = 0
+    inicios[1:] = fins[:-1] + 1
+    tamanhos = fins - inicios + 1
+    buf = _sem_comentarios(buf, fins)
+    tipos = _tipos_de_linha(buf, inicios)
+    buf = buf[:-3]
+
+    # v, vn e vt: todos os componentes convertidos juntos para float
+    sel = (tipos == V) | (tipos == VN) | (tipos == VT)
+    texto, offs = _bloco(buf, tamanhos, sel)
+    tokens, primeiro_token, contagem = _tokens(texto, offs)
+    valores = _numeros(texto, np.float64, len(tokens), caminho)
+    modelo = {}
+    for chave, tipo, minimo in (('vertices', V, 3), ('normais', VN, 3), ('texcoords', VT, 2)):
+        linhas = tipos[sel] == tipo
+        modelo[chave] = _vetores(valores, primeiro_token[linhas], contagem[linhas], minimo)
+    # as linhas curtas descartadas por _vetores deixam de contar (índices negativos e blocos seguintes)
+    minimos = np.where(tipos[sel] == VT, 2, 3)
+    tipos[np.flatnonzero(sel)[contagem < minimos]] = 0
+
+    # f: um canto por token; cada '/' no canto acrescenta mais um número (vt, vn)
+    sel = tipos == F
+    texto, offs = _bloco(buf, tamanhos, sel)
+    barras = np.flatnonzero(texto == BARRA)
+    # campos vazios ('1//3', '1/2/') viram 0 para que todo canto tenha um número depois de cada '/'
+    depois = texto[barras + 1]
+    vazios = barras[(depois == BARRA) | (depois <= ESPACO)]
+    if len(vazios):
+        texto = np.insert(texto, vazios + 1, ord('0'))
+        offs = offs + np.searchsorted(vazios, offs)
+        barras = np.flatnonzero(texto == BARRA)
+    tokens, primeiro_token, cantos = _tokens(texto, offs)
+    campos = 1 + np.bincount(np.searchsorted(tokens, barras, 'right') - 1, minlength=len(tokens))
+    primeiro_numero = np.cumsum(campos) - campos
+    texto[barras] = ESPACO
+    valores = _numeros(texto, np.int64, int(campos.sum()), caminho)
+
+    # quantos v/vt/vn já tinham aparecido antes de cada canto (para índices negativos)
+    linha_canto = np.repeat(np.arange(len(cantos)), cantos)
+    vistos = {t: antes[t] + np.cumsum(tipos == t)[sel][linha_canto] for t in (V, VT, VN)}
+
+    num = primeiro_numero
+    idx_v = _resolver_indices(valores[num], vistos[V])
+    idx_vt = _resolver_indices(np.where(campos >= 2, valores[num + 1], 0), vistos[VT])
+    idx_vn = _resolver_indices(np.where(campos >= 3, valores[num + 2], 0), vistos[VN])
+
+    # triangulação em leque: polígono de n cantos -> n-2 triângulos (0, k, k+1)
+    n_tri = np.maximum(cantos - 2, 0)
+    locais = np.repeat(np.arange(len(cantos), dtype=np.int32), n_tri)
+    k = np.arange(n_tri.sum()) - np.repeat(np.cumsum(n_tri) - n_tri, n_tri) + 1
+    base = primeiro_token[locais]
+    tri = np.stack([base, base + k, base + k + 1], axis=1)
+
+    modelo['faces'] = idx_v[tri]
+    modelo['faces_texcoords'] = idx_vt[tri]
+    modelo['faces_normais'] = idx_vn[tri]
+    modelo['poligonos'] = locais + np.int32(antes[F])
+    return modelo, {t: int(np.count_nonzero(tipos == t)) for t in (V, VT, VN, F)}
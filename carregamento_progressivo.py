@@ -0,0 +1,152 @@
+# carregamento_progressivo.py
+# [mvfm] - Leitura do .OBJ numa thread de fundo, com a malha parcial aparecendo enquanto chega
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# iniciar_carregamento abre uma thread que lê o arquivo em blocos (carregador_obj.ler_obj_blocos) e,
+# a cada bloco, põe numa fila os triângulos que já podem ser desenhados: posições por canto (sem
+# índices) e a normal de cada canto (a do arquivo, ou a da face enquanto a do arquivo não chegou).
+# Faces que apontam para vértices ainda não lidos esperam os blocos seguintes. A thread de desenho
+# tira os blocos da fila com blocos_prontos() a cada quadro e os envia para a placa, sem travar a
+# janela nem a entrada.
+#
+# Terminada a leitura, a mesma thread roda o preparo completo (`preparar`, o carregamento normal com
+# cache, níveis de detalhe, normais...) recebendo uma função de leitura que devolve os blocos já lidos
+# juntos, para não ler o arquivo de novo. Se o cache_malha já tiver a entrada, a leitura em blocos é
+# pulada. cancelar() interrompe a leitura entre dois blocos (ou descarta o preparo), e o que já foi
+# lido continua na tela.
+#
+# O estado é um dict: 'fase' ('lendo', 'preparando', 'pronto', 'cancelado' ou 'erro'), 'lidos' e
+# 'total' (bytes), 'resultado' (retorno de preparar) e 'erro' (a exceção, na fase 'erro').
+
+import os
+import queue
+import threading
+
+import numpy as np
+
+from carregador_obj import ler_obj, ler_obj_blocos, juntar_blocos, TAMANHO_BLOCO
+from cache_malha import em_cache
+
+FASES_ATIVAS = ('lendo', 'preparando')
+
+
+def iniciar_carregamento(caminho, preparar, parametros=None, tamanho_bloco=TAMANHO_BLOCO):
+    """Começa a ler `caminho` em segundo plano e retorna o dict de estado. `preparar(ler)` é chamado no
+    fim, na thread de fundo, com uma função ler(caminho) que devolve o modelo inteiro (no formato de
+    ler_obj); o retorno vai para estado['resultado']. `parametros` são os do cache_malha usados por
+    `preparar`: se a entrada já existir, o arquivo não é lido em blocos."""
+    estado = {'fase': 'lendo', 'lidos': 0, 'total': os.path.getsize(caminho), 'resultado': None,
+              'erro': None, 'fila': queue.Queue(), 'cancelar': threading.Event()}
+    thread = threading.Thread(target=_trabalhar, args=(estado, caminho, preparar, parametros, tamanho_bloco),
+                              name='carregamento', daemon=True)
+    estado['thread'] = thread
+    thread.start()
+    return estado
+
+
+def cancelar(estado):
+    """Pede para a thread parar; o que já está na fila continua disponível."""
+    estado['cancelar'].set()
+
+
+def carregando(estado):
+    return estado is not None and estado['fase'] in FASES_ATIVAS
+
+
+def progresso(estado):
+    """Fração (0 a 1) do arquivo já lida."""
+    return estado['lidos'] / estado['total'] if estado['total'] else 1.0
+
+
+def blocos_prontos(estado):
+    """Retira da fila, sem esperar, os blocos (posicoes (3T,3), normais (3T,3)) que já chegaram."""
+    blocos = []
+    while True:
+        try:
+            blocos.append(estado['fila'].get_nowait())
+        except queue.Empty:
+            return blocos
+
+
+def _trabalhar(estado, caminho, preparar, parametros, tamanho_bloco):
+    try:
+        if parametros is not None and em_cache(caminho, parametros):
+            ler = ler_obj
+        else:
+            modelos = _ler_em_blocos(estado, caminho, tamanho_bloco)
+            if modelos is None:
+                estado['fase'] = 'cancelado'
+                return
+            ler = lambda _caminho: juntar_blocos(modelos)
+        estado['lidos'] = estado['total']
+        estado['fase'] = 'preparando'
+        resultado = preparar(ler)
+        if estado['cancelar'].is_set():
+            estado['fase'] = 'cancelado'
+            return
+        estado['resultado'] = resultado
+        estado['fase'] = 'pronto'
+    except Exception as e:
+        estado['erro'] = e
+        estado['fase'] = 'erro'
+
+
+def _ler_em_blocos(estado, caminho, tamanho_bloco):
+    """Lê os blocos, pondo na fila os triângulos prontos de cada um. Retorna a lista de modelos
+    parciais, ou None se foi cancelado."""
+    modelos = []
+    vertices, normais = _Crescente(), _Crescente()
+    pendentes = None  # faces (e índices de normal) que esperam vértices dos próximos blocos
+    for modelo, lidos, _ in ler_obj_blocos(caminho, tamanho_bloco):
+        if estado['cancelar'].is_set():
+            return None
+        modelos.append(modelo)
+        vertices.acrescentar(modelo['vertices'])
+        normais.acrescentar(modelo['normais'])
+        faces, faces_normais = modelo['faces'], modelo['faces_normais']
+        if pendentes is not None:
+            faces = np.concatenate([pendentes[0], faces])
+            faces_normais = np.concatenate([pendentes[1], faces_normais])
+        prontas = (faces < vertices.n).all(axis=1)
+        pendentes = (faces[~prontas], faces_normais[~prontas])
+        if prontas.any():
+            estado['fila'].put(_triangulos(vertices.dados(), normais.dados(), faces[prontas],
+                                           faces_normais[prontas]))
+        estado['lidos'] = lidos
+    return modelos
+
+
+def _triangulos(vertices, normais, faces, faces_normais):
+    """Posições e normais por canto (3T,3) dos triângulos; cantos sem normal válida usam a da face."""
+    posicoes = vertices[faces]
+    cruz = np.cross(posicoes[:, 1] - posicoes[:, 0], posicoes[:, 2] - posicoes[:, 0])
+    norma = np.linalg.norm(cruz, axis=1)
+    cruz[norma == 0] = (0.0, 0.0, 1.0)
+    norma[norma == 0] = 1.0
+    normal_canto = np.repeat((cruz / norma[:, None])[:, None, :], 3, axis=1)
+    validas = (faces_normais >= 0) & (faces_normais < len(normais))
+    normal_canto[validas] = normais[faces_normais[validas]]
+    return (np.ascontiguousarray(posicoes.reshape(-1, 3), dtype=np.float32),
+            np.ascontiguousarray(normal_canto.reshape(-1, 3), dtype=np.float32))
+
+
+class _Crescente:
+    """Array (N,3) float32 que cresce por blocos, dobrando a capacidade (sem recopiar tudo a cada bloco)."""
+    __slots__ = ('_dados', 'n')
+
+    def __init__(self):
+        self._dados = np.empty((0, 3), dtype=np.float32)
+        self.n = 0
+
+    def acrescentar(self, linhas):
+        fim = self.n + len(linhas)
+        if fim > len(self._dados):
+            novo = np.empty((max(fim, 2 * len(self._dados)), 3), dtype=np.float32)
+            novo[:self.n] = self._dados[:self.n]
+            self._dados = novo
+        self._dados[self.n:fim] = linhas
+        self.n = fim
+
+    def dados(self):
+        return self._dados[:self.n]
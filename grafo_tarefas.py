@@ -0,0 +1,81 @@
+# grafo_tarefas.py
+# [mvfm] - Grafo de tarefas pequeno sobre um pool de threads, com o tempo de cada etapa
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Cada tarefa é uma função e a lista das tarefas de que depende; ela roda assim que todas as
+# dependências terminam, recebendo os resultados delas como argumentos (na ordem da lista). Tarefas
+# independentes (ler e preparar o modelo A e o modelo B, por exemplo) rodam ao mesmo tempo. Threads
+# bastam aqui: a leitura, o cache com mmap e as operações do NumPy soltam o GIL na maior parte do tempo,
+# e os resultados (arrays grandes) não precisam ser copiados entre processos.
+#
+# executar_grafo guarda, para cada tarefa, o início e o fim (relativos ao começo do grafo) e a thread em
+# que rodou; imprimir_tempos mostra a tabela e compara o tempo total com a soma das etapas.
+
+import concurrent.futures
+import os
+import threading
+import time
+
+
+def executar_grafo(tarefas, trabalhadores=None, tempos=None):
+    """Executa `tarefas` ({nome: (funcao, [dependencias])}) e retorna {nome: resultado}.
+    Se uma tarefa lança uma exceção, as que ainda não começaram são canceladas e a exceção é relançada.
+    `tempos` (lista), se dada, recebe um dict por tarefa: 'nome', 'inicio' e 'fim' (segundos desde o
+    começo) e 'thread'."""
+    faltam = {nome: set(deps) for nome, (_, deps) in tarefas.items()}
+    for nome, deps in faltam.items():
+        desconhecidas = deps - tarefas.keys()
+        if desconhecidas:
+            raise ValueError(f"tarefa {nome} depende de tarefas inexistentes: {sorted(desconhecidas)}")
+    # como o padrão do ThreadPoolExecutor: leitura de arquivo sobrepõe bem mesmo com poucos núcleos
+    trabalhadores = trabalhadores or max(1, min(len(tarefas), (os.cpu_count() or 1) + 4))
+    resultados = {}
+    inicio = time.perf_counter()
+
+    def rodar(nome):
+        funcao, deps = tarefas[nome]
+        comeco = time.perf_counter()
+        resultado = funcao(*(resultados[d] for d in deps))
+        if tempos is not None:
+            tempos.append({'nome': nome, 'inicio': comeco - inicio, 'fim': time.perf_counter() - inicio,
+                           'thread': threading.current_thread().name})
+        return resultado
+
+    with concurrent.futures.ThreadPoolExecutor(trabalhadores, thread_name_prefix='tarefa') as pool:
+        pendentes = {}
+
+        def liberar():
+            for nome in [n for n, deps in faltam.items() if not deps]:
+                del faltam[nome]
+                pendentes[pool.submit(rodar, nome)] = nome
+
+        liberar()
+        while pendentes:
+            feitos, _ = concurrent.futures.wait(pendentes, return_when=concurrent.futures.FIRST_COMPLETED)
+            for futuro in feitos:
+                nome = pendentes.pop(futuro)
+                if futuro.exception() is not None:
+                    for outro in pendentes:
+                        outro.cancel()
+                    raise futuro.exception()
+                resultados[nome] = futuro.result()
+                for deps in faltam.values():
+                    deps.discard(nome)
+            liberar()
+    if faltam:
+        raise ValueError(f"dependências circulares entre as tarefas: {sorted(faltam)}")
+    return resultados
+
+
+def imprimir_tempos(tempos, titulo='etapas'):
+    """Tabela com início, duração e thread de cada tarefa, na ordem em que começaram."""
+    if not tempos:
+        return
+    print(f"{titulo:<24} {'início (ms)':>12} {'duração (ms)':>13}  thread")
+    for t in sorted(tempos, key=lambda t: t['inicio']):
+        print(f"{t['nome']:<24} {t['inicio'] * 1000:>12.1f} {(t['fim'] - t['inicio']) * 1000:>13.1f}  "
+              f"{t['thread']}")
+    total = max(t['fim'] for t in tempos)
+    soma = sum(t['fim'] - t['inicio'] for t in tempos)
+    print(f"{'total':<24} {'':>12} {total * 1000:>13.1f}  (soma das etapas: {soma * 1000:.1f} ms)")
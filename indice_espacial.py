@@ -0,0 +1,174 @@
+# indice_espacial.py
+# [mvfm] - Árvore k-d vetorizada para busca de vizinhos mais próximos (associação de faces no morph)
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# A árvore é implícita (nó i tem filhos 2i e 2i+1) e guardada num dict de arrays, então pode
+# ser construída uma vez e consultada com todos os pontos de uma vez, sem laços por ponto.
+# A consulta desce até a folha de cada ponto para ter uma primeira distância limite, percorre a
+# árvore nível a nível descartando os nós cuja caixa está mais longe que esse limite e então visita
+# as folhas restantes em rodadas, da mais próxima para a mais distante, apertando o limite.
+
+import numpy as np
+
+# folga relativa na poda: as distâncias são calculadas no dtype dos pontos (float32, em geral)
+FOLGA_PODA = 1e-5
+
+
+def construir_kdtree(pontos, folha=32):
+    """Constrói a árvore k-d sobre `pontos` (N,3). Cada folha fica com ~`folha` pontos."""
+    pontos = np.ascontiguousarray(pontos).reshape(-1, 3)
+    folha = max(int(folha), 2)
+    n = len(pontos)
+    prof = int(np.ceil(np.log2(n / folha))) if n > folha else 0
+
+    p = pontos.astype(np.float64)
+    ordem = np.arange(n)
+    n_nos = 2 ** (prof + 1)
+    lo = np.full((n_nos, 3), np.inf)
+    hi = np.full((n_nos, 3), -np.inf)
+    eixo = np.zeros(n_nos, dtype=np.int8)
+    corte = np.zeros(n_nos)
+
+    for d in range(prof + 1):
+        nos = np.arange(2 ** d, 2 ** (d + 1))
+        limites = (np.arange(2 ** d + 1) * n) // 2 ** d
+        if n == 0:
+            break
+        pts = p[ordem]
+        lo[nos] = np.minimum.reduceat(pts, limites[:-1], axis=0)
+        hi[nos] = np.maximum.reduceat(pts, limites[:-1], axis=0)
+        if d == prof:
+            break
+
+        # ordena cada segmento pelo eixo de maior extensão e corta na mediana
+        ext = hi[nos] - lo[nos]
+        ax = np.argmax(ext, axis=1)
+        eixo[nos] = ax
+        seg = np.repeat(np.arange(2 ** d), np.diff(limites))
+        coord = pts[np.arange(n), ax[seg]]
+        frac = (coord - lo[nos, ax][seg]) / (ext[np.arange(2 ** d), ax][seg] + 1e-300) * 0.5
+        ordem = ordem[np.argsort(seg + frac, kind='stable')]
+        meio = ((2 * np.arange(2 ** d) + 1) * n) // 2 ** (d + 1)
+        corte[nos] = p[ordem[meio], ax]
+
+    # folhas como matriz (L, m) de índices, completada com -1
+    limites = (np.arange(2 ** prof + 1) * n) // 2 ** prof
+    tam = np.diff(limites)
+    m = int(tam.max()) if n else 1
+    folhas = np.full((2 ** prof, m), -1, dtype=np.int64)
+    # coordenadas dos pontos de cada folha, com inf no preenchimento (distância infinita)
+    pontos_folhas = np.full((2 ** prof, m, 3), np.inf, dtype=pontos.dtype)
+    if n:
+        seg = np.repeat(np.arange(2 ** prof), tam)
+        folhas[seg, np.arange(n) - limites[seg]] = ordem
+        pontos_folhas[seg, np.arange(n) - limites[seg]] = pontos[ordem]
+
+    return {'pontos': pontos, 'prof': prof, 'lo': lo, 'hi': hi, 'eixo': eixo, 'corte': corte,
+            'folhas': folhas, 'pontos_folhas': pontos_folhas}
+
+
+def _folhas_ordenadas(arv, q64, limite2):
+    """Percorre a árvore por nível, mantendo só os pares (consulta, nó) cuja caixa pode ter algo dentro
+    do limite. Retorna os pares (consulta, folha, distância² até a caixa) ordenados por consulta e distância."""
+    C = len(q64)
+    pq = np.arange(C)
+    pn = np.ones(C, dtype=np.int64)
+    perto2 = np.zeros(C)
+    for _ in range(arv['prof']):
+        pq = np.repeat(pq, 2)
+        pn = np.repeat(pn, 2) * 2
+        pn[1::2] += 1
+        qq = q64[pq]
+        lo, hi = arv['lo'][pn], arv['hi'][pn]
+        fora = np.maximum(lo - qq, 0) + np.maximum(qq - hi, 0)
+        perto2 = np.einsum('ij,ij->i', fora, fora)
+        manter = perto2 <= limite2[pq]
+        pq, pn, perto2 = pq[manter], pn[manter], perto2[manter]
+
+    ordem = np.lexsort((perto2, pq))
+    return pq[ordem], pn[ordem] - 2 ** arv['prof'], perto2[ordem]
+
+
+def _consultar(arv, q, k):
+    C = len(q)
+    prof = arv['prof']
+    n = len(arv['pontos'])
+    q64 = q.astype(np.float64)
+    linhas = np.arange(C)
+
+    # desce até a folha de cada consulta; a k-ésima distância dentro dela é o limite inicial
+    no = np.ones(C, dtype=np.int64)
+    for _ in range(prof):
+        direita = q64[linhas, arv['eixo'][no]] >= arv['corte'][no]
+        no = 2 * no + direita
+    melhor_idx = np.full((C, k), n, dtype=np.int64)
+    melhor_dist = np.full((C, k), np.inf)
+    melhor_idx, melhor_dist = _juntar(arv, q, linhas, no - 2 ** prof, melhor_idx, melhor_dist, k)
+    limite = melhor_dist[:, k - 1].astype(np.float64)
+    limite2 = limite * limite * (1 + FOLGA_PODA) + 1e-12
+
+    # visita as folhas restantes em rodadas, da mais próxima para a mais distante de cada consulta,
+    # apertando o limite a cada rodada (busca best-first feita em lote)
+    pq, pf, perto2 = _folhas_ordenadas(arv, q64, limite2)
+    rank = np.arange(len(pq)) - np.searchsorted(pq, pq)
+    ordem = np.argsort(rank, kind='stable')
+    pq, pf, perto2, rank = pq[ordem], pf[ordem], perto2[ordem], rank[ordem]
+    fronteiras = np.searchsorted(rank, np.arange(rank.max() + 2 if len(rank) else 1))
+    for r in range(len(fronteiras) - 1):
+        a, b = fronteiras[r], fronteiras[r + 1]
+        vivos = perto2[a:b] <= limite2[pq[a:b]]
+        if not vivos.any():
+            break
+        qi, fi = pq[a:b][vivos], pf[a:b][vivos]
+        # a folha de onde a consulta desceu já foi vista
+        nova = fi != no[qi] - 2 ** prof
+        qi, fi = qi[nova], fi[nova]
+        if len(qi) == 0:
+            continue
+        melhor_idx[qi], melhor_dist[qi] = _juntar(arv, q, qi, fi, melhor_idx[qi], melhor_dist[qi], k)
+        lim = melhor_dist[qi, k - 1].astype(np.float64)
+        limite2[qi] = lim * lim * (1 + FOLGA_PODA) + 1e-12
+
+    melhor_idx[melhor_idx >= n] = -1
+    return melhor_idx, melhor_dist
+
+
+def _juntar(arv, q, qi, fi, melhor_idx, melhor_dist, k):
+    """Junta os pontos da folha fi[j] aos k melhores atuais da consulta qi[j]."""
+    n = len(arv['pontos'])
+    cand = arv['folhas'][fi]
+    diff = arv['pontos_folhas'][fi] - q[qi][:, None, :]
+    d = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+    cand = np.where(cand >= 0, cand, n)
+
+    # menor distância primeiro; no empate, o menor índice (como np.argmin)
+    if k == 1:
+        dmin = d.min(axis=1)
+        imin = np.where(d == dmin[:, None], cand, n).min(axis=1)
+        atual_d, atual_i = melhor_dist[:, 0], melhor_idx[:, 0]
+        troca = (dmin < atual_d) | ((dmin == atual_d) & (imin < atual_i))
+        return np.where(troca, imin, atual_i)[:, None], np.where(troca, dmin, atual_d)[:, None]
+
+    todos_idx = np.concatenate([melhor_idx, cand], axis=1)
+    todos_dist = np.concatenate([melhor_dist, d], axis=1)
+    ordem = np.lexsort((todos_idx, todos_dist), axis=1)[:, :k]
+    return np.take_along_axis(todos_idx, ordem, 1), np.take_along_axis(todos_dist, ordem, 1)
+
+
+def vizinhos_mais_proximos(arv, consultas, k=1, bloco=8192):
+    """Para cada ponto de `consultas` (Q,3), os `k` pontos mais próximos da árvore.
+    Retorna (idx (Q,k), dist (Q,k)), em ordem de distância e, no empate, de índice.
+    Posições sem vizinho (k maior que o número de pontos) ficam com -1 / inf."""
+    consultas = np.ascontiguousarray(consultas).reshape(-1, 3)
+    k = max(int(k), 1)
+    dtype = np.result_type(arv['pontos'].dtype, consultas.dtype)
+    idx = np.full((len(consultas), k), -1, dtype=np.int64)
+    dist = np.full((len(consultas), k), np.inf, dtype=dtype)
+    if len(arv['pontos']) == 0:
+        return idx, dist
+    for ini in range(0, len(consultas), bloco):
+        fim = ini + bloco
+        i, d = _consultar(arv, consultas[ini:fim], k)
+        idx[ini:fim], dist[ini:fim] = i, d
+    return idx, dist
@@ -0,0 +1,248 @@
+# instrumentacao.py
+# [mvfm] - Medição do tempo de cada etapa do quadro (CPU e GPU), para o HUD e para exportar
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Cada etapa do display (interpolação, envio para a placa, normais, HUD, swap...) fica dentro de
+# `with etapa('nome'):`. Com a instrumentação ligada, a etapa guarda o tempo de CPU (perf_counter_ns) e,
+# se o contexto tiver GL_TIME_ELAPSED (GL 3.3 / ARB_timer_query), o tempo de GPU numa query que só é
+# lida quadros depois, quando o resultado já está disponível (sem travar o pipeline). Os últimos
+# `quadrosGuardados` quadros ficam num buffer circular; linhas_hud() resume médias e percentis e
+# exportar() grava um trace do Chrome (chrome://tracing, Perfetto) ou um CSV.
+#
+# Desligada, etapa() devolve sempre o mesmo contexto vazio: o custo é uma chamada de função por etapa.
+#
+# Opções de linha de comando (tratadas por opcoes_instrumentacao):
+#    --perfil             - começa com a instrumentação ligada
+#    --perfil-quadros=N   - quantos quadros guardar (padrão: 300)
+#    --perfil-saida=ARQ   - arquivo gravado pela tecla de exportar (.json = trace do Chrome, .csv)
+
+import collections
+import contextlib
+import csv
+import ctypes
+import json
+import os
+import time
+
+ativo = False
+quadrosGuardados = 300
+arquivoSaida = 'perfil_quadros.json'
+
+# quadros: cada um é [inicio_ns, duracao_ns, etapas], etapas = lista de [nome, inicio_ns, cpu_ns, gpu_ns]
+_quadros = collections.deque(maxlen=quadrosGuardados)
+_atual = None
+_profundidade = 0
+_suporte_gpu = None
+_queries_livres = []
+_pendentes = collections.deque()   # (registro da etapa, query)
+_resumo = {'instante': 0.0, 'linhas': []}
+_nulo = contextlib.nullcontext()
+
+
+def opcoes_instrumentacao(argv):
+    """Remove as opções --perfil* de argv, aplicando-as, e retorna os argumentos restantes."""
+    global ativo, quadrosGuardados, arquivoSaida, _quadros
+    restantes = []
+    for arg in argv:
+        if arg == '--perfil':
+            ativo = True
+        elif arg.startswith('--perfil-quadros='):
+            quadrosGuardados = max(1, int(arg.split('=', 1)[1]))
+            _quadros = collections.deque(maxlen=quadrosGuardados)
+        elif arg.startswith('--perfil-saida='):
+            arquivoSaida = arg.split('=', 1)[1]
+        else:
+            restantes.append(arg)
+    return restantes
+
+
+def alternar():
+    """Liga/desliga a instrumentação (os quadros já guardados são mantidos)."""
+    global ativo, _atual
+    ativo = not ativo
+    _atual = None
+    return ativo
+
+
+def suporta_gpu():
+    """Verifica (uma vez) se o contexto atual tem queries GL_TIME_ELAPSED."""
+    global _suporte_gpu
+    if _suporte_gpu is None:
+        from OpenGL.GL import glGetString, GL_VERSION, GL_EXTENSIONS, glGenQueries
+        from OpenGL.error import GLError, NullFunctionError
+        try:
+            versao = glGetString(GL_VERSION) or b''
+            extensoes = glGetString(GL_EXTENSIONS) or b''
+            maior, menor = (int(x) for x in versao.split()[0].split(b'.')[:2])
+            _suporte_gpu = bool(glGenQueries) and ((maior, menor) >= (3, 3) or b'GL_ARB_timer_query' in extensoes)
+        except (GLError, NullFunctionError, ValueError, IndexError):
+            _suporte_gpu = False
+    return _suporte_gpu
+
+
+def _nova_query():
+    from OpenGL.GL import glGenQueries
+    if not _queries_livres:
+        _queries_livres.extend(int(q) for q in glGenQueries(16))
+    return _queries_livres.pop()
+
+
+def _coletar_gpu():
+    """Lê as queries que já terminaram, na ordem em que foram feitas, sem esperar pelas outras."""
+    from OpenGL.GL import glGetQueryObjectiv, GL_QUERY_RESULT_AVAILABLE, GL_QUERY_RESULT
+    # o wrapper do PyOpenGL para glGetQueryObjectui64v não sabe alocar a saída de 64 bits
+    from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v
+    valor = ctypes.c_uint64(0)
+    while _pendentes:
+        registro, query = _pendentes[0]
+        if not glGetQueryObjectiv(query, GL_QUERY_RESULT_AVAILABLE):
+            break
+        glGetQueryObjectui64v(query, GL_QUERY_RESULT, ctypes.byref(valor))
+        registro[3] = valor.value
+        _queries_livres.append(query)
+        _pendentes.popleft()
+
+
+def inicio_quadro():
+    """Marca o começo de um quadro."""
+    global _atual
+    if not ativo:
+        return
+    if _suporte_gpu:
+        _coletar_gpu()
+    _atual = [time.perf_counter_ns(), 0, []]
+
+
+def fim_quadro():
+    """Fecha o quadro atual e o guarda no buffer circular."""
+    global _atual
+    if not ativo or _atual is None:
+        return
+    _atual[1] = time.perf_counter_ns() - _atual[0]
+    _quadros.append(_atual)
+    _atual = None
+
+
+@contextlib.contextmanager
+def _medir(nome):
+    global _profundidade
+    registro = [nome, time.perf_counter_ns(), 0, None]
+    # queries GL_TIME_ELAPSED não podem ser aninhadas: só as etapas de fora medem a GPU
+    query = None
+    if _profundidade == 0 and suporta_gpu():
+        from OpenGL.GL import glBeginQuery, GL_TIME_ELAPSED
+        query = _nova_query()
+        glBeginQuery(GL_TIME_ELAPSED, query)
+    _profundidade += 1
+    try:
+        yield
+    finally:
+        _profundidade -= 1
+        if query is not None:
+            from OpenGL.GL import glEndQuery, GL_TIME_ELAPSED
+            glEndQuery(GL_TIME_ELAPSED)
+            _pendentes.append((registro, query))
+        registro[2] = time.perf_counter_ns() - registro[1]
+        if _atual is not None:
+            _atual[2].append(registro)
+
+
+@contextlib.contextmanager
+def _medir_cpu(nome):
+    registro = [nome, time.perf_counter_ns(), 0, None]
+    try:
+        yield
+    finally:
+        registro[2] = time.perf_counter_ns() - registro[1]
+        if _atual is not None:
+            _atual[2].append(registro)
+
+
+def etapa(nome, gl=True):
+    """Contexto que mede uma etapa do quadro. Com gl=False a etapa não abre query de GPU (ex.: código
+    só de CPU, ou o swap, que não pode ficar dentro de uma query)."""
+    if not ativo or _atual is None:
+        return _nulo
+    if not gl:
+        return _medir_cpu(nome)
+    return _medir(nome)
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100.0 * (len(ordenados) - 1))))]
+
+
+def linhas_hud(intervalo=0.25):
+    """Linhas de texto para o HUD: tempo entre quadros (média e percentis) e média de CPU/GPU por etapa
+    nos quadros guardados. O resumo é refeito no máximo a cada `intervalo` segundos."""
+    agora = time.perf_counter()
+    if agora - _resumo['instante'] < intervalo:
+        return _resumo['linhas']
+    _resumo['instante'] = agora
+
+    quadros = list(_quadros)
+    if len(quadros) < 2:
+        _resumo['linhas'] = ["perfil: coletando..."]
+        return _resumo['linhas']
+
+    intervalos = [(b[0] - a[0]) / 1e6 for a, b in zip(quadros, quadros[1:])]
+    media = sum(intervalos) / len(intervalos)
+    linhas = [f"quadro: {media:.2f} ms ({1000.0 / media if media else 0:.0f} fps) | "
+              f"p50 {_percentil(intervalos, 50):.2f} p95 {_percentil(intervalos, 95):.2f} "
+              f"p99 {_percentil(intervalos, 99):.2f} ms | {len(quadros)} quadros"]
+
+    cpu, gpu, ordem = {}, {}, []
+    for quadro in quadros:
+        for nome, _, cpu_ns, gpu_ns in quadro[2]:
+            if nome not in cpu:
+                cpu[nome], gpu[nome] = [], []
+                ordem.append(nome)
+            cpu[nome].append(cpu_ns)
+            if gpu_ns is not None:
+                gpu[nome].append(gpu_ns)
+    for nome in ordem:
+        texto = f"  {nome}: cpu {sum(cpu[nome]) / len(cpu[nome]) / 1e6:.3f} ms"
+        if gpu[nome]:
+            texto += f" | gpu {sum(gpu[nome]) / len(gpu[nome]) / 1e6:.3f} ms"
+        linhas.append(texto)
+    _resumo['linhas'] = linhas
+    return linhas
+
+
+def exportar(caminho=None):
+    """Grava os quadros guardados: trace do Chrome (.json) ou CSV (.csv). Retorna o caminho gravado."""
+    caminho = caminho or arquivoSaida
+    quadros = list(_quadros)
+    if not quadros:
+        raise ValueError("nenhum quadro medido (ligue a instrumentação antes)")
+    origem = quadros[0][0]
+
+    if os.path.splitext(caminho)[1].lower() == '.csv':
+        with open(caminho, 'w', newline='', encoding='utf-8') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(['quadro', 'etapa', 'inicio_ms', 'cpu_ms', 'gpu_ms'])
+            for i, (inicio, duracao, etapas) in enumerate(quadros):
+                escritor.writerow([i, 'quadro', f"{(inicio - origem) / 1e6:.4f}", f"{duracao / 1e6:.4f}", ''])
+                for nome, inicio_etapa, cpu_ns, gpu_ns in etapas:
+                    escritor.writerow([i, nome, f"{(inicio_etapa - origem) / 1e6:.4f}", f"{cpu_ns / 1e6:.4f}",
+                                       '' if gpu_ns is None else f"{gpu_ns / 1e6:.4f}"])
+        return caminho
+
+    # formato de eventos do Chrome: 'X' = evento completo, tempos em microssegundos
+    eventos = [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 1, 'args': {'name': 'CPU'}},
+               {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 2, 'args': {'name': 'GPU (duração)'}}]
+    for i, (inicio, duracao, etapas) in enumerate(quadros):
+        eventos.append({'name': f"quadro {i}", 'cat': 'quadro', 'ph': 'X', 'pid': 1, 'tid': 1,
+                        'ts': (inicio - origem) / 1e3, 'dur': duracao / 1e3})
+        for nome, inicio_etapa, cpu_ns, gpu_ns in etapas:
+            ts = (inicio_etapa - origem) / 1e3
+            eventos.append({'name': nome, 'cat': 'cpu', 'ph': 'X', 'pid': 1, 'tid': 1, 'ts': ts, 'dur': cpu_ns / 1e3})
+            if gpu_ns is not None:
+                # o instante em que a GPU executou não é conhecido; a duração fica alinhada ao início na CPU
+                eventos.append({'name': nome, 'cat': 'gpu', 'ph': 'X', 'pid': 1, 'tid': 2, 'ts': ts,
+                                'dur': gpu_ns / 1e3})
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, f)
+    return caminho
@@ -0,0 +1,131 @@
+# malha.py
+# [mvfm] - Malha em arrays contíguos (classe com __slots__) no lugar do dict de listas do morpher
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Uma Malha guarda só arrays tipados: vértices float32 (N,3), faces int32 (F,3), normais float32 (K,3)
+# e limites float32 (2,3), mais os dados derivados que são pedidos muitas vezes (centróides e normais
+# das faces), calculados na primeira vez e descartados quando os vértices mudam (invalidar). Com
+# __slots__ a instância não tem __dict__, e normalizar trabalha sobre o próprio array de vértices, sem
+# converter para uma lista de ndarrays pequenos e de volta.
+#
+# Durante a migração a Malha ainda responde como o dict antigo: malha['vertices'], malha['faces'],
+# malha['normals'] (ou 'normais') e malha['limites'], além de keys() para dict(malha).
+
+import numpy as np
+
+# nome antigo (chave do dict) -> atributo
+_CHAVES = {'vertices': 'vertices', 'faces': 'faces', 'normals': 'normais', 'normais': 'normais',
+           'limites': 'limites'}
+
+
+class Malha:
+    __slots__ = ('vertices', 'faces', 'normais', 'limites', '_centroides', '_normais_faces')
+
+    def __init__(self, vertices, faces, normais=None, limites=None):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+        self.faces = np.ascontiguousarray(faces, dtype=np.int32).reshape(-1, 3)
+        self.normais = (np.zeros((0, 3), dtype=np.float32) if normais is None
+                        else np.ascontiguousarray(normais, dtype=np.float32).reshape(-1, 3))
+        self.limites = None if limites is None else np.asarray(limites, dtype=np.float32)
+        self._centroides = None
+        self._normais_faces = None
+        if self.limites is None:
+            self.atualizar_limites()
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Malha a partir de um dict de arrays (ler_obj, entrada do cache_malha ou o dict antigo). Arrays
+        já contíguos e do tipo certo (como os do cache, com mmap) são usados sem cópia."""
+        normais = dados['normais'] if 'normais' in dados else dados.get('normals')
+        return cls(dados['vertices'], dados['faces'], normais, dados.get('limites'))
+
+    def como_dict(self):
+        """Os arrays no formato do cache_malha (chaves do dict antigo)."""
+        return {'vertices': self.vertices, 'faces': self.faces, 'normals': self.normais, 'limites': self.limites}
+
+    def copia(self):
+        """Cópia independente dos arrays (os dados derivados são recalculados quando pedidos)."""
+        return Malha(self.vertices.copy(), self.faces.copy(), self.normais.copy(),
+                     None if self.limites is None else self.limites.copy())
+
+    # acesso como o dict antigo
+    def __getitem__(self, chave):
+        try:
+            return getattr(self, _CHAVES[chave])
+        except KeyError:
+            raise KeyError(chave) from None
+
+    def __contains__(self, chave):
+        return chave in _CHAVES
+
+    def keys(self):
+        return ('vertices', 'faces', 'normals', 'limites')
+
+    def get(self, chave, padrao=None):
+        return self[chave] if chave in self else padrao
+
+    def __len__(self):
+        return len(self.faces)
+
+    def __repr__(self):
+        return f"Malha({len(self.vertices)} vértices, {len(self.faces)} faces)"
+
+    def nbytes(self):
+        """Bytes ocupados pelos arrays (inclusive os dados derivados já calculados)."""
+        arrays = (self.vertices, self.faces, self.normais, self.limites, self._centroides, self._normais_faces)
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    # dados derivados
+    def invalidar(self):
+        """Descarta os dados derivados; chamar depois de mudar os vértices por fora."""
+        self._centroides = None
+        self._normais_faces = None
+        self.atualizar_limites()
+
+    def atualizar_limites(self):
+        if len(self.vertices):
+            self.limites = np.array([self.vertices.min(axis=0), self.vertices.max(axis=0)], dtype=np.float32)
+        else:
+            self.limites = np.zeros((2, 3), dtype=np.float32)
+
+    @property
+    def centroides(self):
+        """Centróide (F,3) de cada face."""
+        if self._centroides is None:
+            tri = self.vertices[self.faces]
+            self._centroides = (tri[:, 0] + tri[:, 1] + tri[:, 2]) / np.float32(3)
+        return self._centroides
+
+    @property
+    def normais_faces(self):
+        """Normal unitária (F,3) de cada face ((0,0,1) nas degeneradas)."""
+        if self._normais_faces is None:
+            tri = self.vertices[self.faces]
+            n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+            norma = np.linalg.norm(n, axis=1)
+            n[norma == 0] = (0.0, 0.0, 1.0)
+            norma[norma == 0] = 1.0
+            n /= norma[:, None]
+            self._normais_faces = n
+        return self._normais_faces
+
+    # transformações no lugar
+    def normalizar(self, raio=1.0):
+        """Centraliza os vértices na média e escala para que o mais distante fique a `raio` do centro,
+        alterando o próprio array."""
+        v = self.vertices
+        if v.size == 0:
+            return self
+        if not v.flags.writeable:
+            v = self.vertices = v.copy()
+        v -= v.mean(axis=0, dtype=np.float64).astype(np.float32)
+        max_dist = float(np.sqrt(np.einsum('ij,ij->i', v, v).max()))
+        v *= np.float32(raio / (max_dist if max_dist != 0 else 1.0))
+        self.invalidar()
+        return self
+
+
+def como_malha(modelo):
+    """O próprio modelo se já for uma Malha; senão uma Malha com os arrays do dict antigo."""
+    return modelo if isinstance(modelo, Malha) else Malha.de_dict(modelo)
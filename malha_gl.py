@@ -0,0 +1,171 @@
+# malha_gl.py
+# [mvfm] - Malhas em buffer objects (VBO/IBO) para os visualizadores e morphers
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Posições, normais e índices vão para a placa uma vez só e cada malha é desenhada com uma única
+# chamada (glDrawElements / glDrawArrays), em vez de um glVertex por vértice. Continua usando o
+# pipeline fixo (glVertexPointer/glNormalPointer), então a iluminação de inicializar vale igual.
+# Quando o contexto não tem buffer objects (GL < 1.5 sem ARB_vertex_buffer_object) ou o usuário
+# pede --no-vbo, criar_malha_gl retorna None e quem chama usa o caminho antigo.
+#
+# Opções de linha de comando (tratadas por opcoes_gl):
+#    --no-vbo  - não usa buffer objects (desenho imediato, como antes)
+
+import ctypes
+
+from OpenGL.GL import *
+from OpenGL.error import GLError, NullFunctionError
+import numpy as np
+
+usarVBO = True
+_suporte = None  # resultado de suporta_vbo, por processo (um contexto por vez)
+_suporte_meio = None  # resultado de suporta_meio_float
+
+
+def opcoes_gl(argv):
+    """Remove --no-vbo de argv, aplicando-a, e retorna os argumentos restantes."""
+    global usarVBO
+    restantes = []
+    for arg in argv:
+        if arg == '--no-vbo':
+            usarVBO = False
+        else:
+            restantes.append(arg)
+    return restantes
+
+
+def suporta_vbo():
+    """Verifica (uma vez) se o contexto atual tem buffer objects."""
+    global _suporte
+    if _suporte is None:
+        try:
+            versao = glGetString(GL_VERSION) or b''
+            extensoes = glGetString(GL_EXTENSIONS) or b''
+            maior, menor = (int(x) for x in versao.split()[0].split(b'.')[:2])
+            _suporte = bool(glGenBuffers) and ((maior, menor) >= (1, 5) or b'GL_ARB_vertex_buffer_object' in extensoes)
+        except (GLError, NullFunctionError, ValueError, IndexError):
+            _suporte = False
+    return _suporte
+
+
+def suporta_meio_float():
+    """Verifica (uma vez) se o contexto aceita atributos de vértice float16 (GL_HALF_FLOAT: GL 3.0 ou
+    ARB_half_float_vertex)."""
+    global _suporte_meio
+    if _suporte_meio is None:
+        try:
+            versao = glGetString(GL_VERSION) or b''
+            extensoes = glGetString(GL_EXTENSIONS) or b''
+            maior, menor = (int(x) for x in versao.split()[0].split(b'.')[:2])
+            _suporte_meio = (maior, menor) >= (3, 0) or b'GL_ARB_half_float_vertex' in extensoes
+        except (GLError, NullFunctionError, ValueError, IndexError):
+            _suporte_meio = False
+    return _suporte_meio
+
+
+def criar_buffer(alvo, dados, uso=GL_STATIC_DRAW):
+    """Cria um buffer object com o conteúdo de `dados` (array contíguo)."""
+    buf = glGenBuffers(1)
+    glBindBuffer(alvo, buf)
+    glBufferData(alvo, dados.nbytes, dados, uso)
+    glBindBuffer(alvo, 0)
+    return buf
+
+
+def criar_malha_gl(posicoes, normais=None, indices=None, dinamica=False):
+    """Envia a malha para buffer objects. `posicoes` e `normais` são (N,3) (ou (...,3)), `indices` é
+    opcional (sem índices, os vértices são desenhados em sequência). Posições float16 (se o contexto
+    aceitar, suporta_meio_float) ficam em float16 na placa, assim como as normais; o resto vira float32.
+    Com dinamica=True os buffers são preparados para atualizar_malha_gl a cada quadro.
+    Retorna um dict com os buffers ou None se buffer objects não estiverem disponíveis."""
+    if not usarVBO or not suporta_vbo():
+        return None
+
+    uso = GL_DYNAMIC_DRAW if dinamica else GL_STATIC_DRAW
+    meio = np.asarray(posicoes).dtype == np.float16 and suporta_meio_float()
+    dtype = np.float16 if meio else np.float32
+    posicoes = np.ascontiguousarray(posicoes, dtype=dtype).reshape(-1, 3)
+    try:
+        malha = {'posicoes': criar_buffer(GL_ARRAY_BUFFER, posicoes, uso), 'normais': None, 'indices': None,
+                 'contagem': len(posicoes), 'tipo': GL_HALF_FLOAT if meio else GL_FLOAT, 'dtype': dtype}
+        if normais is not None:
+            normais = np.ascontiguousarray(normais, dtype=dtype).reshape(-1, 3)
+            malha['normais'] = criar_buffer(GL_ARRAY_BUFFER, normais, uso)
+        if indices is not None:
+            indices = np.ascontiguousarray(indices, dtype=np.uint32).ravel()
+            malha['indices'] = criar_buffer(GL_ELEMENT_ARRAY_BUFFER, indices, GL_STATIC_DRAW)
+            malha['contagem'] = len(indices)
+    except (GLError, NullFunctionError):
+        return None
+    return malha
+
+
+def atualizar_malha_gl(malha, posicoes, normais=None):
+    """Substitui o conteúdo dos buffers (mesmo tamanho e tipo da criação) sem realocá-los."""
+    posicoes = np.ascontiguousarray(posicoes, dtype=malha['dtype'])
+    glBindBuffer(GL_ARRAY_BUFFER, malha['posicoes'])
+    glBufferSubData(GL_ARRAY_BUFFER, 0, posicoes.nbytes, posicoes)
+    if normais is not None and malha['normais'] is not None:
+        normais = np.ascontiguousarray(normais, dtype=malha['dtype'])
+        glBindBuffer(GL_ARRAY_BUFFER, malha['normais'])
+        glBufferSubData(GL_ARRAY_BUFFER, 0, normais.nbytes, normais)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+
+def _ativar_arrays(malha, usar_normais):
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glBindBuffer(GL_ARRAY_BUFFER, malha['posicoes'])
+    glVertexPointer(3, malha['tipo'], 0, None)
+    com_normais = usar_normais and malha['normais'] is not None
+    if com_normais:
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, malha['normais'])
+        glNormalPointer(malha['tipo'], 0, None)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    return com_normais
+
+
+def _desativar_arrays(com_normais):
+    if com_normais:
+        glDisableClientState(GL_NORMAL_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+
+def desenhar_malha_gl(malha, primitiva=GL_TRIANGLES, usar_normais=True):
+    """Desenha a malha com uma única chamada."""
+    com_normais = _ativar_arrays(malha, usar_normais)
+    if malha['indices'] is not None:
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, malha['indices'])
+        glDrawElements(primitiva, malha['contagem'], GL_UNSIGNED_INT, None)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+    else:
+        glDrawArrays(primitiva, 0, malha['contagem'])
+    _desativar_arrays(com_normais)
+
+
+def desenhar_faixas_gl(malha, primeiros, contagens, primitiva=GL_TRIANGLES, usar_normais=True):
+    """Desenha só as faixas [primeiros[i], primeiros[i] + contagens[i]) de vértices (ou de índices, numa
+    malha com índices): uma só chamada, glMultiDrawArrays ou glMultiDrawElements."""
+    if len(primeiros) == 0:
+        return
+    com_normais = _ativar_arrays(malha, usar_normais)
+    contagens = np.ascontiguousarray(contagens, dtype=np.int32)
+    if malha['indices'] is not None:
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, malha['indices'])
+        # com o buffer de índices ligado, os "ponteiros" são deslocamentos em bytes dentro dele
+        deslocamentos = np.ascontiguousarray(primeiros, dtype=np.uintp) * np.uintp(4)
+        glMultiDrawElements(primitiva, contagens, GL_UNSIGNED_INT,
+                            deslocamentos.ctypes.data_as(ctypes.POINTER(ctypes.c_void_p)), len(primeiros))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+    else:
+        glMultiDrawArrays(primitiva, np.ascontiguousarray(primeiros, dtype=np.int32), contagens, len(primeiros))
+    _desativar_arrays(com_normais)
+
+
+def apagar_malha_gl(malha):
+    """Libera os buffers da malha (aceita None)."""
+    if malha is None:
+        return
+    buffers = [malha[c] for c in ('posicoes', 'normais', 'indices') if malha[c] is not None]
+    glDeleteBuffers(len(buffers), buffers)
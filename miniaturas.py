@@ -0,0 +1,190 @@
+# miniaturas.py
+# [mvfm] - Gera miniaturas (vários ângulos) de todos os modelos de um diretório, em paralelo e sem janela
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Os modelos são distribuídos num pool de processos; cada processo cria o seu contexto fora da tela
+# (renderizador_offscreen.py) uma vez só e o reaproveita para todos os modelos que receber. Os
+# resultados aparecem conforme cada modelo termina e, no fim, um resumo com tempo de leitura, tempo de
+# renderização e número de triângulos por arquivo. Um arquivo com erro é relatado e o lote continua.
+#
+# Cada modelo é centralizado e escalado para raio 1 antes de desenhar (só na cópia usada para a
+# miniatura), para que modelos de tamanhos diferentes fiquem enquadrados da mesma forma.
+#
+# Uso: python miniaturas.py [opções] DIRETÓRIO|GLOB [...]
+#    --angulos=N        - quantos ângulos da volta completa por modelo (padrão: 8)
+#    --tamanho=LxA      - tamanho das imagens (padrão: 256x256)
+#    --processos=P      - processos no pool (padrão: número de núcleos)
+#    --saida=DIR        - diretório das imagens (padrão: miniaturas)
+#    --camera=x,y,z     - posição da câmera para o modelo normalizado (padrão: 0,1.2,2.6)
+#    --modo=M           - fill (padrão), line ou point
+#    --plataforma=P     - egl (padrão) ou osmesa
+#    --no-cache, --rebuild-cache, --no-vbo - como nos programas com janela
+
+import glob
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+import renderizador_offscreen as offscreen
+
+CAMERA = (0.0, 1.2, 2.6)
+
+# estado de cada processo do pool (criado em _iniciar_processo)
+_processo = {}
+
+
+def listar_modelos(entradas):
+    """Expande diretórios (todos os .obj dentro) e globs numa lista ordenada e sem repetições."""
+    caminhos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            caminhos += glob.glob(os.path.join(entrada, '*.obj')) + glob.glob(os.path.join(entrada, '*.OBJ'))
+        else:
+            caminhos += glob.glob(entrada) or [entrada]
+    return sorted(set(caminhos))
+
+
+def _iniciar_processo(largura, altura, plataforma, argv_opcoes):
+    # vários contextos llvmpipe no mesmo processador: uma thread de rasterização por processo
+    os.environ.setdefault('LP_NUM_THREADS', '1')
+    try:
+        offscreen.usar_plataforma(plataforma)
+        programa = offscreen.carregar_programa('visualizador3D')
+        from cache_malha import opcoes_cache
+        from malha_gl import opcoes_gl
+        opcoes_gl(opcoes_cache(argv_opcoes))
+        ctx = offscreen.criar_contexto(largura, altura, plataforma)
+        programa.inicializar()
+        programa.redimensionar(largura, altura)
+        programa.windowWidth, programa.windowHeight = largura, altura
+        _processo.update({'programa': programa, 'ctx': ctx, 'erro': None})
+    except Exception as e:
+        _processo['erro'] = f"contexto fora da tela indisponível ({e})"
+
+
+def _enquadrar(programa):
+    """Centraliza o modelo carregado e o escala para raio 1: todos os níveis de detalhe (que são os
+    enviados para a placa), os limites e as hierarquias de volumes, antes de enviarObjetoGL."""
+    v = np.asarray(programa.vertices, dtype=np.float32)
+    if len(v) == 0:
+        return
+    centro = (v.min(axis=0) + v.max(axis=0)) / 2
+    raio = np.sqrt(((v - centro) ** 2).sum(axis=1).max())
+    escala = 1.0 / raio if raio > 0 else 1.0
+    programa.niveis = [(((np.asarray(vn, dtype=np.float32) - centro) * escala).astype(np.float32), f)
+                       for vn, f in programa.niveis]
+    programa.vertices = programa.niveis[0][0]
+    limites = (np.asarray(programa.limitesModelo, dtype=np.float32) - centro) * escala
+    programa.limitesModelo = limites.astype(np.float32)
+    programa.bvhNiveis = [programa.construir_bvh(vn, f) for vn, f in programa.niveis]
+
+
+def renderizar_modelo(caminho, angulos, saida, camera, modo):
+    """Renderiza `angulos` vistas de um modelo (executado num processo do pool)."""
+    resultado = {'arquivo': caminho, 'triangulos': 0, 'leitura': 0.0, 'render': 0.0, 'imagens': [], 'erro': None}
+    if _processo.get('erro'):
+        resultado['erro'] = _processo['erro']
+        return resultado
+    programa, ctx = _processo['programa'], _processo['ctx']
+
+    try:
+        inicio = time.perf_counter()
+        programa.carregarObjeto(caminho)
+        _enquadrar(programa)
+        resultado['leitura'] = time.perf_counter() - inicio
+        resultado['triangulos'] = len(programa.faces)
+
+        inicio = time.perf_counter()
+        programa.enviarObjetoGL()
+        nome = os.path.splitext(os.path.basename(caminho))[0]
+        for i in range(angulos):
+            rgba = offscreen.renderizar_quadro(programa, ctx, camera, 0.0, 360.0 * i / angulos, modo=modo)
+            imagem = os.path.join(saida, f"{nome}_{i:03d}.png")
+            offscreen.gravar_png(imagem, rgba)
+            resultado['imagens'].append(imagem)
+        resultado['render'] = time.perf_counter() - inicio
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+    return resultado
+
+
+def gerar_miniaturas(caminhos, saida='miniaturas', angulos=8, largura=256, altura=256, processos=None,
+                     camera=CAMERA, modo='fill', plataforma='egl', argv_opcoes=()):
+    """Gera as miniaturas de todos os `caminhos`, devolvendo os resultados conforme ficam prontos
+    (um dict por modelo: arquivo, triangulos, leitura, render, imagens, erro)."""
+    os.makedirs(saida, exist_ok=True)
+    processos = max(1, min(processos or os.cpu_count() or 1, len(caminhos)))
+    # spawn: cada processo importa o OpenGL do zero, já com a plataforma certa
+    contexto_mp = multiprocessing.get_context('spawn')
+    with contexto_mp.Pool(processos, _iniciar_processo, (largura, altura, plataforma, list(argv_opcoes))) as pool:
+        # maiores primeiro: os arquivos pequenos preenchem o fim e nenhum processo fica sozinho no final
+        ordem = sorted(caminhos, key=lambda c: os.path.getsize(c) if os.path.isfile(c) else 0, reverse=True)
+        tarefas = [(c, angulos, saida, camera, modo) for c in ordem]
+        for resultado in pool.imap_unordered(_tarefa, tarefas):
+            yield resultado
+
+
+def _tarefa(args):
+    return renderizar_modelo(*args)
+
+
+def _valor(args, nome, padrao=None):
+    return next((a.split('=', 1)[1] for a in args if a.startswith(f'--{nome}=')), padrao)
+
+
+def main():
+    args = sys.argv[1:]
+    entradas = [a for a in args if not a.startswith('--')]
+    if not entradas:
+        print("Uso: python miniaturas.py [--angulos=N] [--tamanho=LxA] [--processos=P] [--saida=DIR] "
+              "[--camera=x,y,z] [--modo=fill|line|point] [--plataforma=egl|osmesa] [--no-cache] "
+              "[--rebuild-cache] [--no-vbo] DIRETÓRIO|GLOB [...]")
+        sys.exit(1)
+
+    try:
+        angulos = int(_valor(args, 'angulos', 8))
+        largura, altura = (int(x) for x in _valor(args, 'tamanho', '256x256').lower().split('x'))
+        processos = int(_valor(args, 'processos', 0)) or None
+        camera = tuple(float(x) for x in _valor(args, 'camera', ','.join(map(str, CAMERA))).split(','))
+        modo = _valor(args, 'modo', 'fill')
+        plataforma = _valor(args, 'plataforma', 'egl')
+        if modo not in offscreen.MODOS or plataforma not in offscreen.PLATAFORMAS or len(camera) != 3:
+            raise ValueError("opção inválida")
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    saida = _valor(args, 'saida', 'miniaturas')
+    opcoes = [a for a in args if a in ('--no-cache', '--rebuild-cache', '--no-vbo')]
+
+    caminhos = listar_modelos(entradas)
+    if not caminhos:
+        print("Nenhum modelo encontrado.")
+        sys.exit(1)
+
+    inicio = time.perf_counter()
+    resultados = []
+    for r in gerar_miniaturas(caminhos, saida, angulos, largura, altura, processos, camera, modo, plataforma, opcoes):
+        resultados.append(r)
+        if r['erro']:
+            print(f"[{len(resultados)}/{len(caminhos)}] ERRO {r['arquivo']}: {r['erro']}", flush=True)
+        else:
+            print(f"[{len(resultados)}/{len(caminhos)}] {r['arquivo']}: {len(r['imagens'])} imagens", flush=True)
+    total = time.perf_counter() - inicio
+
+    print()
+    print(f"{'arquivo':<40} {'triângulos':>10} {'leitura (s)':>12} {'render (s)':>11}")
+    for r in sorted(resultados, key=lambda r: r['arquivo']):
+        estado = '  (erro)' if r['erro'] else ''
+        print(f"{os.path.basename(r['arquivo']):<40} {r['triangulos']:>10} {r['leitura']:>12.3f} {r['render']:>11.3f}{estado}")
+    erros = sum(1 for r in resultados if r['erro'])
+    print(f"\n{len(resultados) - erros} modelos, {sum(len(r['imagens']) for r in resultados)} imagens em "
+          f"{total:.2f}s ({erros} com erro) -> {saida}")
+    sys.exit(1 if erros else 0)
+
+
+if __name__ == '__main__':
+    main()
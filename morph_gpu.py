@@ -0,0 +1,134 @@
+# morph_gpu.py
+# [mvfm] - Morph feito na placa: os triângulos de início e fim vão uma vez para buffers e o shader interpola
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# 'inicio' e 'fim' (preparar_morph) são enviados como dois atributos de vértice. O vertex shader faz
+# mix(inicio, fim, t), o geometry shader calcula a normal de cada face (como avaliar_morph, com (0,0,1)
+# para faces degeneradas) e ilumina cada vértice com os mesmos parâmetros de GL_LIGHT0 / material do
+# pipeline fixo (gl_LightSource, gl_FrontLightProduct...), então a imagem bate com a do caminho em CPU.
+# Por quadro só muda o uniform `t`.
+#
+# Precisa de GLSL 1.50 com perfil de compatibilidade (GL 3.2+); sem isso criar_morph_gpu retorna None
+# e os morphers continuam no caminho em CPU.
+
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+from OpenGL.error import GLError, NullFunctionError
+import numpy as np
+
+from malha_gl import criar_buffer
+
+# localização fixa dos atributos; 'inicio' na 0 para fazer o papel de gl_Vertex
+ATRIBUTOS = {'inicio': 0, 'fim': 1}
+
+VERTEX_SHADER = """
+#version 150 compatibility
+in vec3 inicio;
+in vec3 fim;
+uniform float t;
+out vec3 posicao;
+
+void main()
+{
+    posicao = mix(inicio, fim, t);
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(posicao, 1.0);
+}
+"""
+
+GEOMETRY_SHADER = """
+#version 150 compatibility
+layout(triangles) in;
+layout(triangle_strip, max_vertices = 3) out;
+in vec3 posicao[];
+out vec4 cor;
+
+// iluminação de GL_LIGHT0 como no pipeline fixo (observador no infinito, sem two-side)
+vec4 iluminar(vec3 n, vec4 olho)
+{
+    vec4 luz = gl_LightSource[0].position;
+    vec3 l = normalize(luz.w == 0.0 ? luz.xyz : luz.xyz - olho.xyz / olho.w);
+    vec4 c = gl_FrontLightModelProduct.sceneColor + gl_FrontLightProduct[0].ambient;
+    float nl = dot(n, l);
+    if (nl > 0.0) {
+        c += nl * gl_FrontLightProduct[0].diffuse;
+        vec3 h = normalize(l + vec3(0.0, 0.0, 1.0));
+        c += pow(max(dot(n, h), 0.0), gl_FrontMaterial.shininess) * gl_FrontLightProduct[0].specular;
+    }
+    return vec4(clamp(c.rgb, 0.0, 1.0), gl_FrontMaterial.diffuse.a);
+}
+
+void main()
+{
+    vec3 n = cross(posicao[1] - posicao[0], posicao[2] - posicao[0]);
+    if (dot(n, n) == 0.0)
+        n = vec3(0.0, 0.0, 1.0);
+    n = normalize(gl_NormalMatrix * n);
+    for (int i = 0; i < 3; i++) {
+        cor = iluminar(n, gl_ModelViewMatrix * vec4(posicao[i], 1.0));
+        gl_Position = gl_in[i].gl_Position;
+        EmitVertex();
+    }
+    EndPrimitive();
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 150 compatibility
+in vec4 cor;
+
+void main()
+{
+    gl_FragColor = cor;
+}
+"""
+
+
+def criar_morph_gpu(morph):
+    """Compila os shaders e envia 'inicio'/'fim' para buffers. Retorna um dict com o programa e os buffers,
+    ou None se o contexto não suportar (o erro de compilação é mostrado)."""
+    try:
+        programa = glCreateProgram()
+        for fonte, tipo in ((VERTEX_SHADER, GL_VERTEX_SHADER), (GEOMETRY_SHADER, GL_GEOMETRY_SHADER),
+                            (FRAGMENT_SHADER, GL_FRAGMENT_SHADER)):
+            glAttachShader(programa, shaders.compileShader(fonte, tipo))
+        for nome, local in ATRIBUTOS.items():
+            glBindAttribLocation(programa, local, nome)
+        glLinkProgram(programa)
+        if glGetProgramiv(programa, GL_LINK_STATUS) != GL_TRUE:
+            raise RuntimeError(glGetProgramInfoLog(programa))
+    except (GLError, NullFunctionError, RuntimeError) as e:
+        print(f"Aviso: morph na GPU indisponível, usando a CPU ({e})")
+        return None
+
+    gpu = {'programa': programa, 'loc_t': glGetUniformLocation(programa, 't'),
+           'contagem': 3 * len(morph['inicio'])}
+    for nome in ATRIBUTOS:
+        dados = np.ascontiguousarray(morph[nome], dtype=np.float32).reshape(-1, 3)
+        gpu[nome] = criar_buffer(GL_ARRAY_BUFFER, dados)
+    return gpu
+
+
+def desenhar_morph_gpu(gpu, t):
+    """Desenha o morph no instante t; só o uniform t é enviado."""
+    glUseProgram(gpu['programa'])
+    glUniform1f(gpu['loc_t'], t)
+    for nome, local in ATRIBUTOS.items():
+        glBindBuffer(GL_ARRAY_BUFFER, gpu[nome])
+        glEnableVertexAttribArray(local)
+        glVertexAttribPointer(local, 3, GL_FLOAT, GL_FALSE, 0, None)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    glDrawArrays(GL_TRIANGLES, 0, gpu['contagem'])
+
+    for local in ATRIBUTOS.values():
+        glDisableVertexAttribArray(local)
+    glUseProgram(0)
+
+
+def apagar_morph_gpu(gpu):
+    """Libera programa e buffers (aceita None)."""
+    if gpu is None:
+        return
+    glDeleteBuffers(len(ATRIBUTOS), [gpu[nome] for nome in ATRIBUTOS])
+    glDeleteProgram(gpu['programa'])
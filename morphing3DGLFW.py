@@ -1,7 +1,7 @@
 # morphing3DGLFW.py
 # [mvfm] - Implementação do Morpher3D usando GLFW
 #
-# Criado : 11/11/2025  ||  Última vez Alterado : 11/11/2025
+# Criado : 11/11/2025  ||  Última vez Alterado : 17/10/2026
 #
 # Teclas:
 #    m - pausar/retomar morphing
@@ -9,14 +9,25 @@
 #    w/q - subir/descer câmera
 #    setas - afastar/aproximar, inclinar visão
 #    s - avançar um passo de morph (quando pausado)
+#    r - pausar/retomar a rotação
+#    p - liga/desliga a medição de tempo por etapa (resumo no título da janela)
+#    g - grava os últimos quadros medidos (trace do Chrome ou CSV, ver --perfil-saida)
 #    ESC - sair
 
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import glfw
 import sys
-import numpy as np
-import math
+
+from cache_malha import opcoes_cache
+from nucleo_morph import carregar_par, criar_buffers, atualizar_morph
+from malha_gl import criar_malha_gl, atualizar_malha_gl, desenhar_malha_gl, apagar_malha_gl, opcoes_gl
+from morph_gpu import criar_morph_gpu, desenhar_morph_gpu, apagar_morph_gpu
+import instrumentacao
+from instrumentacao import etapa, opcoes_instrumentacao
+from grafo_tarefas import imprimir_tempos
+from associacao_paralela import opcoes_associacao
+import cadencia
 
 # Config e estados globais
 windowWidth, windowHeight = 1024, 700
@@ -25,143 +36,96 @@ rotation = 0.0
 modelA = None
 modelB = None
 associations = []
+morph = None
+buffers_morph = None
+malha_morph_gl = None
+linhas_morph_gl = None
+t_enviado = None          # t do conteúdo atual dos buffer objects do modelo e das normais
+t_linhas_enviadas = None
+usar_gpu = False  # --gpu: interpolação no shader (morph_gpu.py)
+morph_gpu = None
 
 morph_t = 0.0
 morph_dir = 1
 animar = True
+girar = True               # rotação do modelo (tecla R)
+VELOCIDADE_MORPH = 0.36    # unidades de t por segundo (A -> B em ~2,8 s)
+VELOCIDADE_ROTACAO = 9.0   # graus por segundo
 mostrarNormais = False
 
 cameraPos = [0.0, 0.0, 3.5]
 altVisao = 0.0
 
 
+# Desenho principal (leitura, normalização e associação ficam em nucleo_morph.py)
+def enviar_morph_gl():
+    global malha_morph_gl, linhas_morph_gl, morph_gpu, t_enviado, t_linhas_enviadas
+    apagar_morph_gl()
+    if usar_gpu:
+        morph_gpu = criar_morph_gpu(morph)
+    atualizar_morph(morph, morph_t, buffers_morph, linhas=True)
+    malha_morph_gl = criar_malha_gl(buffers_morph['vertices'], buffers_morph['normais_vertices'], dinamica=True)
+    linhas_morph_gl = criar_malha_gl(buffers_morph['linhas'], dinamica=True) if malha_morph_gl is not None else None
+    t_enviado = t_linhas_enviadas = morph_t
+
+
+def apagar_morph_gl():
+    """Libera o que enviar_morph_gl criou (buffer objects e, com --gpu, os shaders); precisa de contexto ativo."""
+    global malha_morph_gl, linhas_morph_gl, morph_gpu
+    apagar_morph_gpu(morph_gpu)
+    apagar_malha_gl(malha_morph_gl)
+    apagar_malha_gl(linhas_morph_gl)
+    malha_morph_gl = linhas_morph_gl = morph_gpu = None
+
 
-# Utilitários OBJ (mesmos da versão Windows)
-def carregar_obj(path):
-    verts, faces, normals = [], [], []
-    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            if line.startswith('v '):
-                parts = line.strip().split()
-                x, y, z = map(float, parts[1:4])
-                verts.append(np.array((x, y, z), dtype=float))
-            elif line.startswith('vn '):
-                parts = line.strip().split()
-                x, y, z = map(float, parts[1:4])
-                normals.append(np.array((x, y, z), dtype=float))
-            elif line.startswith('f '):
-                parts = line.strip().split()[1:]
-                idxs = []
-                for p in parts:
-                    if '/' in p:
-                        v_idx = p.split('/')[0]
-                    else:
-                        v_idx = p
-                    if v_idx == '':
-                        continue
-                    idxs.append(int(v_idx) - 1)
-                if len(idxs) == 3:
-                    faces.append(idxs)
-                elif len(idxs) > 3:
-                    for i in range(1, len(idxs) - 1):
-                        faces.append([idxs[0], idxs[i], idxs[i + 1]])
-    return {'vertices': verts, 'faces': faces, 'normals': normals}
-
-
-def normalizar_modelo(model):
-    v = np.array(model['vertices'])
-    if v.size == 0:
-        return
-    centro = np.mean(v, axis=0)
-    v -= centro
-    max_dist = np.max(np.linalg.norm(v, axis=1))
-    if max_dist == 0:
-        max_dist = 1.0
-    v /= max_dist
-    model['vertices'] = [np.array(row) for row in v]
-
-
-def centroid_of_face(face, vertices):
-    pts = np.array([vertices[i] for i in face])
-    return np.mean(pts, axis=0)
-
-
-def face_normal(face, vertices):
-    a = np.array(vertices[face[0]])
-    b = np.array(vertices[face[1]])
-    c = np.array(vertices[face[2]])
-    u = b - a
-    v = c - a
-    n = np.cross(u, v)
-    norm = np.linalg.norm(n)
-    return n / norm if norm != 0 else np.array((0.0, 0.0, 1.0))
-
-
-def associate_faces(modelA, modelB):
-    centA = [centroid_of_face(f, modelA['vertices']) for f in modelA['faces']]
-    centB = [centroid_of_face(f, modelB['vertices']) for f in modelB['faces']]
-    assoc = []
-    for c in centA:
-        dists = [np.linalg.norm(c - cb) for cb in centB]
-        assoc.append(int(np.argmin(dists)) if dists else None)
-    return assoc
-
-
-def align_triangle_vertices(vertsA, vertsB):
-    if len(vertsA) != 3 or len(vertsB) != 3:
-        vb = [np.array(v) for v in vertsB]
-        while len(vb) < 3:
-            vb.append(vb[-1])
-        return vb[:3]
-    vb = [np.array(v) for v in vertsB]
-    va = [np.array(v) for v in vertsA]
-    best = vb
-    best_cost = float('inf')
-    permutations = [
-        vb,
-        [vb[1], vb[2], vb[0]],
-        [vb[2], vb[0], vb[1]],
-        [vb[2], vb[1], vb[0]],
-        [vb[1], vb[0], vb[2]],
-        [vb[0], vb[2], vb[1]]
-    ]
-    for perm in permutations:
-        cost = sum(np.linalg.norm(va[i] - perm[i]) for i in range(3))
-        if cost < best_cost:
-            best_cost = cost
-            best = perm
-    return best
-
-
-# Desenho principal
 def desenhar_morph(t):
-    global modelA, modelB, associations
-    glBegin(GL_TRIANGLES)
-    for i, faceA in enumerate(modelA['faces']):
-        j = associations[i] if i < len(associations) else None
-        if j is None or j >= len(modelB['faces']):
-            verts = [modelA['vertices'][idx] for idx in faceA]
-            n = face_normal(faceA, modelA['vertices'])
-            glNormal3fv(n)
-            for v in verts:
-                glVertex3fv(v)
-            continue
-        faceB = modelB['faces'][j]
-        vertsA = [modelA['vertices'][idx] for idx in faceA]
-        vertsB = [modelB['vertices'][idx] for idx in faceB]
-        vertsB_aligned = align_triangle_vertices(vertsA, vertsB)
-        tri = [(1 - t) * np.array(vertsA[k]) + t * np.array(vertsB_aligned[k]) for k in range(3)]
-        n = np.cross(tri[1] - tri[0], tri[2] - tri[0])
-        n_norm = np.linalg.norm(n)
-        if n_norm != 0:
-            n = n / n_norm
+    global t_enviado
+    if morph_gpu is not None:
+        with etapa('envio (gpu)'):
+            desenhar_morph_gpu(morph_gpu, t)
+        if mostrarNormais:
+            with etapa('avaliar_morph', gl=False):
+                atualizar_morph(morph, t, buffers_morph, linhas=True)
+            with etapa('normais'):
+                desenhar_normais_morph()
+        return
+    # só recalcula e reenvia quando t muda
+    with etapa('avaliar_morph', gl=False):
+        atualizar_morph(morph, t, buffers_morph, linhas=mostrarNormais)
+    with etapa('envio'):
+        if malha_morph_gl is not None:
+            if t_enviado != buffers_morph['t']:
+                atualizar_malha_gl(malha_morph_gl, buffers_morph['vertices'], buffers_morph['normais_vertices'])
+                t_enviado = buffers_morph['t']
+            desenhar_malha_gl(malha_morph_gl)
         else:
-            n = np.array((0.0, 0.0, 1.0))
-        glNormal3fv(n)
-        for v in tri:
-            glVertex3fv(v)
-    glEnd()
-
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glEnableClientState(GL_NORMAL_ARRAY)
+            glVertexPointer(3, GL_FLOAT, 0, buffers_morph['vertices'])
+            glNormalPointer(GL_FLOAT, 0, buffers_morph['normais_vertices'])
+            glDrawArrays(GL_TRIANGLES, 0, 3 * len(morph['inicio']))
+            glDisableClientState(GL_NORMAL_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+    if mostrarNormais:
+        with etapa('normais'):
+            desenhar_normais_morph()
+
+
+def desenhar_normais_morph():
+    """Segmentos (2F,3) das normais por face numa só chamada; reenviados só quando t muda."""
+    global t_linhas_enviadas
+    glDisable(GL_LIGHTING)
+    if linhas_morph_gl is not None:
+        if t_linhas_enviadas != buffers_morph['t_linhas']:
+            atualizar_malha_gl(linhas_morph_gl, buffers_morph['linhas'])
+            t_linhas_enviadas = buffers_morph['t_linhas']
+        desenhar_malha_gl(linhas_morph_gl, GL_LINES)
+    else:
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, buffers_morph['linhas'])
+        glDrawArrays(GL_LINES, 0, 2 * len(morph['inicio']))
+        glDisableClientState(GL_VERTEX_ARRAY)
+    glEnable(GL_LIGHTING)
 
 # Inicialização
 def inicializar():
@@ -182,7 +146,7 @@ def inicializar():
 
 # GLFW Callbacks
 def on_key(window, key, scancode, action, mods):
-    global cameraPos, mostrarNormais, animar, morph_t
+    global cameraPos, mostrarNormais, animar, girar, morph_t
     if action not in [glfw.PRESS, glfw.REPEAT]:
         return
     if key == glfw.KEY_ESCAPE:
@@ -198,8 +162,18 @@ def on_key(window, key, scancode, action, mods):
             morph_t = min(1.0, morph_t + 0.02)
     elif key == glfw.KEY_M:
         animar = not animar
+    elif key == glfw.KEY_R and action == glfw.PRESS:
+        girar = not girar
     elif key == glfw.KEY_N:
         mostrarNormais = not mostrarNormais
+    elif key == glfw.KEY_P and action == glfw.PRESS:
+        if not instrumentacao.alternar():
+            glfw.set_window_title(window, "morphing3D - [mvfm]")
+    elif key == glfw.KEY_G and action == glfw.PRESS:
+        try:
+            print(f"Perfil gravado em {instrumentacao.exportar()}")
+        except (OSError, ValueError) as e:
+            print(f"Erro ao gravar o perfil: {e}")
 
 
 def on_resize(window, w, h):
@@ -212,21 +186,48 @@ def on_resize(window, w, h):
     gluPerspective(45, w / float(h), 0.1, 100.0)
     glMatrixMode(GL_MODELVIEW)
 
+def carregar_morph(pathA, pathB, vizinhos=1, tempos=None):
+    global modelA, modelB, associations, morph, buffers_morph
+    modelA, modelB, associations, morph = carregar_par(pathA, pathB, vizinhos, tempos)
+    buffers_morph = criar_buffers(morph)
+
+
+def desenhar_cena():
+    with etapa('limpar'):
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    glLoadIdentity()
+
+    gluLookAt(cameraPos[0], cameraPos[1], cameraPos[2], 0, altVisao, 0, 0, 1, 0)
+
+    glLightfv(GL_LIGHT0, GL_POSITION, [0.0, 5.0, 5.0, 1.0])
+    glPushMatrix()
+    glRotatef(rotation, 0, 1, 0)
+    desenhar_morph(morph_t)
+    glPopMatrix()
+
+
 # Loop principal
 def main():
-    global modelA, modelB, associations, rotation, morph_t, morph_dir
-
-    if len(sys.argv) < 3:
-        print("Uso: python morphing3D_glfw.py modeloA.obj modeloB.obj")
+    global usar_gpu, rotation, morph_t, morph_dir
+
+    args = opcoes_associacao(cadencia.opcoes_cadencia(opcoes_instrumentacao(opcoes_gl(opcoes_cache(sys.argv)))))
+    # --vizinhos=K: escolhe entre os K centróides mais próximos levando em conta a normal da face
+    vizinhos = int(next((a.split('=', 1)[1] for a in args if a.startswith('--vizinhos=')), 1))
+    args = [a for a in args if not a.startswith('--vizinhos=')]
+    usar_gpu = '--gpu' in args
+    args = [a for a in args if a != '--gpu']
+    if len(args) < 3:
+        print("Uso: python morphing3D_glfw.py [--no-cache] [--rebuild-cache] [--vizinhos=K] [--processos=N] [--no-vbo] [--gpu] [--perfil] [--perfil-quadros=N] [--perfil-saida=ARQ] [--fps=N] [--no-vsync] [--sob-demanda] modeloA.obj modeloB.obj")
         sys.exit(1)
 
-    pathA, pathB = sys.argv[1], sys.argv[2]
-    modelA = carregar_obj(pathA)
-    modelB = carregar_obj(pathB)
-
-    normalizar_modelo(modelA)
-    normalizar_modelo(modelB)
-    associations = associate_faces(modelA, modelB)
+    pathA, pathB = args[1], args[2]
+    tempos = []
+    try:
+        carregar_morph(pathA, pathB, vizinhos, tempos)
+    except ValueError as e:
+        print(f"Erro: {e}.")
+        sys.exit(1)
+    imprimir_tempos(tempos, 'carregamento')
 
     if not glfw.init():
         print("Erro: falha ao inicializar GLFW.")
@@ -239,32 +240,39 @@ def main():
         sys.exit(1)
 
     glfw.make_context_current(window)
+    cadencia.ativar_vsync_glfw()
     glfw.set_key_callback(window, on_key)
     glfw.set_window_size_callback(window, on_resize)
 
     inicializar()
+    enviar_morph_gl()
 
     print("Modelos carregados e normalizados:")
     print(f"  A: {len(modelA['vertices'])} vértices, {len(modelA['faces'])} faces")
     print(f"  B: {len(modelB['vertices'])} vértices, {len(modelB['faces'])} faces")
 
+    titulo = None
     while not glfw.window_should_close(window):
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
-
-        gluLookAt(cameraPos[0], cameraPos[1], cameraPos[2], 0, altVisao, 0, 0, 1, 0)
-
-        glLightfv(GL_LIGHT0, GL_POSITION, [0.0, 5.0, 5.0, 1.0])
-        glPushMatrix()
-        glRotatef(rotation, 0, 1, 0)
-        desenhar_morph(morph_t)
-        glPopMatrix()
-
-        glfw.swap_buffers(window)
-        glfw.poll_events()
-
+        instrumentacao.inicio_quadro()
+        desenhar_cena()
+
+        with etapa('swap', gl=False):
+            glfw.swap_buffers(window)
+        # inclui a espera do limitador de quadros (ou por eventos, no modo sob demanda)
+        with etapa('eventos', gl=False):
+            cadencia.esperar_eventos_glfw(animar or girar)
+        instrumentacao.fim_quadro()
+
+        # sem texto na janela GLFW: o resumo do perfil vai para o título
+        if instrumentacao.ativo:
+            resumo = instrumentacao.linhas_hud()[0]
+            if resumo != titulo:
+                titulo = resumo
+                glfw.set_window_title(window, f"morphing3D - {resumo}")
+
+        dt = cadencia.passo()
         if animar:
-            morph_t += 0.006 * morph_dir
+            morph_t += VELOCIDADE_MORPH * dt * morph_dir
             if morph_t >= 1.0:
                 morph_t = 1.0
                 morph_dir = -1
@@ -272,8 +280,10 @@ def main():
                 morph_t = 0.0
                 morph_dir = 1
 
-        rotation = (rotation + 0.15) % 360
+        if girar:
+            rotation = (rotation + VELOCIDADE_ROTACAO * dt) % 360
 
+    apagar_morph_gl()
     glfw.terminate()
 
 
@@ -1,7 +1,7 @@
 # morphing3D.py
 # [mvfm] - Primeira implementação do Morpher3D
 #
-# Criado : 10/11/2025  || Última vez Alterado : 11/11/2025
+# Criado : 10/11/2025  || Última vez Alterado : 17/10/2026
 #
 #Teclas:
 #    m - pausar/retomar morphing
@@ -9,227 +9,191 @@
 #    w/q - subir/descer câmera
 #    setas - afastar/aprox., inclinar visão
 #    s - avançar um passo de morph (quando pausado)
+#    r - pausar/retomar a rotação
+#    p - liga/desliga a medição de tempo por etapa (HUD)
+#    g - grava os últimos quadros medidos (trace do Chrome ou CSV, ver --perfil-saida)
 #    ESC - sair
+#
+# Com --animacao=ARQ (gravado por animacao_morph.py) o morph não é calculado: cada quadro vem do arquivo
+# mapeado em memória direto para o buffer object (sem modelos nem normais de face para a tecla n).
 
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
 import sys
 import numpy as np
-import math
+
+from cache_malha import opcoes_cache
+from nucleo_morph import carregar_par, criar_buffers, atualizar_morph
+from malha_gl import criar_malha_gl, atualizar_malha_gl, desenhar_malha_gl, apagar_malha_gl, opcoes_gl
+from morph_gpu import criar_morph_gpu, desenhar_morph_gpu, apagar_morph_gpu
+import instrumentacao
+from instrumentacao import etapa, opcoes_instrumentacao
+from grafo_tarefas import imprimir_tempos
+from associacao_paralela import opcoes_associacao
+import animacao_morph
+from animacao_morph import opcoes_animacao, abrir_animacao, fechar_animacao, amostrar, posicao
+import cadencia
 
 #Config e estados globais
 windowWidth, windowHeight = 1024, 700
 rotation = 0.0
 
-# modelos: cada um é um dict com 'vertices' (lista de np.array), 'faces' (lista de [v_idx,...]), 'normals' (lista de np.array - opcionais)
+# modelos: cada um é um dict com 'vertices' (array (N,3)), 'faces' (array (F,3) de índices), 'normals' (array (N,3) - opcionais)
 modelA = None
 modelB = None
 
 # associações: lista onde assoc[i] = j significa que face i de A -> face j de B
 associations = []
 
+# triângulos de início/fim do morph (preparar_morph): dict com 'inicio' e 'fim', arrays (F,3,3) float32
+morph = None
+# buffers de saída de avaliar_morph, reaproveitados a cada quadro
+buffers_morph = None
+# o mesmo em buffer objects (malha_gl.py); None -> vertex arrays
+malha_morph_gl = None
+linhas_morph_gl = None
+# instante t do conteúdo atual dos buffer objects do modelo e das normais (só reenviados quando mudam)
+t_enviado = None
+t_linhas_enviadas = None
+# --gpu: interpolação no shader (morph_gpu.py); o caminho em CPU fica como referência
+usar_gpu = False
+morph_gpu = None
+# --animacao=ARQ: quadros prontos (animacao_morph.py) no lugar de morph/buffers_morph
+animacao = None
+# (quadro, fração) de posicao() no conteúdo atual dos buffer objects da animação
+amostra_enviada = None
+
 # controle do morphing
 morph_t = 0.0
 morph_dir = 1
 animar = True
+girar = True               # rotação do modelo (tecla 'r')
+VELOCIDADE_MORPH = 0.36    # unidades de t por segundo (A -> B em ~2,8 s)
+VELOCIDADE_ROTACAO = 9.0   # graus por segundo
 mostrarNormais = False
 
 # câmera
 cameraPos = [0.0, 0.0, 3.5]
 altVisao = 0.0
 
-#Utilitários OBJ
-
-def carregar_obj(path):
-
-    # Práticamente mesma implementação que 'visualizador3D.py' porém, de novo, estamos lidando com o DOBRO de modelos.
-    verts = []
-    faces = []
-    normals = []
-
-    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            if line.startswith('v '):
-                parts = line.strip().split()
-                if len(parts) >= 4:
-                    x, y, z = map(float, parts[1:4])
-                    verts.append(np.array((x, y, z), dtype=float))
-            elif line.startswith('vn '):
-                parts = line.strip().split()
-                x, y, z = map(float, parts[1:4])
-                normals.append(np.array((x, y, z), dtype=float))
-            elif line.startswith('f '):
-                parts = line.strip().split()[1:]
-                # cada parte pode ser v, v/vt, v//vn, v/vt/vn
-                idxs = []
-                for p in parts:
-                    if '/' in p:
-                        v_idx = p.split('/')[0]
-                    else:
-                        v_idx = p
-                    if v_idx == '':
-                        continue
-                    i = int(v_idx) - 1
-                    idxs.append(i)
-                # triangula se necessário
-                if len(idxs) == 3:
-                    faces.append(idxs)
-                elif len(idxs) > 3:
-                    # fan triangulation
-                    for i in range(1, len(idxs) - 1):
-                        faces.append([idxs[0], idxs[i], idxs[i + 1]])
-                # faces com <3 ignoradas
-    return {'vertices': verts, 'faces': faces, 'normals': normals}
-
-# Normalização
-
-def normalizar_modelo(model):
-    v = np.array(model['vertices'])
-    if v.size == 0:
-        return
-    centro = np.mean(v, axis=0)
-    v -= centro
-    max_dist = np.max(np.linalg.norm(v, axis=1))
-    if max_dist == 0:
-        max_dist = 1.0
-    v /= max_dist
-    model['vertices'] = [np.array(row) for row in v]
-
-# Geometria e associação
-
-def centroid_of_face(face, vertices):
-    pts = np.array([vertices[i] for i in face])
-    return np.mean(pts, axis=0)
-
-
-def face_normal(face, vertices):
-    a = np.array(vertices[face[0]])
-    b = np.array(vertices[face[1]])
-    c = np.array(vertices[face[2]])
-    u = b - a
-    v = c - a
-    n = np.cross(u, v)
-    norm = np.linalg.norm(n)
-    if norm == 0:
-        return np.array((0.0, 0.0, 1.0))
-    return n / norm
-
-
-def associate_faces(modelA, modelB):
-    """Associa cada face de A a uma face de B pelo centróide mais próximo.
-    Retorna lista assoc onde assoc[i] = j (índice de face em B)."""
-    centA = [centroid_of_face(f, modelA['vertices']) for f in modelA['faces']]
-    centB = [centroid_of_face(f, modelB['vertices']) for f in modelB['faces']]
-
-    assoc = []
-    if len(centB) == 0:
-        return [None] * len(centA)
-
-    # para cada centróide de A, encontra index de B com menor distância
-    for c in centA:
-        dists = [np.linalg.norm(c - cb) for cb in centB]
-        j = int(np.argmin(dists))
-        assoc.append(j)
-    return assoc
+#Utilitários OBJ (leitura, normalização e associação ficam em nucleo_morph.py)
 
 # Interpolação e desenho
 
+def enviar_morph_gl():
+    """Cria os buffer objects (dinâmicos) do morph, ou os shaders com --gpu; precisa de contexto OpenGL ativo."""
+    global malha_morph_gl, linhas_morph_gl, morph_gpu, t_enviado, t_linhas_enviadas, amostra_enviada
+    apagar_morph_gl()
+    if animacao is not None:
+        # no dtype do arquivo: float16 fica float16 na placa (GL_HALF_FLOAT), se o contexto aceitar
+        posicoes, normais = amostrar(animacao, morph_t)
+        malha_morph_gl = criar_malha_gl(posicoes, normais, dinamica=True)
+        amostra_enviada = posicao(animacao, morph_t)
+        return
+    if usar_gpu:
+        morph_gpu = criar_morph_gpu(morph)
+    atualizar_morph(morph, morph_t, buffers_morph, linhas=True)
+    malha_morph_gl = criar_malha_gl(buffers_morph['vertices'], buffers_morph['normais_vertices'], dinamica=True)
+    linhas_morph_gl = criar_malha_gl(buffers_morph['linhas'], dinamica=True) if malha_morph_gl is not None else None
+    t_enviado = t_linhas_enviadas = morph_t
+
+
+def apagar_morph_gl():
+    """Libera o que enviar_morph_gl criou (buffer objects e, com --gpu, os shaders); precisa de contexto ativo."""
+    global malha_morph_gl, linhas_morph_gl, morph_gpu
+    apagar_morph_gpu(morph_gpu)
+    apagar_malha_gl(malha_morph_gl)
+    apagar_malha_gl(linhas_morph_gl)
+    malha_morph_gl = linhas_morph_gl = morph_gpu = None
+
+
 def desenhar_morph(t):
-    """Desenha o morphed mesh: para cada face de A, pega a face associada em B e interpola os 3 vértices."""
-    global modelA, modelB, associations
-
-    glBegin(GL_TRIANGLES)
-    for i, faceA in enumerate(modelA['faces']):
-        j = associations[i] if i < len(associations) else None
-        if j is None or j >= len(modelB['faces']):
-            # sem par; desenha faceA pura (treat como t=0)
-            verts = [modelA['vertices'][idx] for idx in faceA]
-            n = face_normal(faceA, modelA['vertices'])
-            glNormal3fv(n)
-            for v in verts:
-                glVertex3fv(v)
-            continue
-
-        faceB = modelB['faces'][j]
-        vertsA = [modelA['vertices'][idx] for idx in faceA]
-        vertsB = [modelB['vertices'][idx] for idx in faceB]
-
-        # Caso faces tenham diferentes ordenações geométricas, tentamos alinhar os vértices pelo menor soma de distâncias
-        vertsB_aligned = align_triangle_vertices(vertsA, vertsB)
-
-        for va, vb in zip(vertsA, vertsB_aligned):
-            v = (1 - t) * np.array(va) + t * np.array(vb)
-            # normal por face aproximada (usando tri interpolado) - ok para iluminação simples
-        tri = [(1 - t) * np.array(vertsA[0]) + t * np.array(vertsB_aligned[0]),
-               (1 - t) * np.array(vertsA[1]) + t * np.array(vertsB_aligned[1]),
-               (1 - t) * np.array(vertsA[2]) + t * np.array(vertsB_aligned[2])]
-        n = np.cross(tri[1] - tri[0], tri[2] - tri[0])
-        n_norm = np.linalg.norm(n)
-        if n_norm == 0:
-            n = np.array((0.0, 0.0, 1.0))
+    """Desenha o morphed mesh: cada face de A interpolada até a face associada (já alinhada) de B.
+    Vértices e normais vêm de avaliar_morph (nucleo_morph.py) e vão para buffer objects (malha_gl.py),
+    ou para vertex arrays quando o contexto não tem buffer objects. Com --gpu a interpolação é feita
+    no shader (morph_gpu.py) e a CPU só trabalha para a sobreposição de normais. Com t parado (morph
+    pausado) nada é recalculado nem reenviado."""
+    global t_enviado
+    if animacao is not None:
+        with etapa('envio (animação)'):
+            desenhar_animacao(t)
+        return
+    if morph_gpu is not None:
+        with etapa('envio (gpu)'):
+            desenhar_morph_gpu(morph_gpu, t)
+        if mostrarNormais:
+            with etapa('avaliar_morph', gl=False):
+                atualizar_morph(morph, t, buffers_morph, linhas=True)
+            with etapa('normais'):
+                desenhar_normais_morph()
+        return
+
+    # interpolação + normais por face (um só kernel em nucleo_morph), só quando t muda
+    with etapa('avaliar_morph', gl=False):
+        atualizar_morph(morph, t, buffers_morph, linhas=mostrarNormais)
+
+    with etapa('envio'):
+        if malha_morph_gl is not None:
+            if t_enviado != buffers_morph['t']:
+                atualizar_malha_gl(malha_morph_gl, buffers_morph['vertices'], buffers_morph['normais_vertices'])
+                t_enviado = buffers_morph['t']
+            desenhar_malha_gl(malha_morph_gl)
         else:
-            n = n / n_norm
-        glNormal3fv(n)
-        for k in range(3):
-            v = tri[k]
-            glVertex3fv(v)
-    glEnd()
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glEnableClientState(GL_NORMAL_ARRAY)
+            glVertexPointer(3, GL_FLOAT, 0, buffers_morph['vertices'])
+            glNormalPointer(GL_FLOAT, 0, buffers_morph['normais_vertices'])
+            glDrawArrays(GL_TRIANGLES, 0, 3 * len(morph['inicio']))
+            glDisableClientState(GL_NORMAL_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
 
     # desenha normais se pedido
     if mostrarNormais:
-        glDisable(GL_LIGHTING)
-        glBegin(GL_LINES)
-        for i, face in enumerate(modelA['faces']):
-            j = associations[i] if i < len(associations) else None
-            vertsA = [modelA['vertices'][idx] for idx in face]
-            if j is not None and j < len(modelB['faces']):
-                vertsB = [modelB['vertices'][idx] for idx in modelB['faces'][j]]
-                vertsB_aligned = align_triangle_vertices(vertsA, vertsB)
-                tri = [(1 - morph_t) * np.array(vertsA[k]) + morph_t * np.array(vertsB_aligned[k]) for k in range(3)]
-                center = np.mean(tri, axis=0)
-                n = np.cross(tri[1] - tri[0], tri[2] - tri[0])
-                n_norm = np.linalg.norm(n)
-                if n_norm == 0:
-                    n = np.array((0.0, 0.0, 1.0))
-                else:
-                    n = n / n_norm
-            else:
-                tri = [np.array(v) for v in vertsA]
-                center = np.mean(tri, axis=0)
-                n = face_normal(face, modelA['vertices'])
-            glVertex3fv(center)
-            glVertex3fv(center + n * 0.08)
-        glEnd()
-        glEnable(GL_LIGHTING)
-
-
-def align_triangle_vertices(vertsA, vertsB):
-    """Tenta alinhar a ordem dos vértices de vertsB para coincidir melhor com vertsA.
-    Retorna lista de 3 pontos de vertsB em ordem alinhada."""
-    # assume listas de 3 pontos cada (np.array ou alike)
-    if len(vertsA) != 3 or len(vertsB) != 3:
-        # fallback: se tamanhos diferentes, repete ou trunca
-        # converte para arrays
-        va = [np.array(v) for v in vertsA]
-        vb = [np.array(v) for v in vertsB]
-        while len(vb) < 3:
-            vb.append(vb[-1].copy())
-        return vb[:3]
-
-    vb = [np.array(v) for v in vertsB]
-    va = [np.array(v) for v in vertsA]
-
-    best = vb
-    best_cost = float('inf')
-    # tenta as 3 rotações e a reversa
-    permutations = [vb, [vb[1], vb[2], vb[0]], [vb[2], vb[0], vb[1]], [vb[2], vb[1], vb[0]], [vb[1], vb[0], vb[2]], [vb[0], vb[2], vb[1]]]
-    for perm in permutations:
-        cost = sum(np.linalg.norm(va[i] - perm[i]) for i in range(3))
-        if cost < best_cost:
-            best_cost = cost
-            best = perm
-    return best
+        with etapa('normais'):
+            desenhar_normais_morph()
+
+
+def desenhar_animacao(t):
+    """Desenha o quadro da animação gravada no instante t (animacao_morph.amostrar). O buffer object só é
+    reenviado quando o quadro (ou a fração entre dois quadros) muda; sem buffer objects, vertex arrays."""
+    global amostra_enviada
+    F = animacao['faces']
+    if malha_morph_gl is not None:
+        amostra = posicao(animacao, t)
+        if amostra != amostra_enviada:
+            posicoes, normais = amostrar(animacao, t)
+            atualizar_malha_gl(malha_morph_gl, posicoes, normais)
+            amostra_enviada = amostra
+        desenhar_malha_gl(malha_morph_gl)
+        return
+    # vertex arrays: float32, que todo contexto aceita
+    posicoes, normais = np.asarray(amostrar(animacao, t), dtype=np.float32)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_NORMAL_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, posicoes)
+    glNormalPointer(GL_FLOAT, 0, normais)
+    glDrawArrays(GL_TRIANGLES, 0, 3 * F)
+    glDisableClientState(GL_NORMAL_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+
+def desenhar_normais_morph():
+    """Desenha, numa só chamada, os segmentos (2F,3) de normais já calculados em buffers_morph['linhas'];
+    o buffer object só é reenviado quando as linhas foram recalculadas para outro t."""
+    global t_linhas_enviadas
+    glDisable(GL_LIGHTING)
+    if linhas_morph_gl is not None:
+        if t_linhas_enviadas != buffers_morph['t_linhas']:
+            atualizar_malha_gl(linhas_morph_gl, buffers_morph['linhas'])
+            t_linhas_enviadas = buffers_morph['t_linhas']
+        desenhar_malha_gl(linhas_morph_gl, GL_LINES)
+    else:
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, buffers_morph['linhas'])
+        glDrawArrays(GL_LINES, 0, 2 * len(morph['inicio']))
+        glDisableClientState(GL_VERTEX_ARRAY)
+    glEnable(GL_LIGHTING)
 
 # Métodos principais OpenGL para execução final.
 
@@ -261,9 +225,10 @@ def desenhaTexto(x, y, texto, r=0.0, g=1.0, b=1.0):
         glEnable(GL_DEPTH_TEST)
 
 
-def display():
-    global rotation, morph_t, morph_dir
-    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+def desenhar_cena():
+    """Limpa a tela e desenha o morph em morph_t com a câmera e a rotação atuais (sem HUD)."""
+    with etapa('limpar'):
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
 
     gluLookAt(cameraPos[0], cameraPos[1], cameraPos[2], 0, altVisao, 0, 0, 1, 0)
@@ -279,17 +244,34 @@ def display():
 
     glPopMatrix()
 
+
+def display():
+    global rotation, morph_t, morph_dir
+    instrumentacao.inicio_quadro()
+    desenhar_cena()
+
     # HUD
-    glDisable(GL_LIGHTING)
-    desenhaTexto(10, windowHeight - 20, f"Faces A: {len(modelA['faces'])} | Faces B: {len(modelB['faces'])}")
-    desenhaTexto(10, windowHeight - 40, f"morph t: {morph_t:.3f} | anim: {animar} | n: toggle normais")
-    glEnable(GL_LIGHTING)
+    with etapa('hud'):
+        glDisable(GL_LIGHTING)
+        if animacao is not None:
+            desenhaTexto(10, windowHeight - 20, f"Animação: {animacao['faces']} faces | {animacao['quadros']} quadros "
+                                                f"({animacao['dtype'].name})")
+        else:
+            desenhaTexto(10, windowHeight - 20, f"Faces A: {len(modelA['faces'])} | Faces B: {len(modelB['faces'])}")
+        desenhaTexto(10, windowHeight - 40, f"morph t: {morph_t:.3f} | anim: {animar} | n: toggle normais")
+        if instrumentacao.ativo:
+            for i, linha in enumerate(instrumentacao.linhas_hud()):
+                desenhaTexto(10, windowHeight - 60 - 16 * i, linha, 1.0, 0.85, 0.3)
+        glEnable(GL_LIGHTING)
 
-    glutSwapBuffers()
+    with etapa('swap', gl=False):
+        glutSwapBuffers()
+    instrumentacao.fim_quadro()
 
-    # atualização de estado
+    # atualização de estado, pelo tempo decorrido desde o quadro anterior
+    dt = cadencia.passo()
     if animar:
-        morph_t += 0.006 * morph_dir
+        morph_t += VELOCIDADE_MORPH * dt * morph_dir
         if morph_t >= 1.0:
             morph_t = 1.0
             morph_dir = -1
@@ -297,7 +279,9 @@ def display():
             morph_t = 0.0
             morph_dir = 1
 
-    rotation = (rotation + 0.15) % 360
+    if girar:
+        rotation = (rotation + VELOCIDADE_ROTACAO * dt) % 360
+    cadencia.fim_quadro_glut(animar or girar)
 
 
 def redimensionar(w, h):
@@ -340,7 +324,7 @@ def inicializar():
 
 
 def teclado(key, x, y):
-    global cameraPos, mostrarNormais, animar, morph_t
+    global cameraPos, mostrarNormais, animar, girar, morph_t
     if key == b'q':
         cameraPos[1] += 0.2
     elif key == b'e':
@@ -353,9 +337,20 @@ def teclado(key, x, y):
             morph_t = min(1.0, morph_t + 0.02)
     elif key == b'm':
         animar = not animar
+    elif key == b'r':
+        girar = not girar
     elif key == b'n':
         mostrarNormais = not mostrarNormais
+    elif key == b'p':
+        instrumentacao.alternar()
+    elif key == b'g':
+        try:
+            print(f"Perfil gravado em {instrumentacao.exportar()}")
+        except (OSError, ValueError) as e:
+            print(f"Erro ao gravar o perfil: {e}")
     elif key == b'\x1b':  # ESC
+        apagar_morph_gl()
+        fechar_animacao(animacao)
         sys.exit(0)
     glutPostRedisplay()
 
@@ -375,47 +370,67 @@ def specialKeys(key, x, y):
 
 # ---------------------- Entrypoint ----------------------
 
-def main():
-    global modelA, modelB, associations
-    if len(sys.argv) < 3:
-        print("Uso: python morphing3D.py modeloA.obj modeloB.obj")
-        sys.exit(1)
-
-    pathA = sys.argv[1]
-    pathB = sys.argv[2]
+def carregar_morph(pathA, pathB, vizinhos=1, tempos=None):
+    """Carrega os dois modelos já normalizados, associa as faces e prepara o morph (tudo sem OpenGL).
+    `tempos` (lista) recebe o tempo de cada etapa do carregamento (nucleo_morph.carregar_par)."""
+    global modelA, modelB, associations, morph, buffers_morph
+    modelA, modelB, associations, morph = carregar_par(pathA, pathB, vizinhos, tempos)
+    buffers_morph = criar_buffers(morph)
 
-    modelA = carregar_obj(pathA)
-    modelB = carregar_obj(pathB)
 
-    if len(modelA['faces']) == 0 or len(modelB['faces']) == 0:
-        print("Erro: um dos modelos não contém faces trianguladas ou está vazio.")
+def main():
+    global usar_gpu, animacao
+    args = opcoes_animacao(opcoes_associacao(cadencia.opcoes_cadencia(opcoes_instrumentacao(opcoes_gl(opcoes_cache(sys.argv))))))
+    # --vizinhos=K: escolhe entre os K centróides mais próximos levando em conta a normal da face
+    vizinhos = int(next((a.split('=', 1)[1] for a in args if a.startswith('--vizinhos=')), 1))
+    args = [a for a in args if not a.startswith('--vizinhos=')]
+    # --gpu: interpola no vertex shader em vez da CPU
+    usar_gpu = '--gpu' in args
+    args = [a for a in args if a != '--gpu']
+    if len(args) < 3 and animacao_morph.arquivoAnimacao is None:
+        print("Uso: python morphing3D.py [--no-cache] [--rebuild-cache] [--vizinhos=K] [--processos=N] [--no-vbo] [--gpu] [--perfil] [--perfil-quadros=N] [--perfil-saida=ARQ] [--fps=N] [--no-vsync] [--sob-demanda] modeloA.obj modeloB.obj")
+        print("       python morphing3D.py --animacao=ARQ [--sem-interpolacao] [--no-vbo] [--perfil] [--fps=N] [--no-vsync] [--sob-demanda]")
         sys.exit(1)
 
-    # normaliza ambos
-    normalizar_modelo(modelA)
-    normalizar_modelo(modelB)
-
-    # associa faces A -> B
-    associations = associate_faces(modelA, modelB)
+    if animacao_morph.arquivoAnimacao is not None:
+        try:
+            animacao = abrir_animacao(animacao_morph.arquivoAnimacao)
+        except (OSError, ValueError) as e:
+            print(f"Erro: {e}.")
+            sys.exit(1)
+    else:
+        tempos = []
+        try:
+            carregar_morph(args[1], args[2], vizinhos, tempos)
+        except ValueError as e:
+            print(f"Erro: {e}.")
+            sys.exit(1)
+        imprimir_tempos(tempos, 'carregamento')
 
     # inicializa GLUT
-    glutInit(sys.argv)
+    glutInit(args)
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGBA | GLUT_DEPTH)
     glutInitWindowSize(windowWidth, windowHeight)
     glutCreateWindow(b"morphing3D - [mvfm]")
 
     inicializar()
+    enviar_morph_gl()
+    cadencia.ativar_vsync_glut()
 
+    # sem glutIdleFunc: o próximo quadro é agendado pelo próprio display (cadencia.py)
     glutDisplayFunc(display)
-    glutIdleFunc(display)
     glutReshapeFunc(redimensionar)
     glutKeyboardFunc(teclado)
     glutSpecialFunc(specialKeys)
 
-    print("Modelos carregados e normalizados:")
-    print(f"  A: {len(modelA['vertices'])} vértices, {len(modelA['faces'])} faces")
-    print(f"  B: {len(modelB['vertices'])} vértices, {len(modelB['faces'])} faces")
-    print("Teclas: m pause/resume | n toggle normals | w/q up/down camera | setas para mover camera | ESC sair")
+    if animacao is not None:
+        print(f"Animação {animacao_morph.arquivoAnimacao}: {animacao['faces']} faces, {animacao['quadros']} quadros "
+              f"({animacao['dtype'].name})")
+    else:
+        print("Modelos carregados e normalizados:")
+        print(f"  A: {len(modelA['vertices'])} vértices, {len(modelA['faces'])} faces")
+        print(f"  B: {len(modelB['vertices'])} vértices, {len(modelB['faces'])} faces")
+    print("Teclas: m pause/resume | r rotação | n toggle normals | w/q up/down camera | setas para mover camera | p perfil | g grava perfil | ESC sair")
 
     glutMainLoop()
 
@@ -0,0 +1,206 @@
+# normais_suaves.py
+# [mvfm] - Geração de normais por vértice (suaves, com ângulo de dobra) para malhas sem 'vn'
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# A normal de cada vértice é a soma das normais das faces em volta, ponderada pela área da face e pelo
+# ângulo do canto no vértice (o ângulo evita que uma face fatiada em muitos triângulos finos puxe a
+# normal para o seu lado). Tudo é feito de uma vez sobre o array de índices das faces, com scatter-add
+# (np.bincount), sem laço por face ou vértice.
+#
+# Com ângulo de dobra, os cantos de um vértice são agrupados atravessando as arestas que saem dele, só
+# entre faces a menos desse ângulo uma da outra, e cada grupo soma só as suas faces: arestas vivas
+# (caixas, cilindros) continuam vivas e o vértice ganha uma normal por lado. Os grupos só são montados
+# nos vértices em que alguma face se afasta mais que meio ângulo da normal suave; nos demais o
+# resultado seria o mesmo.
+#
+# completar_normais preenche 'normais'/'faces_normais' das faces que não têm 'vn' (e dos níveis de
+# detalhe, que nunca têm); com_normais(preparar) faz isso dentro do preparo do cache_malha, então as
+# normais ficam guardadas junto com a malha e só são calculadas uma vez.
+#
+# Opções de linha de comando (tratadas por opcoes_normais):
+#    --dobra=GRAUS     - ângulo de dobra (padrão: 60; 180 = tudo suave)
+#    --normais-planas  - não gera normais: faces sem 'vn' usam a normal da face, como antes
+
+import math
+
+import numpy as np
+
+ANGULO_DOBRA = 60.0
+VERSAO = 2  # mudar quando o cálculo mudar (entra na chave do cache)
+
+usarNormaisSuaves = True
+anguloDobra = ANGULO_DOBRA
+
+
+def opcoes_normais(argv):
+    """Remove as opções --dobra= e --normais-planas de argv, aplicando-as, e retorna os argumentos restantes."""
+    global usarNormaisSuaves, anguloDobra
+    restantes = []
+    for arg in argv:
+        if arg.startswith('--dobra='):
+            anguloDobra = min(180.0, max(0.0, float(arg.split('=', 1)[1])))
+        elif arg == '--normais-planas':
+            usarNormaisSuaves = False
+        else:
+            restantes.append(arg)
+    return restantes
+
+
+def parametros_normais():
+    """Parâmetros da geração de normais, para a chave do cache."""
+    return {'normais_suaves': anguloDobra if usarNormaisSuaves else None,
+            'versao_normais': VERSAO if usarNormaisSuaves else None}
+
+
+def _acumular(indices, valores, n):
+    """Soma as linhas de `valores` nos índices dados (scatter-add por coluna com bincount)."""
+    return np.stack([np.bincount(indices, valores[:, k], minlength=n) for k in range(valores.shape[1])], axis=1)
+
+
+def _unitarios(v, reserva=None):
+    """Normaliza as linhas de v; as nulas viram a linha correspondente de `reserva` (ou (0,0,1))."""
+    norma = np.linalg.norm(v, axis=1)
+    nulas = norma == 0
+    norma[nulas] = 1.0
+    v = v / norma[:, None]
+    if nulas.any():
+        v[nulas] = (0.0, 0.0, 1.0) if reserva is None else reserva[nulas]
+    return v
+
+
+def faces_e_pesos(vertices, faces):
+    """Normais unitárias das faces (T,3) e peso de cada canto (T,3): área da face x ângulo do canto.
+    Faces degeneradas ficam com normal e pesos zero."""
+    v = np.asarray(vertices, dtype=np.float32)
+    p0, p1, p2 = v[faces[:, 0]], v[faces[:, 1]], v[faces[:, 2]]
+    # arestas do triângulo: a0 = p1 - p0, a1 = p2 - p1, a2 = p0 - p2
+    a0, a1, a2 = p1 - p0, p2 - p1, p0 - p2
+    cruz = np.cross(a0, -a2)
+    dobro_area = np.sqrt(np.einsum('ij,ij->i', cruz, cruz))
+    ok = dobro_area > 0
+    normal = np.zeros_like(cruz)
+    normal[ok] = cruz[ok] / dobro_area[ok, None]
+
+    # ângulo de cada canto entre as duas arestas que saem dele
+    c0, c1, c2 = (np.sqrt(np.einsum('ij,ij->i', a, a)) for a in (a0, a1, a2))
+    angulo = np.empty((len(faces), 3), dtype=np.float32)
+    for k, (a, b, ca, cb) in enumerate(((a0, a2, c0, c2), (a1, a0, c1, c0), (a2, a1, c2, c1))):
+        cos = -np.einsum('ij,ij->i', a, b) / np.maximum(ca * cb, 1e-30)
+        angulo[:, k] = np.arccos(np.clip(cos, -1.0, 1.0))
+    return normal, angulo * (dobro_area / 2)[:, None]
+
+
+def normais_suaves(vertices, faces, angulo=None):
+    """Normais e índices por canto de uma malha: retorna (normais (M,3) float32, faces_normais (T,3) int32).
+    Sem `angulo` (ou com 180) as normais são uma por vértice e faces_normais == faces. Com `angulo` em
+    graus, os vértices em arestas vivas ganham uma normal por grupo de faces suavizado junto."""
+    faces = np.asarray(faces)
+    n = len(vertices)
+    normal, pesos = faces_e_pesos(vertices, faces)
+    cantos_v = faces.ravel()
+    cantos_f = np.repeat(np.arange(len(faces)), 3)
+    contrib = (normal[:, None, :] * pesos[..., None]).reshape(-1, 3)
+    suaves = _unitarios(_acumular(cantos_v, contrib, n)).astype(np.float32)
+    faces_normais = faces.astype(np.int32)
+    if angulo is None or angulo >= 180.0:
+        return suaves, faces_normais
+
+    # vértices com dobra: alguma face (não degenerada) a mais de meio ângulo da normal suave
+    cos_meio = math.cos(math.radians(angulo) / 2)
+    desvio = ((np.einsum('tk,tck->tc', normal, suaves[faces]) < cos_meio) & (pesos > 0)).ravel()
+    dobra = np.bincount(cantos_v[desvio], minlength=n) > 0
+    cantos = np.flatnonzero(dobra[cantos_v])
+    if len(cantos) == 0:
+        return suaves, faces_normais
+
+    # grupos de cantos do mesmo vértice: dois cantos se juntam quando as faces dividem uma aresta que sai
+    # do vértice e estão a menos de `angulo`; cada canto tem só duas arestas, então é linear nos cantos
+    f, k = cantos // 3, cantos % 3
+    outros = np.concatenate([faces[f, (k + 1) % 3], faces[f, (k + 2) % 3]])
+    dono = np.tile(np.arange(len(cantos)), 2)
+    ordem = np.lexsort((outros, np.tile(cantos_v[cantos], 2)))
+    outros, dono = outros[ordem], dono[ordem]
+    mesma = (outros[1:] == outros[:-1]) & (cantos_v[cantos[dono[1:]]] == cantos_v[cantos[dono[:-1]]])
+    a, b = dono[:-1][mesma], dono[1:][mesma]
+    perto = np.einsum('pk,pk->p', normal[f[a]], normal[f[b]]) >= math.cos(math.radians(angulo))
+    grupo = _componentes(a[perto], b[perto], len(cantos))
+    _, primeiro, grupo = np.unique(grupo, return_index=True, return_inverse=True)
+    normal_grupo = _unitarios(_acumular(grupo.ravel(), contrib[cantos], len(primeiro)),
+                              normal[f[primeiro]]).astype(np.float32)
+
+    faces_normais = faces_normais.ravel()
+    faces_normais[cantos] = n + grupo.ravel()
+    normais = np.concatenate([suaves, normal_grupo])
+    return normais, faces_normais.reshape(-1, 3)
+
+
+def _componentes(a, b, n):
+    """Rótulo (o menor índice) da componente conexa de cada um dos n nós, dadas as ligações (a[i], b[i]):
+    propagação do mínimo pelas ligações e salto de ponteiros, cada passo vetorizado."""
+    rotulo = np.arange(n)
+    while True:
+        minimo = np.minimum(rotulo[a], rotulo[b])
+        novo = rotulo.copy()
+        np.minimum.at(novo, a, minimo)
+        np.minimum.at(novo, b, minimo)
+        while True:
+            saltado = novo[novo]
+            if np.array_equal(saltado, novo):
+                break
+            novo = saltado
+        if np.array_equal(novo, rotulo):
+            return rotulo
+        rotulo = novo
+
+
+def completar_normais(malha, angulo=None, prefixo=''):
+    """Gera normais para as faces de `malha` (dict de ler_obj) que não têm 'vn', acrescentando-as a
+    malha[prefixo + 'normais'] e apontando malha[prefixo + 'faces_normais'] para elas. Faces que já têm
+    normais ficam como estão. Retorna a malha."""
+    vertices, faces = malha[prefixo + 'vertices'], malha[prefixo + 'faces']
+    existentes = malha.get(prefixo + 'normais')
+    existentes = np.zeros((0, 3), dtype=np.float32) if existentes is None else existentes
+    indices = malha.get(prefixo + 'faces_normais')
+    indices = np.full(np.shape(faces), -1, dtype=np.int32) if indices is None else indices
+    faltam = ((indices < 0) | (indices >= len(existentes))).any(axis=1)
+    if not faltam.any():
+        return malha
+
+    normais, faces_normais = normais_suaves(vertices, faces, angulo)
+    malha[prefixo + 'normais'] = np.concatenate([existentes, normais]).astype(np.float32)
+    malha[prefixo + 'faces_normais'] = np.where(faltam[:, None], faces_normais + len(existentes),
+                                                indices).astype(np.int32)
+    return malha
+
+
+def com_normais(preparar):
+    """Envolve uma função de preparo do cache_malha (ler_obj, preparar_lod...) para que a malha e os
+    níveis de detalhe saiam com normais completas (se usarNormaisSuaves). Usar junto com
+    parametros_normais() na chave do cache."""
+    if not usarNormaisSuaves:
+        return preparar
+
+    def preparar_com_normais(caminho):
+        malha = preparar(caminho)
+        completar_normais(malha, anguloDobra)
+        i = 1
+        while f'lod{i}_vertices' in malha:
+            completar_normais(malha, anguloDobra, f'lod{i}_')
+            i += 1
+        return malha
+    return preparar_com_normais
+
+
+def normais_dos_niveis(malha):
+    """Lista [(normais, faces_normais) ou None, ...] de cada nível de detalhe de `malha` (nível 0 incluso),
+    na mesma ordem de simplificacao.niveis_da_malha."""
+    resultado = []
+    prefixo, i = '', 0
+    while prefixo + 'vertices' in malha:
+        chaves = (prefixo + 'normais', prefixo + 'faces_normais')
+        resultado.append(tuple(malha[c] for c in chaves) if all(c in malha for c in chaves) else None)
+        i += 1
+        prefixo = f'lod{i}_'
+    return resultado
+
@@ -0,0 +1,256 @@
+# nucleo_morph.py
+# [mvfm] - Preparação do morph, compartilhada por morphing3d.py e morphing3DGLFW.py
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# O alinhamento dos vértices de cada par de faces (A -> B) só depende dos dois modelos, não de t.
+# Ele é feito uma vez, logo depois de associate_faces, para todas as faces de uma vez, e o resultado
+# fica em dois arrays contíguos (F,3,3) float32: os triângulos de início (A) e de fim (B alinhado).
+# A cada quadro, avaliar_morph interpola inicio -> fim e calcula as normais de todas as faces de uma vez,
+# escrevendo em buffers alocados uma única vez (criar_buffers); atualizar_morph pula esse trabalho quando
+# t não mudou (morph pausado), inclusive para os segmentos da sobreposição de normais.
+#
+# A leitura e normalização dos modelos e a associação das faces também ficam aqui, sem OpenGL, para que
+# possam ser usadas fora dos morphers (rasterizador.py, scripts em lote). carregar_par monta isso como um
+# grafo de tarefas (grafo_tarefas.py): leitura e pré-cálculo (centróides, normais das faces, árvore k-d)
+# de A e de B rodam em paralelo e só se juntam na associação, então o tempo até o primeiro quadro fica
+# perto do custo do modelo mais lento, e não da soma dos dois. A associação e as permutações do
+# alinhamento de cada par ficam no cache de associações (cache_associacao.py): abrindo de novo o mesmo
+# par, nenhuma das duas é refeita.
+
+import numpy as np
+
+from associacao_paralela import associar_paralelo
+from cache_associacao import ler_associacao, gravar_associacao
+from cache_malha import carregar_malha
+from carregador_obj import ler_obj
+from grafo_tarefas import executar_grafo
+from indice_espacial import construir_kdtree
+from malha import Malha, como_malha
+
+# parâmetros de normalizar_modelo; fazem parte da chave do cache de malhas
+NORMALIZACAO = {'raio': 1.0}
+
+# as 6 ordens possíveis dos vértices de um triângulo (mesma ordem de tentativa do align_triangle_vertices antigo)
+PERMUTACOES = np.array([[0, 1, 2], [1, 2, 0], [2, 0, 1], [2, 1, 0], [1, 0, 2], [0, 2, 1]])
+SEM_PAR = 255  # em 'permutacoes': face de A sem par em B
+PESO_NORMAL = 0.5  # padrão de associate_faces com k > 1
+
+
+def permutacoes_alinhamento(trisA, trisB):
+    """Índice em PERMUTACOES (F,) uint8 da ordem dos vértices de cada triângulo de trisB (F,3,3) que
+    coincide melhor com trisA (F,3,3): a de menor soma de distâncias (no empate, a primeira)."""
+    perms = trisB[:, PERMUTACOES]                              # (F,6,3,3)
+    diff = perms - trisA[:, None]
+    dist = np.sqrt(np.einsum('fpvk,fpvk->fpv', diff, diff))    # (F,6,3)
+    custo = dist[..., 0] + dist[..., 1] + dist[..., 2]
+    return np.argmin(custo, axis=1).astype(np.uint8)
+
+
+def preparar_morph(modelA, modelB, associations, permutacoes=None):
+    """Monta os triângulos de início e fim do morph: dict com 'inicio' e 'fim', arrays (F,3,3) float32, e
+    'permutacoes' (F,) uint8, a ordem (em PERMUTACOES) dos vértices da face de B de cada face de A (SEM_PAR
+    nas faces de A sem par em B, que ficam paradas: fim = inicio). Com `permutacoes` já calculadas (cache
+    de associações) o alinhamento não é refeito."""
+    modelA, modelB = como_malha(modelA), como_malha(modelB)
+    vA, vB = modelA.vertices, modelB.vertices
+    facesA, facesB = modelA.faces, modelB.faces
+
+    inicio = np.ascontiguousarray(vA[facesA])
+    fim = inicio.copy()
+
+    # associations: array (associate_faces) com -1 nas faces sem par; o que faltar no fim fica sem par
+    dados = np.asarray(associations, dtype=np.int64)[:len(facesA)]
+    assoc = np.full(len(facesA), -1, dtype=np.int64)
+    assoc[:len(dados)] = dados
+    com_par = np.flatnonzero((assoc >= 0) & (assoc < len(facesB)))
+    if permutacoes is None:
+        permutacoes = np.full(len(facesA), SEM_PAR, dtype=np.uint8)
+        permutacoes[com_par] = permutacoes_alinhamento(inicio[com_par], vB[facesB[assoc[com_par]]])
+    # vértices de B de cada par, já na ordem escolhida
+    ordem = facesB[assoc[com_par][:, None], PERMUTACOES[permutacoes[com_par]]]
+    fim[com_par] = vB[ordem]
+
+    return {'inicio': inicio, 'fim': fim, 'permutacoes': permutacoes}
+
+
+def criar_buffers(morph):
+    """Aloca os buffers usados por avaliar_morph. São criados uma vez e reaproveitados em todos os quadros:
+    'vertices' (F,3,3) e 'normais_vertices' (F,3,3) prontos para glDrawArrays, 'normais' (F,3) por face e
+    'linhas' (F,2,3) com o segmento de cada normal (centro -> centro + normal * escala)."""
+    F = len(morph['inicio'])
+    return {
+        'vertices': np.empty((F, 3, 3), dtype=np.float32),
+        'normais_vertices': np.empty((F, 3, 3), dtype=np.float32),
+        'normais': np.empty((F, 3), dtype=np.float32),
+        'linhas': np.empty((F, 2, 3), dtype=np.float32),
+        # rascunho
+        'fim_t': np.empty((F, 3, 3), dtype=np.float32),
+        'arestas': np.empty((2, F, 3), dtype=np.float32),
+        'produto': np.empty(F, dtype=np.float32),
+        'norma': np.empty(F, dtype=np.float32),
+        'nula': np.empty(F, dtype=bool),
+    }
+
+
+def avaliar_morph(morph, t, buffers, linhas=False, escala=0.08):
+    """Interpola todas as faces no instante t e calcula as normais por face, escrevendo em `buffers`
+    (criar_buffers) sem alocar arrays novos. Faces degeneradas ficam com normal (0,0,1).
+    Com linhas=True também preenche buffers['linhas'] (sobreposição de normais)."""
+    tri, n = buffers['vertices'], buffers['normais']
+    tmp, norma, nula = buffers['produto'], buffers['norma'], buffers['nula']
+
+    # tri = (1 - t) * inicio + t * fim
+    np.multiply(morph['inicio'], 1 - t, out=tri)
+    np.multiply(morph['fim'], t, out=buffers['fim_t'])
+    np.add(tri, buffers['fim_t'], out=tri)
+
+    # n = (v1 - v0) x (v2 - v0), componente a componente
+    e1, e2 = buffers['arestas']
+    np.subtract(tri[:, 1], tri[:, 0], out=e1)
+    np.subtract(tri[:, 2], tri[:, 0], out=e2)
+    for c, (a, b) in enumerate(((1, 2), (2, 0), (0, 1))):
+        np.multiply(e1[:, a], e2[:, b], out=n[:, c])
+        np.multiply(e1[:, b], e2[:, a], out=tmp)
+        np.subtract(n[:, c], tmp, out=n[:, c])
+
+    np.einsum('ij,ij->i', n, n, out=norma)
+    np.sqrt(norma, out=norma)
+    np.equal(norma, 0, out=nula)
+    np.copyto(n, (0.0, 0.0, 1.0), where=nula[:, None])
+    np.copyto(norma, 1.0, where=nula)
+    np.divide(n, norma[:, None], out=n)
+    np.copyto(buffers['normais_vertices'], n[:, None, :])
+
+    if linhas:
+        centro, ponta = buffers['linhas'][:, 0], buffers['linhas'][:, 1]
+        np.add(tri[:, 0], tri[:, 1], out=centro)
+        np.add(centro, tri[:, 2], out=centro)
+        np.divide(centro, 3, out=centro)
+        np.multiply(n, escala, out=ponta)
+        np.add(ponta, centro, out=ponta)
+    return buffers
+
+
+def atualizar_morph(morph, t, buffers, linhas=False, escala=0.08):
+    """Como avaliar_morph, mas só recalcula quando t mudou desde a última chamada com estes buffers (ou
+    quando as linhas das normais são pedidas e ainda não foram montadas para este t). Guarda o instante
+    em buffers['t'] e buffers['t_linhas']; retorna True se os buffers mudaram."""
+    if buffers.get('t') == t and (not linhas or buffers.get('t_linhas') == t):
+        return False
+    avaliar_morph(morph, t, buffers, linhas, escala)
+    buffers['t'] = t
+    buffers['t_linhas'] = t if linhas else None
+    return True
+
+
+# Modelos e associação
+
+def carregar_obj(path):
+    # Usa o leitor vetorizado compartilhado (carregador_obj.py): vértices e normais em arrays (N,3)
+    # float32 e faces (F,3) int32, já trianguladas em leque, numa Malha (malha.py).
+    obj = ler_obj(path)
+    return Malha(obj['vertices'], obj['faces'], obj['normais'])
+
+
+def normalizar_modelo(model, raio=1.0):
+    """Centraliza e escala o modelo no lugar (Malha.normalizar). Durante a migração também aceita o dict
+    antigo, cujo 'vertices' passa a ser o array normalizado."""
+    if isinstance(model, Malha):
+        model.normalizar(raio)
+    elif len(model['vertices']):
+        model['vertices'] = Malha.de_dict(model).normalizar(raio).vertices
+
+
+def preparar_modelo(path):
+    """Lê e normaliza um .OBJ, devolvendo os arrays que vão para o cache de malhas."""
+    model = carregar_obj(path)
+    model.normalizar(**NORMALIZACAO)
+    return model.como_dict()
+
+
+def carregar_modelo(path):
+    """Modelo já normalizado (Malha), vindo do cache de malhas quando possível."""
+    return Malha.de_dict(carregar_malha(path, preparar_modelo, {'normalizar_modelo': NORMALIZACAO}))
+
+
+def normais_faces(model):
+    """Normal unitária de todas as faces de uma vez ((0,0,1) nas degeneradas; guardada na Malha)."""
+    return como_malha(model).normais_faces
+
+
+def centroides_associacao(model):
+    """Centróides das faces em float64 (média dos 3 vértices, como na busca exaustiva antiga), usados na
+    associação para que as distâncias e os empates saiam iguais aos dela."""
+    model = como_malha(model)
+    return model.vertices.astype(np.float64)[model.faces].mean(axis=1)
+
+
+def associate_faces(modelA, modelB, k=1, peso_normal=PESO_NORMAL, arvore=None):
+    """Associa cada face de A a uma face de B pelo centróide mais próximo.
+    Retorna o array assoc (F,) int32 onde assoc[i] = j (índice de face em B; -1 se B não tem faces).
+    Os centróides de B vão para uma árvore k-d (indice_espacial.py; `arvore`, se já construída, sobre
+    centroides_associacao(B)) e todas as faces de A são consultadas de uma vez, com distâncias em float64
+    e, no empate, a face de menor índice, como na busca exaustiva. Com k > 1, escolhe entre os k
+    centróides mais próximos o de menor distância * (1 + peso_normal * (1 - cos)), onde cos é o cosseno
+    entre as normais das duas faces. Malhas grandes são divididas entre processos (associacao_paralela.py)."""
+    centA = centroides_associacao(modelA)
+    if len(como_malha(modelB).faces) == 0:
+        return np.full(len(centA), -1, dtype=np.int32)
+
+    if arvore is None:
+        arvore = construir_kdtree(centroides_associacao(modelB))
+    if k == 1:
+        assoc = associar_paralelo(arvore, centA)
+    else:
+        assoc = associar_paralelo(arvore, centA, k, normais_faces(modelA), normais_faces(modelB), peso_normal)
+    return assoc.astype(np.int32)
+
+
+def _pre_calcular(model, vizinhos):
+    """Normais das faces (com vizinhos > 1) guardadas na Malha antes da associação."""
+    if vizinhos > 1:
+        model.normais_faces
+    return model
+
+
+def _verificar_par(modelA, modelB):
+    if len(modelA['faces']) == 0 or len(modelB['faces']) == 0:
+        raise ValueError("um dos modelos não contém faces trianguladas ou está vazio")
+
+
+def carregar_par(pathA, pathB, vizinhos=1, tempos=None):
+    """Carrega os dois modelos já normalizados, associa as faces e prepara o morph (tudo sem OpenGL).
+    A leitura e o pré-cálculo de cada modelo rodam em paralelo (grafo_tarefas.py); `tempos` (lista), se
+    dada, recebe o tempo de cada etapa. Associação e alinhamento vêm do cache de associações quando o par
+    já foi aberto com os mesmos parâmetros. Retorna (modelA, modelB, associations, morph)."""
+    parametros = {'normalizar_modelo': NORMALIZACAO, 'vizinhos': vizinhos, 'peso_normal': PESO_NORMAL}
+
+    def arvore_b(modelB, guardado):
+        return construir_kdtree(centroides_associacao(modelB)) if guardado is None and len(modelB.faces) else None
+
+    def associar(modelA, modelB, arvore, guardado):
+        _verificar_par(modelA, modelB)
+        if guardado is not None:
+            return guardado[0]
+        return associate_faces(modelA, modelB, k=vizinhos, arvore=arvore)
+
+    def gravar(morph, associations, guardado):
+        if guardado is None:
+            gravar_associacao(pathA, pathB, parametros, associations, morph['permutacoes'])
+
+    r = executar_grafo({
+        'carregar A': (lambda: carregar_modelo(pathA), []),
+        'carregar B': (lambda: carregar_modelo(pathB), []),
+        'cache (leitura)': (lambda a: ler_associacao(pathA, pathB, parametros, len(a.faces)), ['carregar A']),
+        'pré-cálculo A': (lambda m: _pre_calcular(m, vizinhos), ['carregar A']),
+        'pré-cálculo B': (lambda m: _pre_calcular(m, vizinhos), ['carregar B']),
+        'árvore k-d B': (arvore_b, ['pré-cálculo B', 'cache (leitura)']),
+        # associa faces A -> B
+        'associação': (associar, ['pré-cálculo A', 'pré-cálculo B', 'árvore k-d B', 'cache (leitura)']),
+        # alinha os vértices de cada par uma vez só; a cada quadro basta interpolar
+        'alinhamento': (lambda a, b, assoc, guardado: preparar_morph(a, b, assoc, guardado and guardado[1]),
+                        ['pré-cálculo A', 'pré-cálculo B', 'associação', 'cache (leitura)']),
+        'cache (gravação)': (gravar, ['alinhamento', 'associação', 'cache (leitura)']),
+    }, tempos=tempos)
+    return r['pré-cálculo A'], r['pré-cálculo B'], r['associação'], r['alinhamento']
@@ -0,0 +1,338 @@
+# rasterizador.py
+# [mvfm] - Rasterizador em software (só NumPy) para gerar imagens dos modelos e do morph sem OpenGL
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Reproduz a cena dos morphers sem precisar de Mesa nem de PyOpenGL: mesma câmera (gluLookAt +
+# gluPerspective(45, ..., 0.1, 100)), mesma rotação em Y e a iluminação de GL_LIGHT0 / material definida
+# em inicializar (morphing3d.py), calculada por vértice como no pipeline fixo. O sombreamento pode ser
+# 'gouraud' (cor interpolada com correção de perspectiva, como GL_SMOOTH) ou 'flat' (cor do último
+# vértice do triângulo, como GL_FLAT).
+#
+# Tudo é vetorizado: a montagem dos triângulos (coeficientes baricêntricos, profundidade, cor / w) é
+# feita para todos de uma vez, e a tela é dividida em blocos; em cada bloco os pixels candidatos (caixa
+# envolvente de cada triângulo recortada no bloco) são gerados em lotes de tamanho limitado, testados e
+# resolvidos no z-buffer do bloco. A memória fica limitada pelo tamanho do lote, não pela malha.
+# Triângulos que cruzam o plano próximo são descartados (não há recorte).
+#
+# Uso: python rasterizador.py [opções] modelo.obj [modeloB.obj]
+#    --tamanho=LxA      - tamanho da imagem (padrão: 1024x700, a janela dos morphers)
+#    --camera=x,y,z     - posição da câmera (padrão: 0,0,3.5)
+#    --alvo=Y           - altura para onde a câmera olha
+#    --rotacao=GRAUS    - rotação do modelo em torno de Y
+#    --t=T              - instante do morph, com dois modelos (0 a 1)
+#    --vizinhos=K       - como nos morphers
+#    --sombreamento=S   - gouraud (padrão) ou flat
+#    --suave            - normais por vértice (média das faces vizinhas) em vez da normal da face
+#    --saida=ARQUIVO    - .png (padrão: saida.png) ou .rgba/.raw para RGBA cru
+#    --no-cache, --rebuild-cache - como nos programas com janela
+
+import math
+import sys
+import time
+
+import numpy as np
+
+from cache_malha import opcoes_cache
+from nucleo_morph import carregar_modelo, carregar_par, criar_buffers, avaliar_morph
+from renderizador_offscreen import gravar_imagem
+
+# cena dos morphers (morphing3d.py: inicializar, redimensionar e desenhar_cena)
+CAMERA = (0.0, 0.0, 3.5)
+FUNDO = (0.06, 0.06, 0.06)
+FOVY, PERTO, LONGE = 45.0, 0.1, 100.0
+LUZ = {'posicao': (0.0, 5.0, 5.0, 1.0), 'ambiente': (0.25, 0.25, 0.25),
+       'difusa': (0.95, 0.95, 0.95), 'especular': (0.8, 0.8, 0.8)}
+# difusa, especular e brilho de glMaterialfv; ambiente e luz ambiente global são os padrões do OpenGL
+MATERIAL = {'ambiente': (0.2, 0.2, 0.2), 'difusa': (1.0, 1.0, 1.0), 'especular': (1.0, 1.0, 1.0), 'brilho': 32.0}
+AMBIENTE_GLOBAL = (0.2, 0.2, 0.2)
+
+SOMBREAMENTOS = ('gouraud', 'flat')
+BLOCO = 128                  # lado dos blocos da tela, em pixels
+FRAGMENTOS_POR_LOTE = 1 << 20  # pixels candidatos avaliados de uma vez
+
+
+def matriz_camera(camera, alvo=0.0):
+    """Matriz 4x4 de gluLookAt(camera, (0, alvo, 0), (0, 1, 0))."""
+    olho = np.asarray(camera, dtype=np.float64)
+    f = np.array([0.0, alvo, 0.0]) - olho
+    f /= np.linalg.norm(f)
+    s = np.cross(f, (0.0, 1.0, 0.0))
+    s /= np.linalg.norm(s)
+    u = np.cross(s, f)
+    m = np.identity(4)
+    m[0, :3], m[1, :3], m[2, :3] = s, u, -f
+    m[:3, 3] = -m[:3, :3] @ olho
+    return m
+
+
+def matriz_rotacao_y(graus):
+    """Matriz 4x4 de glRotatef(graus, 0, 1, 0)."""
+    c, s = math.cos(math.radians(graus)), math.sin(math.radians(graus))
+    return np.array([[c, 0, s, 0], [0, 1, 0, 0], [-s, 0, c, 0], [0, 0, 0, 1]], dtype=np.float64)
+
+
+def iluminar(posicoes, normais, luz_olho):
+    """Cor de GL_LIGHT0 (pipeline fixo, observador no infinito, sem two-side) para posições e normais
+    unitárias em coordenadas do olho, arrays (..., 3). Retorna (..., 3) em [0, 1]."""
+    amb = np.multiply(MATERIAL['ambiente'], AMBIENTE_GLOBAL) + np.multiply(MATERIAL['ambiente'], LUZ['ambiente'])
+    dif = np.multiply(MATERIAL['difusa'], LUZ['difusa']).astype(np.float32)
+    esp = np.multiply(MATERIAL['especular'], LUZ['especular']).astype(np.float32)
+
+    if luz_olho[3] == 0:
+        l = np.broadcast_to(np.asarray(luz_olho[:3], dtype=np.float32), posicoes.shape).copy()
+    else:
+        l = np.asarray(luz_olho[:3], dtype=np.float32) - posicoes
+    l /= np.maximum(np.linalg.norm(l, axis=-1, keepdims=True), 1e-20)
+    nl = np.einsum('...k,...k->...', normais, l)
+
+    h = l
+    h[..., 2] += 1.0
+    h /= np.maximum(np.linalg.norm(h, axis=-1, keepdims=True), 1e-20)
+    nh = np.maximum(np.einsum('...k,...k->...', normais, h), 0.0)
+
+    acesa = nl > 0
+    cor = np.empty(posicoes.shape, dtype=np.float32)
+    cor[...] = amb
+    cor += np.where(acesa, nl, 0.0)[..., None] * dif
+    cor += np.where(acesa, nh ** MATERIAL['brilho'], 0.0)[..., None] * esp
+    return np.clip(cor, 0.0, 1.0, out=cor)
+
+
+def normais_faces_triangulos(triangulos):
+    """Normal unitária de cada triângulo (F,3,3) -> (F,3); (0,0,1) nos degenerados, como avaliar_morph."""
+    n = np.cross(triangulos[:, 1] - triangulos[:, 0], triangulos[:, 2] - triangulos[:, 0])
+    norma = np.linalg.norm(n, axis=1)
+    nula = norma == 0
+    n[nula] = (0.0, 0.0, 1.0)
+    norma[nula] = 1.0
+    return n / norma[:, None]
+
+
+def normais_suaves(triangulos, faces):
+    """Normais por canto (F,3,3): soma das normais (com peso pela área) das faces que usam o mesmo índice
+    de vértice em `faces` (F,3), normalizada."""
+    faces = np.asarray(faces).reshape(-1, 3)
+    n = np.cross(triangulos[:, 1] - triangulos[:, 0], triangulos[:, 2] - triangulos[:, 0])
+    soma = np.zeros((int(faces.max()) + 1 if len(faces) else 0, 3), dtype=np.float64)
+    for canto in range(3):
+        np.add.at(soma, faces[:, canto], n)
+    norma = np.linalg.norm(soma, axis=1, keepdims=True)
+    soma = np.where(norma > 0, soma / np.where(norma > 0, norma, 1.0), (0.0, 0.0, 1.0))
+    return soma[faces].astype(np.float32)
+
+
+def _montar(triangulos, normais, largura, altura, camera, alvo, rotacao, sombreamento):
+    """Transforma, ilumina e prepara todos os triângulos para a rasterização. Retorna um dict com a caixa
+    envolvente em pixels, os coeficientes baricêntricos em tela, a profundidade e a cor / w por vértice."""
+    visao = matriz_camera(camera, alvo)
+    modelview = visao @ matriz_rotacao_y(rotacao)
+    luz_olho = visao @ np.asarray(LUZ['posicao'], dtype=np.float64)
+
+    tri = np.asarray(triangulos, dtype=np.float32).reshape(-1, 3, 3)
+    olho = tri @ modelview[:3, :3].T.astype(np.float32) + modelview[:3, 3].astype(np.float32)
+    if normais is None:
+        n = np.repeat(normais_faces_triangulos(tri)[:, None], 3, axis=1)
+    else:
+        n = np.asarray(normais, dtype=np.float32).reshape(-1, 3, 3)
+    n = n @ modelview[:3, :3].T.astype(np.float32)
+    n /= np.maximum(np.linalg.norm(n, axis=2, keepdims=True), 1e-20)   # GL_NORMALIZE
+    cor = iluminar(olho, n, luz_olho)
+    if sombreamento == 'flat':
+        cor[:] = cor[:, 2:3]
+
+    # projeção (gluPerspective) e viewport; y da imagem cresce para baixo
+    f = 1.0 / math.tan(math.radians(FOVY) / 2)
+    w = -olho[..., 2]
+    visivel = (w >= PERTO).all(axis=1)
+    # a montagem em tela é feita em float64 para que arestas compartilhadas não deixem furos
+    tri, w, cor = olho[visivel].astype(np.float64), w[visivel].astype(np.float64), cor[visivel]
+    inv_w = 1.0 / w
+    x = (tri[..., 0] * (f * altura / largura) * inv_w + 1.0) * (largura / 2)
+    y = (1.0 - tri[..., 1] * f * inv_w) * (altura / 2)
+    z = ((LONGE + PERTO) / (PERTO - LONGE) * tri[..., 2] + 2 * LONGE * PERTO / (PERTO - LONGE)) * inv_w
+
+    x0, x1, x2 = x[:, 0], x[:, 1], x[:, 2]
+    y0, y1, y2 = y[:, 0], y[:, 1], y[:, 2]
+    area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+    # pixel i é coberto se o centro (i + 0.5) estiver dentro do triângulo
+    xmin = np.maximum(np.ceil(x.min(axis=1) - 0.5), 0).astype(np.int32)
+    xmax = np.minimum(np.floor(x.max(axis=1) - 0.5), largura - 1).astype(np.int32)
+    ymin = np.maximum(np.ceil(y.min(axis=1) - 0.5), 0).astype(np.int32)
+    ymax = np.minimum(np.floor(y.max(axis=1) - 0.5), altura - 1).astype(np.int32)
+    ok = (area != 0) & (xmin <= xmax) & (ymin <= ymax) & (z.max(axis=1) > -1) & (z.min(axis=1) < 1)
+
+    area, x, y = area[ok], x[ok], y[ok]
+    # lambda_i(px, py) = a_i * px + b_i * py + c_i, para os três vértices
+    xs, ys = x[:, [1, 2, 0]], y[:, [1, 2, 0]]
+    xt, yt = x[:, [2, 0, 1]], y[:, [2, 0, 1]]
+    inv_area = (1.0 / area)[:, None]
+    a, b, c = (ys - yt) * inv_area, (xt - xs) * inv_area, (xs * yt - xt * ys) * inv_area
+    z = z[ok]
+    return {
+        'largura': largura,
+        'xmin': xmin[ok], 'xmax': xmax[ok], 'ymin': ymin[ok], 'ymax': ymax[ok],
+        'a': a, 'b': b, 'c': c,
+        # plano da profundidade em tela: z = za * px + zb * py + zc
+        'z': np.stack([(a * z).sum(axis=1), (b * z).sum(axis=1), (c * z).sum(axis=1)], axis=1),
+        'cor_w': (cor[ok] * inv_w[ok][..., None]).astype(np.float32),
+        'inv_w': inv_w[ok].astype(np.float32),
+    }
+
+
+def _rasterizar_lote(m, sel, bx0, by0, bx1, by1, zbloco, pixels):
+    """Rasteriza os triângulos `sel` dentro do bloco, linha a linha, e resolve no z-buffer do bloco.
+    As cores vencedoras vão direto para `pixels` (a imagem RGBA como (altura * largura, 4))."""
+    ymin = np.maximum(m['ymin'][sel], by0)
+    alt = np.minimum(m['ymax'][sel], by1 - 1) - ymin + 1
+    alt = np.maximum(alt, 0)
+
+    # um par (triângulo, linha) por linha de pixels da caixa envolvente
+    qual = np.repeat(np.arange(len(sel)), alt)
+    py = np.arange(len(qual)) - np.repeat(np.cumsum(alt) - alt, alt) + ymin[qual]
+    t = sel[qual]
+    a = m['a'][t]
+    resto = m['b'][t] * (py + 0.5)[:, None] + m['c'][t]      # lambda_i = a_i * x + resto_i
+
+    # trecho da linha dentro das três arestas: lambda_i >= 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        limite = -resto / a
+    esquerda = np.where(a > 0, limite, -np.inf).max(axis=1)
+    direita = np.where(a < 0, limite, np.inf).min(axis=1)
+    vazia = ((a == 0) & (resto < 0)).any(axis=1)
+    x0 = np.maximum(np.ceil(esquerda - 0.5), np.maximum(m['xmin'][t], bx0))
+    x1 = np.minimum(np.floor(direita - 0.5), np.minimum(m['xmax'][t], bx1 - 1))
+    contagem = np.where(vazia, 0, np.maximum(x1 - x0 + 1, 0)).astype(np.int64)
+    total = int(contagem.sum())
+    if total == 0:
+        return
+
+    # fragmentos: pixel k do trecho da linha r
+    r = np.repeat(np.arange(len(contagem)), contagem)
+    px = np.arange(total) - np.repeat(np.cumsum(contagem) - contagem, contagem) + x0.astype(np.int64)[r]
+    cx = px + 0.5
+    cy = (py + 0.5)[r]
+    t = t[r]
+    plano = m['z'][t]
+    z = (plano[:, 0] * cx + plano[:, 1] * cy + plano[:, 2]).astype(np.float32)
+    py = py[r]
+    pixel = (py - by0) * (bx1 - bx0) + (px - bx0)
+
+    # teste de profundidade (GL_LESS): menor z por pixel, depois só os vencedores escrevem a cor
+    np.minimum.at(zbloco, pixel, z)
+    vence = z <= zbloco[pixel]
+    r, t, cx, px, py = r[vence], t[vence], cx[vence], px[vence], py[vence]
+    lam = (a[r] * cx[:, None] + resto[r]).astype(np.float32)
+    # correção de perspectiva: (soma lambda_i * cor_i / w_i) / (soma lambda_i / w_i)
+    cor = np.einsum('ij,ijk->ik', lam, m['cor_w'][t])
+    cor /= np.einsum('ij,ij->i', lam, m['inv_w'][t])[:, None]
+    np.clip(cor * 255 + 0.5, 0, 255, out=cor)
+    pixels[py * m['largura'] + px, :3] = cor
+
+
+def rasterizar(triangulos, normais=None, largura=1024, altura=700, camera=CAMERA, alvo=0.0, rotacao=0.0,
+               sombreamento='gouraud', fundo=FUNDO, bloco=BLOCO):
+    """Desenha triângulos (F,3,3) com a câmera, a rotação e a iluminação dos morphers.
+    `normais` são por canto (F,3,3); sem elas, cada triângulo usa a sua normal (como os programas).
+    Retorna a imagem (altura, largura, 4) uint8, linha de cima primeiro (igual a ler_rgba)."""
+    if sombreamento not in SOMBREAMENTOS:
+        raise ValueError(f"sombreamento desconhecido: {sombreamento}")
+    m = _montar(triangulos, normais, largura, altura, camera, alvo, rotacao, sombreamento)
+
+    rgba = np.empty((altura, largura, 4), dtype=np.uint8)
+    rgba[..., :3] = np.clip(np.multiply(fundo, 255) + 0.5, 0, 255).astype(np.uint8)
+    rgba[..., 3] = 255
+    pixels = rgba.reshape(-1, 4)
+    for by0 in range(0, altura, bloco):
+        by1 = min(by0 + bloco, altura)
+        na_faixa = np.flatnonzero((m['ymin'] < by1) & (m['ymax'] >= by0))
+        for bx0 in range(0, largura, bloco):
+            bx1 = min(bx0 + bloco, largura)
+            sel = na_faixa[(m['xmin'][na_faixa] < bx1) & (m['xmax'][na_faixa] >= bx0)]
+            if len(sel) == 0:
+                continue
+            zbloco = np.full((by1 - by0) * (bx1 - bx0), np.inf, dtype=np.float32)
+
+            # pixels candidatos de cada triângulo no bloco, para dividir em lotes
+            larg = np.minimum(m['xmax'][sel], bx1 - 1) - np.maximum(m['xmin'][sel], bx0) + 1
+            alt = np.minimum(m['ymax'][sel], by1 - 1) - np.maximum(m['ymin'][sel], by0) + 1
+            acumulado = np.cumsum(larg * alt)
+            inicio = 0
+            while inicio < len(sel):
+                # pelo menos um triângulo por lote, mesmo que ele sozinho passe do limite
+                base = acumulado[inicio - 1] if inicio else 0
+                fim = max(int(np.searchsorted(acumulado, base + FRAGMENTOS_POR_LOTE, 'right')), inicio + 1)
+                _rasterizar_lote(m, sel[inicio:fim], bx0, by0, bx1, by1, zbloco, pixels)
+                inicio = fim
+    return rgba
+
+
+def triangulos_modelo(caminho, suave=False):
+    """Triângulos (F,3,3) de um modelo normalizado (como nos morphers) e as normais por canto
+    (None = normal da face; com suave=True, média das faces vizinhas)."""
+    modelo = carregar_modelo(caminho)
+    faces = np.asarray(modelo['faces']).reshape(-1, 3)
+    tri = np.asarray(modelo['vertices'], dtype=np.float32).reshape(-1, 3)[faces]
+    return tri, (normais_suaves(tri, faces) if suave else None)
+
+
+def triangulos_morph(caminhoA, caminhoB, t, vizinhos=1, suave=False):
+    """Triângulos (F,3,3) do morph A -> B no instante t (avaliar_morph) e as normais por canto."""
+    modelA, _, _, morph = carregar_par(caminhoA, caminhoB, vizinhos)
+    buffers = avaliar_morph(morph, t, criar_buffers(morph))
+    tri = buffers['vertices']
+    if suave:
+        return tri, normais_suaves(tri, modelA['faces'])
+    return tri, buffers['normais_vertices']
+
+
+def _valor(args, nome, padrao=None):
+    return next((a.split('=', 1)[1] for a in args if a.startswith(f'--{nome}=')), padrao)
+
+
+def main():
+    args = opcoes_cache(sys.argv[1:])
+    modelos = [a for a in args if not a.startswith('--')]
+    if len(modelos) not in (1, 2):
+        print("Uso: python rasterizador.py [--tamanho=LxA] [--camera=x,y,z] [--alvo=Y] [--rotacao=GRAUS] [--t=T] "
+              "[--vizinhos=K] [--sombreamento=gouraud|flat] [--suave] [--saida=ARQUIVO] [--no-cache] "
+              "[--rebuild-cache] modelo.obj [modeloB.obj]")
+        sys.exit(1)
+
+    try:
+        largura, altura = (int(x) for x in _valor(args, 'tamanho', '1024x700').lower().split('x'))
+        camera = tuple(float(x) for x in _valor(args, 'camera', ','.join(map(str, CAMERA))).split(','))
+        alvo = float(_valor(args, 'alvo', 0.0))
+        rotacao = float(_valor(args, 'rotacao', 0.0))
+        t = float(_valor(args, 't', 0.0))
+        vizinhos = int(_valor(args, 'vizinhos', 1))
+        sombreamento = _valor(args, 'sombreamento', 'gouraud')
+        if len(camera) != 3 or sombreamento not in SOMBREAMENTOS:
+            raise ValueError("opção inválida")
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    suave = '--suave' in args
+    saida = _valor(args, 'saida', 'saida.png')
+
+    inicio = time.perf_counter()
+    try:
+        if len(modelos) == 2:
+            tri, normais = triangulos_morph(modelos[0], modelos[1], t, vizinhos, suave)
+        else:
+            tri, normais = triangulos_modelo(modelos[0], suave)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    leitura = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    rgba = rasterizar(tri, normais, largura, altura, camera, alvo, rotacao, sombreamento)
+    render = time.perf_counter() - inicio
+    gravar_imagem(saida, rgba)
+    print(f"{saida}: {largura}x{altura}, {len(tri)} triângulos, leitura {leitura:.3f}s, "
+          f"rasterização {render:.3f}s ({len(tri) / render:.0f} triângulos/s)")
+
+
+if __name__ == '__main__':
+    main()
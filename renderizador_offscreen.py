@@ -0,0 +1,284 @@
+# renderizador_offscreen.py
+# [mvfm] - Renderização sem janela (EGL sem superfície ou OSMesa) para servidores e testes automáticos
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Cria um contexto OpenGL fora da tela, desenha num framebuffer object e grava a imagem em PNG ou
+# RGBA cru. A cena é a mesma dos programas com janela: usa o inicializar, o redimensionar e o
+# desenharCena / desenhar_cena do programa escolhido, só trocando a janela pelo FBO. Funciona numa
+# máquina sem display e sem GPU com o Mesa (llvmpipe).
+#
+# O PyOpenGL escolhe a plataforma (EGL/OSMesa/GLX) no primeiro import, por isso este módulo só importa
+# OpenGL depois de usar_plataforma (e os programas são importados por nome, em carregar_programa).
+#
+# Uso: python renderizador_offscreen.py [opções] modelo.obj [modeloB.obj]
+#    --programa=NOME    - visualizador3D, visualizador3DGLFW, morphing3d ou morphing3DGLFW
+#                         (padrão: visualizador3D com um modelo, morphing3d com dois)
+#    --plataforma=P     - egl (padrão) ou osmesa
+#    --tamanho=LxA      - tamanho da imagem (padrão: o da janela do programa)
+#    --camera=x,y,z     - posição da câmera (padrão: a do programa)
+#    --alvo=Y           - altura para onde a câmera olha (altVisao)
+#    --rotacao=GRAUS    - rotação do modelo em torno de Y
+#    --t=T              - instante do morph (0 a 1)
+#    --modo=M           - fill (padrão), line ou point
+#    --normais          - desenha a sobreposição de normais
+#    --gpu              - morph no shader (morph_gpu.py)
+#    --vizinhos=K       - como nos morphers
+#    --saida=ARQUIVO    - .png (padrão: saida.png) ou .rgba/.raw para RGBA cru, linha de cima primeiro
+#    --no-cache, --rebuild-cache, --no-vbo - como nos programas com janela
+
+import ctypes
+import importlib
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+PROGRAMAS = ('visualizador3D', 'visualizador3DGLFW', 'morphing3d', 'morphing3DGLFW')
+PLATAFORMAS = ('egl', 'osmesa')
+MODOS = ('fill', 'line', 'point')
+
+EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+
+
+def usar_plataforma(plataforma):
+    """Define a plataforma do PyOpenGL; precisa vir antes de qualquer import de OpenGL."""
+    if plataforma not in PLATAFORMAS:
+        raise ValueError(f"plataforma desconhecida: {plataforma}")
+    if 'OpenGL.GL' in sys.modules and os.environ.get('PYOPENGL_PLATFORM') != plataforma:
+        raise RuntimeError("o OpenGL já foi importado com outra plataforma")
+    os.environ['PYOPENGL_PLATFORM'] = plataforma
+
+
+def _contexto_egl():
+    from OpenGL import EGL
+    display = EGL.eglGetPlatformDisplayEXT(EGL_PLATFORM_SURFACELESS_MESA, EGL.EGL_DEFAULT_DISPLAY, None)
+    if not display:
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    maior, menor = EGL.EGLint(), EGL.EGLint()
+    if not EGL.eglInitialize(display, ctypes.pointer(maior), ctypes.pointer(menor)):
+        raise RuntimeError("eglInitialize falhou")
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    config, n = EGL.EGLConfig(), EGL.EGLint()
+    atributos = (EGL.EGLint * 5)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                                 EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE)
+    if not EGL.eglChooseConfig(display, atributos, ctypes.pointer(config), 1, ctypes.pointer(n)) or n.value == 0:
+        raise RuntimeError("nenhuma configuração EGL com OpenGL")
+    contexto = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+    if not contexto or not EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, contexto):
+        raise RuntimeError("não foi possível criar o contexto EGL sem superfície")
+    return {'display': display, 'contexto': contexto}
+
+
+def _contexto_osmesa(largura, altura):
+    from OpenGL import osmesa, arrays
+    from OpenGL.GL import GL_UNSIGNED_BYTE
+    contexto = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+    if not contexto:
+        raise RuntimeError("OSMesaCreateContextExt falhou")
+    # o OSMesa precisa de um buffer próprio, mesmo desenhando no FBO
+    buffer = arrays.GLubyteArray.zeros((altura, largura, 4))
+    if not osmesa.OSMesaMakeCurrent(contexto, buffer, GL_UNSIGNED_BYTE, largura, altura):
+        raise RuntimeError("OSMesaMakeCurrent falhou")
+    return {'contexto': contexto, 'buffer': buffer}
+
+
+def criar_contexto(largura, altura, plataforma='egl'):
+    """Cria um contexto OpenGL fora da tela com um FBO (cor RGBA8 + profundidade) de largura x altura,
+    já ativo. Levanta RuntimeError se a plataforma não estiver disponível."""
+    usar_plataforma(plataforma)
+    try:
+        ctx = _contexto_egl() if plataforma == 'egl' else _contexto_osmesa(largura, altura)
+    except (ImportError, AttributeError, OSError) as e:
+        raise RuntimeError(f"plataforma {plataforma} indisponível ({e})")
+
+    from OpenGL.GL import (glGenFramebuffers, glBindFramebuffer, glGenRenderbuffers, glBindRenderbuffer,
+                           glRenderbufferStorage, glFramebufferRenderbuffer, glCheckFramebufferStatus,
+                           glViewport, GL_FRAMEBUFFER, GL_RENDERBUFFER, GL_RGBA8, GL_DEPTH_COMPONENT24,
+                           GL_COLOR_ATTACHMENT0, GL_DEPTH_ATTACHMENT, GL_FRAMEBUFFER_COMPLETE)
+    fbo = glGenFramebuffers(1)
+    glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+    for formato, anexo in ((GL_RGBA8, GL_COLOR_ATTACHMENT0), (GL_DEPTH_COMPONENT24, GL_DEPTH_ATTACHMENT)):
+        rb = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, formato, largura, altura)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, anexo, GL_RENDERBUFFER, rb)
+    if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+        raise RuntimeError("framebuffer object incompleto")
+    glViewport(0, 0, largura, altura)
+
+    ctx.update({'plataforma': plataforma, 'largura': largura, 'altura': altura, 'fbo': fbo})
+    return ctx
+
+
+def ler_rgba(largura, altura):
+    """Lê o framebuffer atual como array (altura, largura, 4) uint8, linha de cima primeiro."""
+    from OpenGL.GL import glFinish, glPixelStorei, glReadPixels, GL_PACK_ALIGNMENT, GL_RGBA, GL_UNSIGNED_BYTE
+    glFinish()
+    glPixelStorei(GL_PACK_ALIGNMENT, 1)
+    dados = glReadPixels(0, 0, largura, altura, GL_RGBA, GL_UNSIGNED_BYTE)
+    return np.frombuffer(dados, dtype=np.uint8).reshape(altura, largura, 4)[::-1].copy()
+
+
+def gravar_png(caminho, rgba):
+    """Grava um array (altura, largura, 4) uint8 como PNG RGBA de 8 bits (só com zlib)."""
+    altura, largura = rgba.shape[:2]
+    # cada linha começa com o byte de filtro 0 (nenhum)
+    linhas = np.zeros((altura, 1 + largura * 4), dtype=np.uint8)
+    linhas[:, 1:] = rgba.reshape(altura, -1)
+
+    def bloco(tipo, dados):
+        return (struct.pack('>I', len(dados)) + tipo + dados +
+                struct.pack('>I', zlib.crc32(tipo + dados) & 0xffffffff))
+
+    with open(caminho, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(bloco(b'IHDR', struct.pack('>IIBBBBB', largura, altura, 8, 6, 0, 0, 0)))
+        f.write(bloco(b'IDAT', zlib.compress(linhas.tobytes(), 6)))
+        f.write(bloco(b'IEND', b''))
+
+
+def gravar_imagem(caminho, rgba):
+    """Grava em PNG, ou em RGBA cru se a extensão for .rgba ou .raw."""
+    if os.path.splitext(caminho)[1].lower() in ('.rgba', '.raw'):
+        with open(caminho, 'wb') as f:
+            f.write(np.ascontiguousarray(rgba, dtype=np.uint8).tobytes())
+    else:
+        gravar_png(caminho, rgba)
+
+
+def carregar_programa(nome):
+    """Importa um dos programas (visualizador3D, morphing3d, ...) pelo nome."""
+    if nome not in PROGRAMAS:
+        raise ValueError(f"programa desconhecido: {nome}")
+    return importlib.import_module(nome)
+
+
+def preparar_cena(programa, modelos, ctx, gpu=False, vizinhos=1, lod=False):
+    """Carrega o(s) modelo(s) no programa e prepara o estado OpenGL (inicializar + envio para a placa)
+    no contexto `ctx` (criar_contexto). Com lod=True os visualizadores também montam os níveis de detalhe."""
+    largura, altura = ctx['largura'], ctx['altura']
+    nome = programa.__name__
+    if nome.startswith('morphing'):
+        if len(modelos) != 2:
+            raise ValueError(f"{nome} precisa de dois modelos")
+        programa.carregar_morph(modelos[0], modelos[1], vizinhos)
+        programa.usar_gpu = gpu
+    elif nome == 'visualizador3D':
+        programa.carregarObjeto(modelos[0], lod)
+    else:
+        programa.carregar_objeto(modelos[0], lod)
+
+    programa.inicializar()
+    if nome == 'morphing3DGLFW':
+        programa.on_resize(None, largura, altura)
+    else:
+        programa.redimensionar(largura, altura)
+    if hasattr(programa, 'windowWidth'):
+        programa.windowWidth, programa.windowHeight = largura, altura
+
+    if nome.startswith('morphing'):
+        programa.enviar_morph_gl()
+    elif nome == 'visualizador3D':
+        programa.enviarObjetoGL()
+    else:
+        programa.enviar_objeto_gl()
+
+
+def renderizar_quadro(programa, ctx, camera=None, alvo=None, rotacao=0.0, t=0.0, modo='fill', normais=False):
+    """Desenha um quadro com desenharCena/desenhar_cena do programa e retorna a imagem RGBA."""
+    from OpenGL.GL import glPolygonMode, GL_FRONT_AND_BACK, GL_FILL, GL_LINE, GL_POINT
+    modo_gl = {'fill': GL_FILL, 'line': GL_LINE, 'point': GL_POINT}[modo]
+
+    if camera is not None:
+        programa.cameraPos = list(camera)
+    if alvo is not None:
+        programa.altVisao = alvo
+    programa.rotation = rotacao
+    programa.mostrarNormais = normais
+    if hasattr(programa, 'morph_t'):
+        programa.morph_t = t
+    # o visualizador GLFW guarda o modo numa global; os outros leem o estado do GL
+    if hasattr(programa, 'modo'):
+        programa.modo = modo_gl
+    glPolygonMode(GL_FRONT_AND_BACK, modo_gl)
+
+    if hasattr(programa, 'desenharCena'):
+        programa.desenharCena()
+    else:
+        programa.desenhar_cena()
+    return ler_rgba(ctx['largura'], ctx['altura'])
+
+
+def _valor(args, nome, padrao=None):
+    return next((a.split('=', 1)[1] for a in args if a.startswith(f'--{nome}=')), padrao)
+
+
+def main():
+    args = sys.argv[1:]
+    modelos = [a for a in args if not a.startswith('--')]
+    if not 1 <= len(modelos) <= 2:
+        print("Uso: python renderizador_offscreen.py [--programa=NOME] [--plataforma=egl|osmesa] [--tamanho=LxA] "
+              "[--camera=x,y,z] [--alvo=Y] [--rotacao=GRAUS] [--t=T] [--modo=fill|line|point] [--normais] [--gpu] "
+              "[--vizinhos=K] [--saida=ARQUIVO.png|.rgba] [--no-cache] [--rebuild-cache] [--no-vbo] "
+              "modelo.obj [modeloB.obj]")
+        sys.exit(1)
+
+    try:
+        nome = _valor(args, 'programa', 'morphing3d' if len(modelos) == 2 else 'visualizador3D')
+        plataforma = _valor(args, 'plataforma', 'egl')
+        modo = _valor(args, 'modo', 'fill')
+        if modo not in MODOS:
+            raise ValueError(f"modo desconhecido: {modo}")
+        camera = _valor(args, 'camera')
+        camera = [float(x) for x in camera.split(',')] if camera else None
+        if camera is not None and len(camera) != 3:
+            raise ValueError("--camera precisa de 3 valores")
+        alvo = _valor(args, 'alvo')
+        alvo = float(alvo) if alvo is not None else None
+        rotacao = float(_valor(args, 'rotacao', 0.0))
+        t = float(_valor(args, 't', 0.0))
+        vizinhos = int(_valor(args, 'vizinhos', 1))
+        saida = _valor(args, 'saida', 'saida.png')
+        tamanho = _valor(args, 'tamanho')
+
+        usar_plataforma(plataforma)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    try:
+        programa = carregar_programa(nome)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    except (ImportError, AttributeError) as e:
+        # sem a biblioteca da plataforma o próprio import do OpenGL falha
+        print(f"Erro: plataforma {plataforma} indisponível ({e})")
+        sys.exit(1)
+
+    from cache_malha import opcoes_cache
+    from malha_gl import opcoes_gl
+    opcoes_gl(opcoes_cache(args))
+
+    if tamanho:
+        largura, altura = (int(x) for x in tamanho.lower().split('x'))
+    else:
+        largura = getattr(programa, 'windowWidth', getattr(programa, 'window_width', 800))
+        altura = getattr(programa, 'windowHeight', getattr(programa, 'window_height', 600))
+
+    try:
+        ctx = criar_contexto(largura, altura, plataforma)
+        preparar_cena(programa, modelos, ctx, gpu='--gpu' in args, vizinhos=vizinhos)
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+
+    rgba = renderizar_quadro(programa, ctx, camera, alvo, rotacao, t, modo, '--normais' in args)
+    gravar_imagem(saida, rgba)
+    print(f"{saida}: {largura}x{altura} ({nome}, {plataforma})")
+
+
+if __name__ == '__main__':
+    main()
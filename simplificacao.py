@@ -0,0 +1,311 @@
+# simplificacao.py
+# [mvfm] - Simplificação de malhas por métrica de erro quádrica e cadeia de níveis de detalhe (LOD)
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Cada vértice acumula a quádrica (Garland & Heckbert) dos planos das faces em volta, ponderada pela
+# área, e as arestas de borda ganham planos perpendiculares com peso alto para o contorno não encolher.
+# O colapso de arestas é feito em rodadas vetorizadas em vez de uma fila de prioridade: a cada rodada
+# o custo de todas as arestas é calculado de uma vez, são escolhidas as arestas que são as mais baratas
+# para os dois vértices (um emparelhamento: nenhum vértice entra em dois colapsos) e, dessas, as mais
+# baratas até o número de triângulos que falta tirar. Colapsos que virariam alguma face ao contrário
+# são descartados. O resultado é próximo do algoritmo sequencial e roda em poucas dezenas de rodadas.
+#
+# cadeia_lod monta os níveis (por padrão 100/50/25/10% dos triângulos) continuando a simplificação de
+# um nível para o seguinte; preparar_lod faz o mesmo a partir de um .OBJ, no formato do cache_malha.
+# Malhas que não podem mais ser reduzidas (nenhum colapso sobra, ou só sobraria uma malha vazia) dão
+# uma cadeia mais curta.
+#
+# Opções de linha de comando (tratadas por opcoes_lod):
+#    --no-lod         - não monta a cadeia de níveis (desenha sempre o modelo completo)
+#    --lod=F1,F2,...  - frações de triângulos de cada nível (padrão: 1,0.5,0.25,0.1)
+
+import math
+import time
+
+import numpy as np
+
+from carregador_obj import ler_obj
+
+VERSAO = 2  # mudar quando a cadeia mudar (entra na chave do cache)
+NIVEIS = (1.0, 0.5, 0.25, 0.1)
+PESO_BORDA = 100.0          # peso dos planos que seguram as arestas de borda
+COS_DOBRA = 0.2             # colapso rejeitado se alguma face girar mais que ~78° (ou virar)
+DISTANCIA_MAXIMA = 2.0      # posição ótima aceita até 2x o comprimento da aresta dos extremos
+PIXELS_POR_TRIANGULO = 8.0  # escolher_nivel: área na tela (px) que cada triângulo deve cobrir
+HISTERESE = 0.25            # folga para trocar para um nível mais simples (evita piscar na fronteira)
+
+usarLOD = True
+niveisLOD = NIVEIS
+
+
+def opcoes_lod(argv):
+    """Remove as opções --no-lod e --lod= de argv, aplicando-as, e retorna os argumentos restantes."""
+    global usarLOD, niveisLOD
+    restantes = []
+    for arg in argv:
+        if arg == '--no-lod':
+            usarLOD = False
+        elif arg.startswith('--lod='):
+            fracoes = sorted({min(1.0, float(x)) for x in arg.split('=', 1)[1].split(',') if float(x) > 0},
+                             reverse=True)
+            niveisLOD = tuple([1.0] + [f for f in fracoes if f < 1.0])
+        else:
+            restantes.append(arg)
+    return restantes
+
+
+# Quádricas: cada uma guardada como os 10 coeficientes distintos da matriz 4x4 simétrica
+# [a², ab, ac, ad, b², bc, bd, c², cd, d²] do plano ax + by + cz + d = 0.
+
+def _quadricas_planos(normais, d, pesos):
+    a, b, c = normais[:, 0], normais[:, 1], normais[:, 2]
+    return np.stack([a * a, a * b, a * c, a * d, b * b, b * c, b * d, c * c, c * d, d * d], axis=1) * pesos[:, None]
+
+
+def _acumular(indices, valores, n):
+    """Soma as linhas de `valores` nos índices dados (scatter-add por coluna com bincount)."""
+    return np.stack([np.bincount(indices, valores[:, k], minlength=n) for k in range(valores.shape[1])], axis=1)
+
+
+def quadricas(vertices, faces):
+    """Quádricas (N,10) float64 dos vértices: planos das faces (peso = área) e planos das bordas."""
+    v = np.asarray(vertices, dtype=np.float64)
+    n = len(v)
+    tri = v[faces]
+    normal = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    dobro_area = np.linalg.norm(normal, axis=1)
+    ok = dobro_area > 0
+    normal[ok] /= dobro_area[ok, None]
+    q_faces = _quadricas_planos(normal, -(normal * tri[:, 0]).sum(axis=1), dobro_area / 2)
+    q = _acumular(faces.ravel(), np.repeat(q_faces, 3, axis=0), n)
+
+    # bordas: arestas que aparecem em uma face só
+    arestas = np.stack([faces, np.roll(faces, -1, axis=1)], axis=2).reshape(-1, 2)
+    chave = np.sort(arestas, axis=1)
+    _, inverso, contagem = np.unique(chave[:, 0] * n + chave[:, 1], return_inverse=True, return_counts=True)
+    borda = contagem[inverso.ravel()] == 1
+    if borda.any():
+        e = arestas[borda]
+        p0, p1 = v[e[:, 0]], v[e[:, 1]]
+        direcao = p1 - p0
+        perp = np.cross(direcao, np.repeat(normal, 3, axis=0)[borda])
+        norma = np.linalg.norm(perp, axis=1)
+        ok = norma > 0
+        perp[ok] /= norma[ok, None]
+        q_borda = _quadricas_planos(perp, -(perp * p0).sum(axis=1), PESO_BORDA * (direcao * direcao).sum(axis=1))
+        q += _acumular(e.ravel(), np.repeat(q_borda, 2, axis=0), n)
+    return q
+
+
+def _erro(q, p):
+    """Erro quádrico q(p) para pares (quádrica, ponto)."""
+    x, y, z = p[:, 0], p[:, 1], p[:, 2]
+    return (q[:, 0] * x * x + 2 * q[:, 1] * x * y + 2 * q[:, 2] * x * z + 2 * q[:, 3] * x
+            + q[:, 4] * y * y + 2 * q[:, 5] * y * z + 2 * q[:, 6] * y
+            + q[:, 7] * z * z + 2 * q[:, 8] * z + q[:, 9])
+
+
+def _posicao_otima(q, p0, p1):
+    """Posição que minimiza a quádrica de cada aresta (sistema 3x3); quando o sistema é mal condicionado
+    ou a solução cai longe da aresta, fica o melhor entre os extremos e o ponto médio. Retorna
+    (posições, custos)."""
+    a = np.empty((len(q), 3, 3))
+    a[:, 0] = q[:, [0, 1, 2]]
+    a[:, 1] = q[:, [1, 4, 5]]
+    a[:, 2] = q[:, [2, 5, 7]]
+    b = -q[:, [3, 6, 8]]
+
+    det = np.linalg.det(a)
+    escala = np.abs(a).reshape(len(q), -1).max(axis=1) ** 3
+    boas = np.abs(det) > 1e-10 * np.maximum(escala, 1e-300)
+    pos = (p0 + p1) / 2
+    if boas.any():
+        pos[boas] = np.linalg.solve(a[boas], b[boas][:, :, None])[:, :, 0]
+    comprimento = np.linalg.norm(p1 - p0, axis=1)
+    longe = np.linalg.norm(pos - (p0 + p1) / 2, axis=1) > DISTANCIA_MAXIMA * comprimento
+    boas &= ~longe
+
+    custo = _erro(q, pos)
+    ruins = ~boas
+    if ruins.any():
+        candidatos = np.stack([p0[ruins], p1[ruins], (p0[ruins] + p1[ruins]) / 2])
+        erros = np.stack([_erro(q[ruins], c) for c in candidatos])
+        melhor = erros.argmin(axis=0)
+        pos[ruins] = candidatos[melhor, np.arange(len(melhor))]
+        custo[ruins] = erros[melhor, np.arange(len(melhor))]
+    return pos, custo
+
+
+def _rodada(v, q, faces, alvo, bloqueadas):
+    """Uma rodada de colapsos simultâneos. Retorna (faces novas, arestas bloqueadas); v e q são
+    atualizados no lugar. Arestas cujo colapso foi rejeitado ficam bloqueadas nas rodadas seguintes,
+    para que outras (mais caras) tenham vez. Retorna faces None se nada pôde ser colapsado."""
+    n = len(v)
+    arestas = np.sort(np.stack([faces, np.roll(faces, -1, axis=1)], axis=2).reshape(-1, 2), axis=1)
+    arestas = np.unique(arestas[:, 0] * n + arestas[:, 1])
+    arestas = arestas[~np.isin(arestas, bloqueadas, assume_unique=True)]
+    if len(arestas) == 0:
+        return None, bloqueadas
+    v0, v1 = arestas // n, arestas % n
+
+    qa = q[v0] + q[v1]
+    pos, custo = _posicao_otima(qa, v[v0], v[v1])
+
+    # emparelhamento: a aresta entra se for a mais barata dos dois extremos (empates pelo índice)
+    rank = np.empty(len(custo), dtype=np.int64)
+    rank[np.argsort(custo, kind='stable')] = np.arange(len(custo))
+    melhor = np.full(n, len(custo), dtype=np.int64)
+    np.minimum.at(melhor, v0, rank)
+    np.minimum.at(melhor, v1, rank)
+    escolhidas = np.flatnonzero((melhor[v0] == rank) & (melhor[v1] == rank))
+    # cada colapso tira ~2 triângulos: só as mais baratas até o alvo
+    escolhidas = escolhidas[np.argsort(custo[escolhidas], kind='stable')]
+    escolhidas = escolhidas[:max(1, int(math.ceil((len(faces) - alvo) / 2)))]
+
+    # faces que giram demais com todos os colapsos aplicados derrubam os colapsos dos seus vértices
+    colapso = np.full(n, -1, dtype=np.int64)
+    colapso[v0[escolhidas]] = escolhidas
+    colapso[v1[escolhidas]] = escolhidas
+    destino = np.arange(n)
+    destino[v1[escolhidas]] = v0[escolhidas]
+    nova_pos = v.copy()
+    nova_pos[v0[escolhidas]] = pos[escolhidas]
+
+    afetadas = (colapso[faces] >= 0).any(axis=1)
+    f_antes = faces[afetadas]
+    f_depois = destino[f_antes]
+    restam = (f_depois[:, 0] != f_depois[:, 1]) & (f_depois[:, 1] != f_depois[:, 2]) & (f_depois[:, 0] != f_depois[:, 2])
+    f_antes, f_depois = f_antes[restam], f_depois[restam]
+    t0 = v[f_antes]
+    t1 = nova_pos[f_depois]
+    n0 = np.cross(t0[:, 1] - t0[:, 0], t0[:, 2] - t0[:, 0])
+    n1 = np.cross(t1[:, 1] - t1[:, 0], t1[:, 2] - t1[:, 0])
+    produto = (n0 * n1).sum(axis=1)
+    normas = np.linalg.norm(n0, axis=1) * np.linalg.norm(n1, axis=1)
+    dobradas = produto < COS_DOBRA * normas
+    if dobradas.any():
+        rejeitadas = np.unique(colapso[f_antes[dobradas]])
+        rejeitadas = rejeitadas[rejeitadas >= 0]
+        escolhidas = np.setdiff1d(escolhidas, rejeitadas)
+        bloqueadas = np.union1d(bloqueadas, arestas[rejeitadas])
+        if len(escolhidas) == 0:
+            return faces, bloqueadas
+
+    a, b = v0[escolhidas], v1[escolhidas]
+    v[a] = pos[escolhidas]
+    q[a] = qa[escolhidas]
+    destino = np.arange(n)
+    destino[b] = a
+    faces = destino[faces]
+    validas = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    return faces[validas], bloqueadas
+
+
+def _compactar(v, faces):
+    """Remove os vértices que não são usados por nenhuma face e renumera as faces."""
+    usados, novas = np.unique(faces, return_inverse=True)
+    return v[usados].astype(np.float32), novas.reshape(-1, 3).astype(np.int32)
+
+
+def simplificar(vertices, faces, alvos):
+    """Simplifica a malha até cada número de triângulos de `alvos` (decrescente), continuando de um
+    alvo para o seguinte. Retorna uma lista de dicts com 'vertices', 'faces' e 'tempo' (segundos gastos
+    desde o alvo anterior). Se a malha não puder ser reduzida mais (nenhum colapso possível, ou só
+    sobraria uma malha vazia), o nível fica com o que foi possível."""
+    v = np.asarray(vertices, dtype=np.float64).copy()
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+    q = quadricas(v, faces)
+    bloqueadas = np.empty(0, dtype=np.int64)
+
+    niveis = []
+    for alvo in alvos:
+        inicio = time.perf_counter()
+        while len(faces) > alvo:
+            novas, bloqueadas = _rodada(v, q, faces, alvo, bloqueadas)
+            if novas is None or len(novas) == 0:
+                break
+            faces = novas
+        verts, fs = _compactar(v, faces)
+        niveis.append({'vertices': verts, 'faces': fs, 'tempo': time.perf_counter() - inicio})
+    return niveis
+
+
+def cadeia_lod(vertices, faces, niveis=None):
+    """Cadeia de níveis de detalhe: lista de dicts ('vertices', 'faces', 'fracao', 'tempo'), o primeiro
+    sendo a malha original. A cadeia para no primeiro nível que não tira nenhum triângulo do anterior
+    (malhas pequenas demais para todas as frações)."""
+    niveis = niveisLOD if niveis is None else niveis
+    faces = np.asarray(faces).reshape(-1, 3)
+    cadeia = [{'vertices': np.asarray(vertices, dtype=np.float32), 'faces': faces, 'fracao': 1.0, 'tempo': 0.0}]
+    fracoes = [f for f in niveis if f < 1.0]
+    if fracoes and len(faces):
+        alvos = [max(1, int(len(faces) * f)) for f in fracoes]
+        for fracao, nivel in zip(fracoes, simplificar(vertices, faces, alvos)):
+            if len(nivel['faces']) == 0 or len(nivel['faces']) >= len(cadeia[-1]['faces']):
+                break
+            nivel['fracao'] = fracao
+            cadeia.append(nivel)
+    return cadeia
+
+
+def preparar_lod(caminho, ler=ler_obj):
+    """ler_obj + a cadeia de níveis, como arrays 'lod1_vertices', 'lod1_faces', ... (o nível 0 é a
+    própria malha). Para usar com cache_malha.carregar_malha(caminho, preparar_lod, parametros_lod()).
+    `ler` troca a leitura do arquivo (ex.: pelos blocos já lidos em carregamento_progressivo.py)."""
+    malha = ler(caminho)
+    for i, nivel in enumerate(cadeia_lod(malha['vertices'], malha['faces'])[1:], 1):
+        malha[f'lod{i}_vertices'] = nivel['vertices']
+        malha[f'lod{i}_faces'] = nivel['faces']
+    return malha
+
+
+def parametros_lod():
+    """Parâmetros do preparo com níveis, para a chave do cache (mudar as frações gera outra entrada)."""
+    return {'lod': list(niveisLOD), 'peso_borda': PESO_BORDA, 'cos_dobra': COS_DOBRA, 'versao_lod': VERSAO}
+
+
+def niveis_da_malha(malha):
+    """Lista [(vertices, faces), ...] dos níveis guardados numa malha de preparar_lod (nível 0 incluso)."""
+    niveis = [(malha['vertices'], malha['faces'])]
+    i = 1
+    while f'lod{i}_vertices' in malha:
+        niveis.append((malha[f'lod{i}_vertices'], malha[f'lod{i}_faces']))
+        i += 1
+    return niveis
+
+
+def escolher_nivel(triangulos, raio, distancia, altura_px, fovy=45.0, atual=None):
+    """Índice do nível a desenhar: o mais simples cujo número de triângulos ainda cobre a área projetada
+    do modelo (esfera de `raio` a `distancia` da câmera) a PIXELS_POR_TRIANGULO cada. `triangulos` é a
+    contagem de cada nível, do mais detalhado ao mais simples. Com `atual`, só passa para um nível mais
+    simples com HISTERESE de folga."""
+    if distancia <= raio or raio <= 0:
+        return 0
+    raio_px = raio / (distancia * math.tan(math.radians(fovy) / 2)) * altura_px / 2
+    desejados = math.pi * raio_px * raio_px / PIXELS_POR_TRIANGULO
+
+    def nivel(minimo):
+        escolhido = 0
+        for i, t in enumerate(triangulos):
+            if t >= minimo:
+                escolhido = i
+        return escolhido
+
+    escolhido = nivel(desejados)
+    if atual is not None and escolhido > atual:
+        escolhido = max(atual, nivel(desejados * (1 + HISTERESE)))
+    return escolhido
+
+
+def nivel_para_camera(triangulos, limites, camera, rotacao=0.0, altura_px=600, fovy=45.0, atual=None):
+    """escolher_nivel para um modelo com caixa `limites` (2,3), girado `rotacao` graus em Y (glRotatef)
+    e visto de `camera`."""
+    limites = np.asarray(limites, dtype=np.float64)
+    cx, cy, cz = (limites[0] + limites[1]) / 2
+    raio = np.linalg.norm(limites[1] - limites[0]) / 2
+    ang = math.radians(rotacao)
+    centro = (cx * math.cos(ang) + cz * math.sin(ang), cy, -cx * math.sin(ang) + cz * math.cos(ang))
+    distancia = math.dist(camera, centro)
+    return escolher_nivel(triangulos, raio, distancia, altura_px, fovy, atual)
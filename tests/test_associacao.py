@@ -0,0 +1,79 @@
+# test_associacao.py
+# [mvfm] - Compara associate_faces (árvore k-d, nucleo_morph.py) com a busca exaustiva antiga
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# A busca exaustiva calcula, para cada face de A, a distância em float64 até o centróide de todas as
+# faces de B e fica com a primeira de menor distância (np.argmin). Com a mesma fórmula de distância, a
+# árvore tem que dar exatamente as mesmas faces, inclusive nos empates (weightedcube.obj tem muitos).
+# Contra a fórmula do laço antigo (np.linalg.norm por par, que arredonda diferente no último bit) só
+# são aceitas trocas entre faces cujas distâncias diferem no máximo TOLERANCIA (relativa).
+#
+# Uso: python -m pytest tests/test_associacao.py   (ou python -m unittest tests.test_associacao)
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+PARES = [('cactus.obj', 'moai.obj'), ('easy1.obj', 'easy2.obj'), ('weightedcube.obj', 'cactus.obj'),
+         ('quaddamage.obj', 'weightedcube.obj'), ('teapot.obj', 'weightedcube.obj')]
+TOLERANCIA = 1e-12
+BLOCO = 256  # faces de A por vez na busca exaustiva
+
+DIRETORIO_OBJ = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'obj')
+
+
+def distancias(centA, centB):
+    """Distâncias (QA, QB) em float64, na fórmula da árvore (raiz da soma dos quadrados)."""
+    diff = centB[None, :, :] - centA[:, None, :]
+    return np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+
+
+class TesteAssociacao(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        import cache_malha
+        cache_malha.usarCache = False
+
+    def test_igual_a_busca_exaustiva(self):
+        from nucleo_morph import associate_faces, carregar_modelo, centroides_associacao
+
+        for nomeA, nomeB in PARES:
+            with self.subTest(par=f"{nomeA} -> {nomeB}"):
+                modelA = carregar_modelo(os.path.join(DIRETORIO_OBJ, nomeA))
+                modelB = carregar_modelo(os.path.join(DIRETORIO_OBJ, nomeB))
+                assoc = associate_faces(modelA, modelB)
+                self.assertEqual(assoc.dtype, np.int32)
+                self.assertEqual(len(assoc), len(modelA.faces))
+
+                centA, centB = centroides_associacao(modelA), centroides_associacao(modelB)
+                for ini in range(0, len(centA), BLOCO):
+                    fim = ini + BLOCO
+                    d = distancias(centA[ini:fim], centB)
+                    np.testing.assert_array_equal(assoc[ini:fim], np.argmin(d, axis=1))
+
+                    # laço antigo: np.linalg.norm de cada diferença
+                    antigo = np.linalg.norm(centB[None, :, :] - centA[ini:fim, None, :], axis=2)
+                    escolha = np.argmin(antigo, axis=1)
+                    linhas = np.arange(len(escolha))
+                    escolhida = antigo[linhas, assoc[ini:fim]]
+                    melhor = antigo[linhas, escolha]
+                    self.assertTrue(np.all(escolhida <= melhor * (1 + TOLERANCIA)))
+
+    def test_modelo_b_vazio(self):
+        from malha import Malha
+        from nucleo_morph import associate_faces, carregar_modelo
+
+        modelA = carregar_modelo(os.path.join(DIRETORIO_OBJ, 'cactus.obj'))
+        vazio = Malha(np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.int32))
+        assoc = associate_faces(modelA, vazio)
+        np.testing.assert_array_equal(assoc, np.full(len(modelA.faces), -1, dtype=np.int32))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# test_carregador_obj.py
+# [mvfm] - Compara o leitor vetorizado (carregador_obj.py) com um leitor linha a linha
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# O leitor de referência abaixo segue os leitores antigos dos visualizadores e morphers (split() por
+# linha, float()/int() por valor, triangulação em leque), com índices negativos, campos vazios ('1//3')
+# e comentários no fim da linha. Todos os modelos de obj/ e um arquivo sintético com esses casos
+# precisam dar os mesmos arrays, lidos de uma vez (ler_obj) ou em blocos pequenos (ler_obj_blocos).
+#
+# Uso: python -m pytest tests/test_carregador_obj.py   (ou python -m unittest tests.test_carregador_obj)
+
+import glob
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+BLOCO = 64 * 1024  # bytes por bloco em ler_obj_blocos (no arquivo sintético, poucas linhas por bloco)
+
+DIRETORIO_OBJ = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'obj')
+
+# índices negativos, '1//3', '1/2', quadrados e pentágonos, faces com menos de 3 cantos, vt com 2
+# componentes, linhas v/vt/vn curtas demais (descartadas, sem contar para os índices negativos) e
+# comentários no fim de linhas v/vt/vn/f
+SINTETICO = """# cabeçalho
+v 0 0 0
+v 1 0 0 # comentário
+v 1 1 0
+v 0 1 0
+vt 0 0
+vt 1 0 # uv
+vt 1 1 0.5
+vn 0 0 1
+vn 0 0 -1   # outra
+f 1 2 3
+f 1//1 3//1 4//1 # comentário numa face
+f -4/-3/-2 -3/-2/-1 -2/-1/-1 -1/-1/-2
+v 2 0 0
+v 2 1 0
+f 2/1 5/2 6/3 3/1 -4/2
+f 1 2
+f -6//-1 -5//-1 -4//-1
+v 5 5
+vt 0.5
+vn 1 0
+f -1/-1/-1 -2/-2/-1 -3/-3/-2
+v 3 3 3
+f -1 -2 -3
+"""
+
+
+def ler_referencia(caminho):
+    """Leitor linha a linha, como os antigos, devolvendo os mesmos arrays de ler_obj."""
+    listas = {'v': [], 'vt': [], 'vn': []}
+    minimos = {'v': 3, 'vt': 2, 'vn': 3}
+    faces, faces_vt, faces_vn, poligonos = [], [], [], []
+    n_faces = 0
+    with open(caminho, 'r', encoding='utf-8', errors='ignore') as f:
+        for linha in f:
+            partes = linha.split('#', 1)[0].split()
+            if not partes:
+                continue
+            tipo, valores = partes[0], partes[1:]
+            if tipo in listas:
+                if len(valores) >= minimos[tipo]:
+                    listas[tipo].append([float(x) for x in valores[:3]] + [0.0] * (3 - len(valores[:3])))
+            elif tipo == 'f':
+                cantos = []
+                for p in valores:
+                    campos = p.split('/') + ['', '']
+                    indices = []
+                    for campo, lista in zip(campos[:3], ('v', 'vt', 'vn')):
+                        i = int(campo) if campo else 0
+                        vistos = len(listas[lista])
+                        indices.append(i - 1 if i > 0 else (vistos + i if i < 0 else -1))
+                    cantos.append(indices)
+                for k in range(1, len(cantos) - 1):
+                    tri = [cantos[0], cantos[k], cantos[k + 1]]
+                    faces.append([c[0] for c in tri])
+                    faces_vt.append([c[1] for c in tri])
+                    faces_vn.append([c[2] for c in tri])
+                    poligonos.append(n_faces)
+                n_faces += 1
+
+    vetores = lambda l: np.array(l, dtype=np.float32).reshape(-1, 3)
+    indices = lambda l: np.array(l, dtype=np.int32).reshape(-1, 3)
+    return {'vertices': vetores(listas['v']), 'normais': vetores(listas['vn']),
+            'texcoords': vetores(listas['vt']), 'faces': indices(faces), 'faces_texcoords': indices(faces_vt),
+            'faces_normais': indices(faces_vn), 'poligonos': np.array(poligonos, dtype=np.int32)}
+
+
+class TesteCarregadorObj(unittest.TestCase):
+
+    def comparar(self, caminho, bloco):
+        from carregador_obj import ler_obj, ler_obj_blocos, juntar_blocos
+
+        referencia = ler_referencia(caminho)
+        for nome, modelo in (('ler_obj', ler_obj(caminho)),
+                             ('ler_obj_blocos', juntar_blocos(m for m, _, _ in ler_obj_blocos(caminho, bloco)))):
+            for chave, esperado in referencia.items():
+                with self.subTest(arquivo=os.path.basename(caminho), leitor=nome, array=chave):
+                    np.testing.assert_array_equal(modelo[chave], esperado)
+
+    def test_sintetico(self):
+        with tempfile.TemporaryDirectory() as d:
+            caminho = os.path.join(d, 'sintetico.obj')
+            with open(caminho, 'w') as f:
+                f.write(SINTETICO)
+            self.comparar(caminho, 16)
+
+    def test_modelos(self):
+        for caminho in sorted(glob.glob(os.path.join(DIRETORIO_OBJ, '*.obj'))):
+            self.comparar(caminho, BLOCO)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# test_miniaturas.py
+# [mvfm] - Confere o enquadramento das miniaturas (miniaturas.py) de modelos de tamanhos bem diferentes
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Cada modelo é centralizado e escalado para raio 1 antes de desenhar, então a área coberta pelo modelo
+# na imagem deve ficar numa faixa razoável (nem um ponto, nem a imagem toda) e o modelo não deve encostar
+# nas bordas, seja ele de 0,2 ou de 200 unidades. Usa o pool de miniaturas.py com um processo e contexto
+# EGL; o teste é pulado se não houver contexto fora da tela.
+#
+# Uso: python -m pytest tests/test_miniaturas.py   (ou python -m unittest tests.test_miniaturas)
+
+import os
+import struct
+import sys
+import tempfile
+import unittest
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+TAMANHO = 128
+# modelos de escalas muito diferentes (raios de ~0,1 a ~200 unidades)
+MODELOS = ['Metal_Sonic.obj', 'hard1.obj', 'HatsuneMiku.obj']
+# fração da imagem coberta pelo modelo enquadrado
+COBERTURA_MINIMA, COBERTURA_MAXIMA = 0.03, 0.5
+
+DIRETORIO_OBJ = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'obj')
+
+
+def ler_png(caminho):
+    """Lê um PNG RGBA sem filtros, como os de renderizador_offscreen.gravar_png."""
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    i, idat = 8, b''
+    while i < len(dados):
+        n, = struct.unpack('>I', dados[i:i + 4])
+        tipo = dados[i + 4:i + 8]
+        if tipo == b'IHDR':
+            largura, altura = struct.unpack('>II', dados[i + 8:i + 16])
+        elif tipo == b'IDAT':
+            idat += dados[i + 8:i + 8 + n]
+        i += 12 + n
+    linhas = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(altura, -1)
+    return linhas[:, 1:].reshape(altura, largura, 4)
+
+
+class TesteMiniaturas(unittest.TestCase):
+
+    def test_enquadramento(self):
+        from miniaturas import gerar_miniaturas
+
+        with tempfile.TemporaryDirectory() as saida:
+            caminhos = [os.path.join(DIRETORIO_OBJ, m) for m in MODELOS]
+            resultados = list(gerar_miniaturas(caminhos, saida, angulos=1, largura=TAMANHO, altura=TAMANHO,
+                                               processos=1, argv_opcoes=['--no-cache']))
+            for r in resultados:
+                if r['erro'] and r['erro'].startswith('contexto fora da tela indisponível'):
+                    self.skipTest(r['erro'])
+            for r in sorted(resultados, key=lambda r: r['arquivo']):
+                with self.subTest(modelo=os.path.basename(r['arquivo'])):
+                    self.assertIsNone(r['erro'])
+                    rgba = ler_png(r['imagens'][0]).astype(np.int16)
+                    # o fundo é a cor do canto
+                    modelo = np.abs(rgba[..., :3] - rgba[0, 0, :3]).sum(axis=-1) > 0
+                    self.assertGreater(modelo.mean(), COBERTURA_MINIMA)
+                    self.assertLess(modelo.mean(), COBERTURA_MAXIMA)
+                    linhas, colunas = np.nonzero(modelo)
+                    self.assertGreater(linhas.min(), 0)
+                    self.assertGreater(colunas.min(), 0)
+                    self.assertLess(linhas.max(), TAMANHO - 1)
+                    self.assertLess(colunas.max(), TAMANHO - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
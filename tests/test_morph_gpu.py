@@ -0,0 +1,90 @@
+# test_morph_gpu.py
+# [mvfm] - Compara o morph no shader (morph_gpu.py) com o caminho em CPU, renderizando fora da tela
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Usa o contexto EGL sem superfície + framebuffer object de renderizador_offscreen.py (Mesa llvmpipe
+# serve), então roda sem janela e sem GPU. O teste é pulado se não houver EGL ou se o contexto não
+# tiver GLSL 1.50.
+#
+# Uso: python -m pytest tests/test_morph_gpu.py   (ou python -m unittest tests.test_morph_gpu)
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+LARGURA, ALTURA = 256, 256
+# pares de modelos e instantes comparados
+PARES = [('cactus.obj', 'moai.obj'), ('teapot.obj', 'easy1.obj')]
+INSTANTES = [0.0, 0.25, 0.5, 0.75, 1.0]
+# diferença aceita por canal e fração máxima de pixels acima dela (arestas e faces sobrepostas)
+TOLERANCIA = 8
+FRACAO_MAXIMA = 0.005
+
+DIRETORIO_OBJ = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'obj')
+
+
+class TesteMorphGPU(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        import renderizador_offscreen
+        try:
+            cls.ctx = renderizador_offscreen.criar_contexto(LARGURA, ALTURA, 'egl')
+        except RuntimeError as e:
+            raise unittest.SkipTest(f"sem contexto OpenGL EGL ({e})")
+        cls.ler_rgba = staticmethod(renderizador_offscreen.ler_rgba)
+        import cache_malha
+        import morphing3d
+        from morph_gpu import criar_morph_gpu
+        from OpenGL.GL import glGetString, GL_SHADING_LANGUAGE_VERSION
+
+        versao = glGetString(GL_SHADING_LANGUAGE_VERSION) or b'0'
+        if float(versao.split()[0]) < 1.5:
+            raise unittest.SkipTest("contexto sem GLSL 1.50")
+
+        cache_malha.usarCache = False
+        cls.m = morphing3d
+        cls.criar_morph_gpu = staticmethod(criar_morph_gpu)
+        morphing3d.windowWidth, morphing3d.windowHeight = LARGURA, ALTURA
+        morphing3d.inicializar()
+        morphing3d.redimensionar(LARGURA, ALTURA)
+
+    def preparar(self, nomeA, nomeB):
+        m = self.m
+        m.carregar_morph(os.path.join(DIRETORIO_OBJ, nomeA), os.path.join(DIRETORIO_OBJ, nomeB))
+        m.mostrarNormais = False
+        m.morph_gpu = None
+        m.usar_gpu = False
+        m.enviar_morph_gl()
+        gpu = self.criar_morph_gpu(m.morph)
+        self.assertIsNotNone(gpu)
+        return gpu
+
+    def renderizar(self, t, gpu):
+        m = self.m
+        m.morph_gpu = gpu
+        m.morph_t = t
+        m.rotation = 35.0
+        m.desenhar_cena()
+        return self.ler_rgba(LARGURA, ALTURA).astype(np.int16)
+
+    def test_shader_igual_cpu(self):
+        for nomeA, nomeB in PARES:
+            gpu = self.preparar(nomeA, nomeB)
+            for t in INSTANTES:
+                with self.subTest(modelos=(nomeA, nomeB), t=t):
+                    cpu = self.renderizar(t, None)
+                    shader = self.renderizar(t, gpu)
+                    # garante que algo foi desenhado
+                    self.assertGreater((cpu[..., :3].max(axis=2) > 40).sum(), 500)
+                    diferentes = (np.abs(cpu - shader).max(axis=2) > TOLERANCIA).mean()
+                    self.assertLessEqual(diferentes, FRACAO_MAXIMA)
+
+
+if __name__ == '__main__':
+    unittest.main()
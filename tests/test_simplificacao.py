@@ -0,0 +1,60 @@
+# test_simplificacao.py
+# [mvfm] - Cadeia de níveis de detalhe (simplificacao.py) em malhas pequenas e em sopas de triângulos
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# Malhas que param de poder ser simplificadas antes do último nível (nenhum colapso sobra, ou só sobraria
+# uma malha vazia) têm que dar uma cadeia mais curta, nunca um erro nem um nível sem triângulos.
+#
+# Uso: python -m pytest tests/test_simplificacao.py   (ou python -m unittest tests.test_simplificacao)
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+SOPAS = 300
+
+TETRAEDRO = (np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float32),
+             np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]], dtype=np.int32))
+CUBO = (np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.float32),
+        np.array([[0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1],
+                  [2, 3, 7], [2, 7, 6], [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3]], dtype=np.int32))
+
+
+class TesteSimplificacao(unittest.TestCase):
+
+    def verificar_cadeia(self, cadeia):
+        triangulos = [len(n['faces']) for n in cadeia]
+        self.assertTrue(all(t > 0 for t in triangulos), triangulos)
+        self.assertTrue(all(a > b for a, b in zip(triangulos, triangulos[1:])), triangulos)
+        for nivel in cadeia:
+            if len(nivel['faces']):
+                self.assertLess(int(np.max(nivel['faces'])), len(nivel['vertices']))
+        return triangulos
+
+    def test_malhas_pequenas(self):
+        from simplificacao import cadeia_lod
+
+        for nome, (vertices, faces), esperado in (('tetraedro', TETRAEDRO, [4, 2]), ('cubo', CUBO, [12, 6, 2])):
+            with self.subTest(malha=nome):
+                triangulos = self.verificar_cadeia(cadeia_lod(vertices, faces, (1.0, 0.5, 0.25, 0.1)))
+                self.assertEqual(triangulos, esperado)
+
+    def test_sopas_de_triangulos(self):
+        from simplificacao import cadeia_lod
+
+        for semente in range(SOPAS):
+            with self.subTest(semente=semente):
+                rng = np.random.default_rng(semente)
+                n = int(rng.integers(3, 30))
+                vertices = rng.random((n, 3)).astype(np.float32)
+                faces = rng.integers(0, n, (int(rng.integers(1, 40)), 3)).astype(np.int32)
+                self.verificar_cadeia(cadeia_lod(vertices, faces, (1.0, 0.5, 0.25, 0.1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+# visibilidade.py
+# [mvfm] - Hierarquia de volumes (BVH) sobre os triângulos para recorte pelo frustum e por faces de costas
+#
+# Criado : 17/10/2026  ||  Última vez Alterado : 17/10/2026
+#
+# A hierarquia é montada uma vez por malha: os triângulos são separados pela direção dominante da
+# normal (6 grupos) e, em cada grupo, reordenados pela árvore k-d dos seus centróides
+# (indice_espacial.construir_kdtree), de modo que cada nó da árvore implícita (nó i tem filhos 2i e
+# 2i+1) cobre uma faixa contínua de triângulos. Cada nó guarda a caixa dos seus triângulos
+# e um cone com as normais das faces (eixo e abertura). A cada quadro, os planos do frustum saem das
+# matrizes de projeção e modelview atuais (as de gluPerspective/gluLookAt/glRotatef), já no espaço do
+# objeto, e a árvore é percorrida nível a nível, com todos os nós do nível testados de uma vez:
+#   - caixa toda fora de algum plano -> nó descartado;
+#   - caixa toda dentro -> a faixa do nó vai inteira, sem descer mais (a não ser para o teste de costas);
+#   - cone de normais todo de costas para a câmera -> nó descartado (só no modo 'completo', porque
+#     modelos abertos ou com a ordem dos vértices trocada mostram o lado de trás das faces).
+# O resultado são faixas (primeiro, contagem) de triângulos, com as vizinhas juntadas, para desenhar
+# com uma chamada (malha_gl.desenhar_faixas_gl).
+#
+# Opções de linha de comando (tratadas por opcoes_visibilidade):
+#    --recorte=M  - nenhum, frustum (padrão) ou completo (frustum + faces de costas)
+
+import numpy as np
+
+from indice_espacial import construir_kdtree
+
+MODOS = ('nenhum', 'frustum', 'completo')
+FOLHA = 64  # triângulos por folha
+
+modoRecorte = 'frustum'
+
+
+def opcoes_visibilidade(argv):
+    """Remove --recorte= de argv, aplicando-a, e retorna os argumentos restantes."""
+    global modoRecorte
+    restantes = []
+    for arg in argv:
+        if arg.startswith('--recorte='):
+            modo = arg.split('=', 1)[1]
+            if modo not in MODOS:
+                raise ValueError(f"modo de recorte desconhecido: {modo} (use {', '.join(MODOS)})")
+            modoRecorte = modo
+        else:
+            restantes.append(arg)
+    return restantes
+
+
+def _arvore(tri, folha):
+    """Uma árvore implícita sobre os triângulos `tri` (T,3,3): ordem dos triângulos e, por nó (índice 1 é
+    a raiz), caixa, soma das normais, abertura do cone e faixa [primeiro, fim) de triângulos."""
+    n = len(tri)
+    arv = construir_kdtree(tri.mean(axis=1), folha)
+    ordem = arv['folhas'][arv['folhas'] >= 0]
+    prof = arv['prof']
+    tri = tri[ordem]
+
+    normal = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    norma = np.linalg.norm(normal, axis=1)
+    unit = np.divide(normal, norma[:, None], out=np.zeros_like(normal), where=norma[:, None] > 0)
+
+    n_nos = 2 ** (prof + 1)
+    lo = np.full((n_nos, 3), np.inf)
+    hi = np.full((n_nos, 3), -np.inf)
+    eixo = np.zeros((n_nos, 3))
+    cos = np.ones(n_nos)
+    primeiro = np.zeros(n_nos, dtype=np.int64)
+    fim = np.zeros(n_nos, dtype=np.int64)
+
+    folhas = np.arange(2 ** prof, 2 ** (prof + 1))
+    limites = (np.arange(2 ** prof + 1) * n) // 2 ** prof
+    primeiro[folhas], fim[folhas] = limites[:-1], limites[1:]
+    cheias = np.diff(limites) > 0
+    lo[folhas[cheias]] = np.minimum.reduceat(tri.min(axis=1), limites[:-1][cheias], axis=0)
+    hi[folhas[cheias]] = np.maximum.reduceat(tri.max(axis=1), limites[:-1][cheias], axis=0)
+    eixo[folhas[cheias]] = np.add.reduceat(normal, limites[:-1][cheias], axis=0)
+    # caixas, faixas e soma das normais (ponderadas pela área) de cada nó, subindo pela árvore
+    for d in range(prof - 1, -1, -1):
+        nos = np.arange(2 ** d, 2 ** (d + 1))
+        lo[nos] = np.minimum(lo[2 * nos], lo[2 * nos + 1])
+        hi[nos] = np.maximum(hi[2 * nos], hi[2 * nos + 1])
+        eixo[nos] = eixo[2 * nos] + eixo[2 * nos + 1]
+        primeiro[nos], fim[nos] = primeiro[2 * nos], fim[2 * nos + 1]
+    tam = np.linalg.norm(eixo, axis=1)
+    eixo = np.divide(eixo, tam[:, None], out=np.zeros_like(eixo), where=tam[:, None] > 0)
+
+    # abertura do cone: o menor cos entre o eixo e as normais; nas folhas direto dos triângulos
+    # (degenerados não contam), nos outros nós pelos cones dos filhos
+    seg = np.repeat(folhas, np.diff(limites))
+    np.minimum.at(cos, seg, np.where(norma > 0, (unit * eixo[seg]).sum(axis=1), 1.0))
+    for d in range(prof - 1, -1, -1):
+        nos = np.arange(2 ** d, 2 ** (d + 1))
+        cos[nos] = np.minimum(_cos_cone_no_eixo(eixo[2 * nos], cos[2 * nos], eixo[nos]),
+                              _cos_cone_no_eixo(eixo[2 * nos + 1], cos[2 * nos + 1], eixo[nos]))
+    cos[tam == 0] = -1.0
+    return ordem, prof, {'lo': lo, 'hi': hi, 'eixo': eixo, 'cos': cos, 'primeiro': primeiro, 'fim': fim}
+
+
+def _cos_cone_no_eixo(eixo_filho, cos_filho, eixo_pai):
+    """Limite inferior do cos entre `eixo_pai` e qualquer normal do cone do filho (ângulos somados)."""
+    cos_eixos = np.clip((eixo_filho * eixo_pai).sum(axis=1), -1.0, 1.0)
+    angulo = np.arccos(cos_eixos) + np.arccos(np.clip(cos_filho, -1.0, 1.0))
+    return np.cos(np.minimum(angulo, np.pi))
+
+
+def construir_bvh(vertices, faces, folha=FOLHA):
+    """Monta a hierarquia sobre os triângulos `faces` (T,3) de `vertices` (N,3). Os triângulos são
+    separados antes pela direção dominante da normal (±x, ±y, ±z), uma árvore para cada grupo, para que
+    os cones de normais fiquem estreitos o bastante para o teste de costas. Retorna um dict com 'ordem'
+    (os triângulos na ordem das árvores: desenhe faces[ordem]), 'n', 'raizes' e, por nó (todas as
+    árvores no mesmo array), 'lo'/'hi' (caixa), 'eixo'/'cos'/'sen' (cone de normais), 'centro'/'raio'
+    (esfera da caixa), 'primeiro'/'fim' (faixa de triângulos) e 'filho' (o filho da esquerda; o da
+    direita é filho + 1; -1 nas folhas)."""
+    v = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces).reshape(-1, 3)
+    tri = v[faces]
+    normal = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    eixo_dominante = np.abs(normal).argmax(axis=1)
+    grupo = 2 * eixo_dominante + (normal[np.arange(len(faces)), eixo_dominante] < 0)
+
+    ordens, raizes, partes, filhos = [], [], [], []
+    base = deslocamento = 0
+    for g in range(6):
+        membros = np.flatnonzero(grupo == g)
+        if len(membros) == 0:
+            continue
+        ordem, prof, nos = _arvore(tri[membros], folha)
+        ordens.append(membros[ordem])
+        nos['primeiro'] += deslocamento
+        nos['fim'] += deslocamento
+        locais = np.arange(2 ** (prof + 1))
+        filhos.append(np.where(locais < 2 ** prof, base + 2 * locais, -1))
+        partes.append(nos)
+        raizes.append(base + 1)
+        base += len(locais)
+        deslocamento += len(membros)
+
+    if partes:
+        bvh = {c: np.concatenate([p[c] for p in partes]) for c in partes[0]}
+    else:
+        bvh = {'lo': np.zeros((0, 3)), 'hi': np.zeros((0, 3)), 'eixo': np.zeros((0, 3)), 'cos': np.zeros(0),
+               'primeiro': np.zeros(0, dtype=np.int64), 'fim': np.zeros(0, dtype=np.int64)}
+    bvh['filho'] = np.concatenate(filhos) if filhos else np.zeros(0, dtype=np.int64)
+    bvh['sen'] = np.sqrt(np.clip(1.0 - bvh['cos'] ** 2, 0.0, 1.0))
+    vazios = ~np.isfinite(bvh['lo'][:, 0])
+    with np.errstate(invalid='ignore'):
+        bvh['centro'] = np.where(vazios[:, None], 0.0, (bvh['lo'] + bvh['hi']) / 2)
+        bvh['raio'] = np.where(vazios, 0.0, np.linalg.norm(bvh['hi'] - bvh['lo'], axis=1) / 2)
+    bvh['ordem'] = np.concatenate(ordens) if ordens else np.zeros(0, dtype=np.int64)
+    bvh['raizes'] = np.array(raizes, dtype=np.int64)
+    bvh['n'] = len(faces)
+    return bvh
+
+
+def frustum(projecao, modelview):
+    """Planos (6,4) do frustum no espaço do objeto e a posição da câmera nesse espaço, a partir das matrizes
+    como o glGetFloatv as devolve (coluna a coluna). Um ponto p está dentro se planos @ (p, 1) >= 0."""
+    p = np.asarray(projecao, dtype=np.float64).reshape(4, 4).T
+    mv = np.asarray(modelview, dtype=np.float64).reshape(4, 4).T
+    clip = p @ mv
+    planos = np.array([clip[3] + clip[0], clip[3] - clip[0], clip[3] + clip[1],
+                       clip[3] - clip[1], clip[3] + clip[2], clip[3] - clip[2]])
+    planos /= np.linalg.norm(planos[:, :3], axis=1)[:, None]
+    olho = np.linalg.inv(mv)[:3, 3]
+    return planos, olho
+
+
+def visiveis(bvh, planos, olho=None, costas=False):
+    """Faixas de triângulos (na ordem de bvh['ordem']) que podem aparecer: arrays (primeiros, contagens).
+    Com costas=True também descarta os nós cujo cone de normais está todo de costas para `olho`.
+    Retorna também as estatísticas do percurso (dict: nós visitados, descartados por estar fora e por
+    estar de costas)."""
+    stats = {'nos': 0, 'fora': 0, 'costas': 0}
+    normais, d = planos[:, :3], planos[:, 3]
+    positivo = normais > 0
+    aceitos = []
+    ativos = bvh['raizes']
+    dentro = np.zeros(len(ativos), dtype=bool)  # o nó já está todo dentro do frustum (não testa os planos)
+    while len(ativos):
+        stats['nos'] += len(ativos)
+        lo, hi = bvh['lo'][ativos], bvh['hi'][ativos]
+        descartar = np.zeros(len(ativos), dtype=bool)
+
+        # vértice da caixa mais à frente (p) e mais atrás (n) de cada plano
+        testar = ~dentro
+        if testar.any():
+            pv = np.where(positivo[None], hi[testar][:, None], lo[testar][:, None])
+            nv = np.where(positivo[None], lo[testar][:, None], hi[testar][:, None])
+            descartar[testar] = ((pv * normais[None]).sum(axis=2) + d < 0).any(axis=1)
+            dentro = dentro.copy()
+            dentro[testar] = ((nv * normais[None]).sum(axis=2) + d >= 0).all(axis=1)
+        stats['fora'] += int(descartar.sum())
+        descartar |= ~np.isfinite(lo[:, 0])
+
+        if costas and olho is not None:
+            # de costas se, para toda normal do cone e todo ponto da esfera, n . (p - olho) > 0
+            vetor = bvh['centro'][ativos] - olho
+            dist = np.linalg.norm(vetor, axis=1)
+            proj = (vetor * bvh['eixo'][ativos]).sum(axis=1)
+            perp = np.sqrt(np.maximum(dist * dist - proj * proj, 0.0))
+            cos, sen = bvh['cos'][ativos], bvh['sen'][ativos]
+            de_costas = (cos > 0) & (proj * cos - perp * sen > bvh['raio'][ativos]) & ~descartar
+            stats['costas'] += int(de_costas.sum())
+            descartar |= de_costas
+
+        ativos, dentro = ativos[~descartar], dentro[~descartar]
+        filho = bvh['filho'][ativos]
+        # folhas, e nós todos dentro quando não há teste de costas para refinar, vão inteiros
+        inteiros = (filho < 0) | (dentro & (not costas))
+        aceitos.append(ativos[inteiros])
+        filho, dentro = filho[~inteiros], dentro[~inteiros]
+        ativos = np.stack([filho, filho + 1], axis=1).ravel()
+        dentro = np.repeat(dentro, 2)
+
+    nos = np.concatenate(aceitos) if aceitos else np.zeros(0, dtype=np.int64)
+    primeiros, fins = bvh['primeiro'][nos], bvh['fim'][nos]
+    ordem = np.argsort(primeiros, kind='stable')
+    primeiros, fins = primeiros[ordem], fins[ordem]
+    cheias = fins > primeiros
+    primeiros, fins = primeiros[cheias], fins[cheias]
+    # junta faixas vizinhas
+    if len(primeiros):
+        novas = np.ones(len(primeiros), dtype=bool)
+        novas[1:] = primeiros[1:] != fins[:-1]
+        inicio_grupo = np.flatnonzero(novas)
+        fim_grupo = np.append(inicio_grupo[1:], len(primeiros)) - 1
+        primeiros, fins = primeiros[inicio_grupo], fins[fim_grupo]
+    return primeiros, fins - primeiros, stats
+
+
+def recortar(bvh, modo=None):
+    """visiveis() com as matrizes atuais do OpenGL (chamar depois de montar a modelview do objeto)."""
+    from OpenGL.GL import glGetFloatv, GL_PROJECTION_MATRIX, GL_MODELVIEW_MATRIX
+    modo = modoRecorte if modo is None else modo
+    planos, olho = frustum(glGetFloatv(GL_PROJECTION_MATRIX), glGetFloatv(GL_MODELVIEW_MATRIX))
+    return visiveis(bvh, planos, olho, costas=(modo == 'completo'))
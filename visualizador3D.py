@@ -1,20 +1,50 @@
 # visualizadorObj.py
 # [mvfm] - Visualizador simples de modelos .OBJ com PyOpenGL
 #
-# Criado : 05/11/2025  || Última vez Alterado : 08/11/2025
+# Criado : 05/11/2025  || Última vez Alterado : 17/10/2026
+#
+#Teclas:
+#    q/e - subir/descer câmera
+#    setas - afastar/aprox., inclinar visão
+#    w - alterna sólido / wireframe / pontos
+#    n - mostrar/ocultar normais
+#    r - pausar/retomar a rotação
+#    l - nível de detalhe: automático -> 0 -> 1 -> ... -> automático
+#    c - recorte: nenhum -> frustum -> frustum + faces de costas
+#    ESC - cancelar o carregamento (a parte já lida continua na tela)
+#
+# A janela abre antes de o modelo ser lido: a leitura roda em segundo plano (carregamento_progressivo.py)
+# e a malha vai aparecendo por blocos, com uma barra de progresso no HUD.
 
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
+import functools
 import sys
+import time
 import numpy as np
 
+from cache_malha import carregar_malha, opcoes_cache
+from carregamento_progressivo import iniciar_carregamento, cancelar, carregando, progresso, blocos_prontos
+from carregador_obj import ler_obj
+from malha_gl import criar_malha_gl, desenhar_malha_gl, desenhar_faixas_gl, apagar_malha_gl, opcoes_gl
+from simplificacao import opcoes_lod, preparar_lod, parametros_lod, niveis_da_malha, nivel_para_camera
+import simplificacao
+from indexacao import indexar, com_solda, parametros_indexacao, opcoes_indexacao
+from normais_suaves import com_normais, parametros_normais, normais_dos_niveis, opcoes_normais
+from visibilidade import construir_bvh, recortar, opcoes_visibilidade
+import visibilidade
+import cadencia
+
 # Variáveis globais
 windowWidth, windowHeight = 800, 600
 rotation = 0.0
+girar = True               # alterna com tecla 'r'
+VELOCIDADE_ROTACAO = 18.0  # graus por segundo
 
 vertices = []
-faces = []
+faces = []          # array (F,3) de índices de vértices, já triangulado
+facesNormais = []   # array (F,3) de índices de normais (-1 quando a face não tem)
 normais = []
 
 mostrarNormais = False  # alterna com tecla 'n'
@@ -22,59 +52,196 @@ mostrarNormais = False  # alterna com tecla 'n'
 # Cache de normais calculadas (para evitar recálculo a cada frame)
 normaisFaceCache = []
 
+# Níveis de detalhe (simplificacao.py): lista de (vertices, faces), o nível 0 é o modelo completo
+niveis = []
+normaisNiveis = []   # (normais, faces_normais) de cada nível (normais_suaves.py), ou None
+limitesModelo = None
+nivelAtual = 0
+nivelForcado = None  # tecla 'l'; None -> escolhido pela distância da câmera
+
+# Hierarquia de volumes de cada nível (visibilidade.py); os buffers guardam os triângulos na ordem dela
+bvhNiveis = []
+recorte = None  # estatísticas do último recorte, para o HUD
+
+# Modelo e sobreposição de normais em buffer objects (malha_gl.py); None -> desenho imediato
+malhaGL = None
+normaisGL = None
+linhasNormais = None  # segmentos (2N,3) da sobreposição de normais, montados uma vez por modelo
+niveisGL = []  # um por nível de detalhe; niveisGL[0] é malhaGL
+
+# Carregamento em segundo plano (carregamento_progressivo.py) e os blocos da malha parcial já recebidos:
+# buffer objects, ou (posicoes, normais) para desenhar com vertex arrays
+carga = None
+previaGL = []
+triangulosPrevia = 0
+
+# Display lists de cada nível do modelo ({nível: (lista, modo de polígono)}) e das normais
+listasObjeto = {}
+listaNormais = None
+
 # Leitura do arquivo .OBJ
-def carregarObjeto(caminho):
-    """Lê um arquivo .OBJ e extrai vértices, normais e faces."""
-    global vertices, faces, normais, normaisFaceCache
-    vertices.clear()
-    faces.clear()
-    normais.clear()
-    normaisFaceCache.clear()
-
-    with open(caminho, 'r') as f:
-        for linha in f:
-            if linha.startswith('v '):
-                _, x, y, z = linha.strip().split()
-                vertices.append((float(x), float(y), float(z)))
-            elif linha.startswith('vn '):
-                _, x, y, z = linha.strip().split()
-                normais.append((float(x), float(y), float(z)))
-            elif linha.startswith('f '):
-                partes = linha.strip().split()[1:]
-                faceVertices, faceNormais = [], []
-                for p in partes:
-                    dados = p.split('/')
-                    vIdx = int(dados[0]) - 1
-                    faceVertices.append(vIdx)
-                    if len(dados) >= 3 and dados[2]:
-                        nIdx = int(dados[2]) - 1
-                        faceNormais.append(nIdx)
-                    else:
-                        faceNormais.append(None)
-                faces.append((faceVertices, faceNormais))
-
-    # Pré-calcula as normais das faces que não possuem normais próprias
-    for faceVertices, faceNormais in faces:
-        if not any(n is not None for n in faceNormais):
-            v1, v2, v3 = [np.array(vertices[i]) for i in faceVertices[:3]]
-            normaisFaceCache.append(normalFace(v1, v2, v3))
-        else:
-            normaisFaceCache.append(None)
+def parametrosObjeto(lod=False):
+    """Parâmetros do preparo do modelo, para a chave do cache_malha."""
+    return {**(parametros_lod() if lod else {}), **parametros_indexacao(), **parametros_normais()}
+
+def carregarObjeto(caminho, lod=False, ler=ler_obj):
+    """Lê um arquivo .OBJ e extrai vértices, normais e faces. Com lod=True também monta (ou lê do cache)
+    os níveis de detalhe simplificados. `ler` troca a leitura do arquivo (ex.: pelos blocos já lidos)."""
+    global vertices, faces, facesNormais, normais, normaisFaceCache, niveis, limitesModelo, nivelAtual, bvhNiveis
+    global linhasNormais, normaisNiveis
+    preparar = functools.partial(preparar_lod, ler=ler) if lod else ler
+    # faces sem 'vn' (e os níveis simplificados) ganham normais suaves, guardadas no cache com a malha
+    obj = carregar_malha(caminho, com_normais(com_solda(preparar)), parametrosObjeto(lod))
+    vertices = obj['vertices']
+    faces = obj['faces']
+    facesNormais = obj['faces_normais']
+    normais = obj['normais']
+    niveis = niveis_da_malha(obj)
+    normaisNiveis = normais_dos_niveis(obj)
+    limitesModelo = obj['limites']
+    nivelAtual = 0
+    bvhNiveis = [construir_bvh(v, f) for v, f in niveis]
+
+    # Pré-calcula as normais das faces (usadas quando a face não possui normais próprias)
+    normaisFaceCache = normaisFaces(vertices, faces)
+    linhasNormais = None
+
+def prepararObjeto(caminho, lod, ler):
+    """carregarObjeto + as malhas indexadas de todos os níveis, para a thread de carregamento deixar
+    pronto tudo o que não precisa do contexto OpenGL."""
+    carregarObjeto(caminho, lod, ler)
+    return [malhaIndexada(i) for i in range(len(niveis))]
 
 # Cálculo de normais
-def normalFace(v1, v2, v3):
-    """Calcula a normal de uma face a partir de 3 vértices."""
-    u = v2 - v1
-    v = v3 - v1
-    n = np.cross(u, v)
-    norma = np.linalg.norm(n)
-    return (n / norma) if norma != 0 else np.array((0.0, 0.0, 1.0))
-
-# Renderização do modelo
-def desenharObjeto():
-    """Renderiza o modelo carregado, usando normais por face ou vértice."""
-    modo = glGetIntegerv(GL_POLYGON_MODE)[0]
+def normaisFaces(vertices, faces):
+    """Calcula a normal de todas as faces de uma vez a partir dos seus 3 vértices."""
+    tri = vertices[faces]
+    n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    norma = np.linalg.norm(n, axis=1)
+    n[norma == 0] = (0.0, 0.0, 1.0)
+    norma[norma == 0] = 1.0
+    return n / norma[:, None]
+
+def normaisNivel(nivel):
+    """Normais e índices de normal por canto (T,3) do nível: as do arquivo ou as geradas no preparo. Cantos
+    sem normal (--normais-planas) apontam para a normal da face, acrescentada no fim do array."""
+    v, f = niveis[nivel]
+    n, fn = normaisNiveis[nivel] or (np.zeros((0, 3), dtype=np.float32), np.full(f.shape, -1, dtype=np.int32))
+    validas = (fn >= 0) & (fn < len(n))
+    if validas.all():
+        return n, fn
+    planas = normaisFaceCache if nivel == 0 else normaisFaces(v, f)
+    fn = np.where(validas, fn, len(n) + np.arange(len(f))[:, None])
+    return np.concatenate([n, planas]).astype(np.float32), fn
+
+def malhaIndexada(nivel):
+    """Um vértice por par (posição, normal) distinto e os índices (T,3) uint32 do nível (indexacao.py),
+    com os triângulos na ordem da hierarquia de volumes."""
+    v, f = niveis[nivel]
+    posicoes, normaisVertices, _, indices = indexar(v, f, *normaisNivel(nivel))
+    return posicoes, normaisVertices, indices[bvhNiveis[nivel]['ordem']]
+
+def segmentosNormais(posicoes, normaisVertices):
+    """Segmentos (2M,3) da sobreposição de normais, um por vértice (início e fim em sequência)."""
+    linhas = np.empty((len(posicoes), 2, 3), dtype=np.float32)
+    linhas[:, 0] = posicoes
+    linhas[:, 1] = posicoes + normaisVertices * 0.2
+    return linhas.reshape(-1, 3)
+
+def enviarObjetoGL(indexados=None):
+    """Envia o modelo carregado (e os níveis de detalhe) para buffer objects indexados (precisa de
+    contexto OpenGL ativo). Também descarta as display lists do modelo anterior. `indexados` são as
+    malhas de prepararObjeto, se já estiverem prontas."""
+    global malhaGL, normaisGL, niveisGL, linhasNormais
+    apagarListas()
+    for malha in niveisGL[1:]:
+        apagar_malha_gl(malha)
+    apagar_malha_gl(malhaGL)
+    apagar_malha_gl(normaisGL)
+    indexados = indexados or [malhaIndexada(i) for i in range(len(niveis))]
+    posicoes, normaisVertices, indices = indexados[0]
+    linhasNormais = segmentosNormais(posicoes, normaisVertices)
+    malhaGL = criar_malha_gl(posicoes, normaisVertices, indices)
+    normaisGL = criar_malha_gl(linhasNormais) if malhaGL is not None else None
+    niveisGL = [malhaGL] + [criar_malha_gl(*nivel) if malhaGL is not None else None
+                            for nivel in indexados[1:]]
+
+# Malha parcial durante o carregamento
+def receberCarga():
+    """Envia para a placa os blocos que chegaram desde o último quadro; com o carregamento pronto, troca a
+    malha parcial pelo modelo completo. Se a leitura falhou, mostra o erro e encerra."""
+    global carga, previaGL, triangulosPrevia
+    if carga is None:
+        return
+    for posicoes, normaisCantos in blocos_prontos(carga):
+        previaGL.append(criar_malha_gl(posicoes, normaisCantos) or (posicoes, normaisCantos))
+        triangulosPrevia += len(posicoes) // 3
+    if carga['fase'] == 'erro':
+        print(f"Erro: {carga['erro']}.")
+        sys.exit(1)
+    if carga['fase'] == 'pronto':
+        enviarObjetoGL(carga['resultado'])
+        apagarPrevia()
+        carga = None
+
+def apagarPrevia():
+    global previaGL, triangulosPrevia
+    for bloco in previaGL:
+        if isinstance(bloco, dict):
+            apagar_malha_gl(bloco)
+    previaGL = []
+    triangulosPrevia = 0
+
+def desenharPrevia():
+    """Desenha os blocos já recebidos da malha parcial (triângulos soltos, um vértice por canto)."""
+    estadoModo(glGetIntegerv(GL_POLYGON_MODE)[0])
+    for bloco in previaGL:
+        if isinstance(bloco, dict):
+            desenhar_malha_gl(bloco)
+            continue
+        posicoes, normaisCantos = bloco
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, posicoes)
+        glNormalPointer(GL_FLOAT, 0, normaisCantos)
+        glDrawArrays(GL_TRIANGLES, 0, len(posicoes))
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+# Display lists: cada nível do modelo (com o estado do modo de polígono) e a sobreposição de normais são
+# compilados uma vez e repetidos com glCallList; só são recompilados quando o modelo ou o modo de
+# polígono mudam.
+def apagarListas():
+    global listasObjeto, listaNormais
+    for lista, _ in listasObjeto.values():
+        glDeleteLists(lista, 1)
+    if listaNormais is not None:
+        glDeleteLists(listaNormais, 1)
+    listasObjeto = {}
+    listaNormais = None
+
+def compilarListas(modo, nivel=0):
+    """(Re)compila a lista do nível `nivel` para o modo de polígono `modo`."""
+    lista = listasObjeto[nivel][0] if nivel in listasObjeto else glGenLists(1)
+    glNewList(lista, GL_COMPILE)
+    estadoModo(modo)
+    desenharMalha(nivel)
+    glEndList()
+    listasObjeto[nivel] = (lista, modo)
+
+def compilarListaNormais():
+    """Compila a lista da sobreposição de normais (uma vez por modelo)."""
+    global listaNormais
+    listaNormais = glGenLists(1)
+    glNewList(listaNormais, GL_COMPILE)
+    glDisable(GL_LIGHTING)
+    glColor3f(0.0, 0.3, 1.0)
+    desenharNormais()
+    glEnable(GL_LIGHTING)
+    glEndList()
 
+def estadoModo(modo):
+    """Iluminação e cor do modelo para o modo de polígono: sólido iluminado ou linhas/pontos verdes."""
     if modo == GL_FILL:
         glEnable(GL_LIGHTING)
         glColor3f(1.0, 1.0, 1.0)
@@ -82,39 +249,76 @@ def desenharObjeto():
         glDisable(GL_LIGHTING)
         glColor3f(0.0, 1.0, 0.0)
 
+# Renderização do modelo
+def desenharObjeto():
+    """Renderiza o modelo carregado (no nível de detalhe atual), usando normais por face ou vértice.
+    Com recorte ligado e buffer objects, só as faixas de triângulos que podem aparecer são enviadas."""
+    global recorte
+    modo = glGetIntegerv(GL_POLYGON_MODE)[0]
+    malha = niveisGL[nivelAtual] if niveisGL else None
+    recorte = None
+    if visibilidade.modoRecorte != 'nenhum' and malha is not None:
+        inicio = time.perf_counter()
+        primeiros, contagens, recorte = recortar(bvhNiveis[nivelAtual])
+        total = bvhNiveis[nivelAtual]['n']
+        recorte.update(triangulos=int(contagens.sum()), total=total, faixas=len(primeiros),
+                       ms=(time.perf_counter() - inicio) * 1000.0)
+    if recorte is not None and recorte['triangulos'] < total:
+        estadoModo(modo)
+        desenhar_faixas_gl(malha, primeiros * 3, contagens * 3)
+    else:
+        # sem recorte, ou com o modelo todo visível: a display list do nível inteiro
+        if listasObjeto.get(nivelAtual, (None, None))[1] != modo:
+            compilarListas(modo, nivelAtual)
+        glCallList(listasObjeto[nivelAtual][0])
+    # Desenho opcional das normais (segmentos montados uma vez por modelo, numa display list)
+    if mostrarNormais:
+        if listaNormais is None:
+            compilarListaNormais()
+        glCallList(listaNormais)
+
+def desenharMalha(nivel=0):
+    """Emite os triângulos do modelo: buffer objects, ou glBegin/glEnd em contextos sem eles."""
+    if niveisGL and niveisGL[nivel] is not None:
+        desenhar_malha_gl(niveisGL[nivel])
+        return
+
+    if nivel > 0:
+        posicoes, normaisVertices, indices = malhaIndexada(nivel)
+        glBegin(GL_TRIANGLES)
+        for i in indices.ravel():
+            glNormal3fv(normaisVertices[i])
+            glVertex3fv(posicoes[i])
+        glEnd()
+        return
+
     glBegin(GL_TRIANGLES)
-    for (faceVertices, faceNormais), normalCache in zip(faces, normaisFaceCache):
-        temNormais = any(n is not None for n in faceNormais)
+    for faceVertices, faceNormais, normalCache in zip(faces, facesNormais, normaisFaceCache):
+        temNormais = faceNormais.max() >= 0
 
         # Usa a normal da cache se não houver normal associada
-        if not temNormais and normalCache is not None:
+        if not temNormais:
             glNormal3fv(normalCache)
 
         for vIdx, nIdx in zip(faceVertices, faceNormais):
-            if temNormais and nIdx is not None and nIdx < len(normais):
+            if temNormais and 0 <= nIdx < len(normais):
                 glNormal3fv(normais[nIdx])
             glVertex3fv(vertices[vIdx])
     glEnd()
 
-    # Desenho opcional das normais
-    if mostrarNormais:
-        glDisable(GL_LIGHTING)
-        glColor3f(0.0, 0.3, 1.0)
-        glBegin(GL_LINES)
-        for (faceVertices, faceNormais), normalCache in zip(faces, normaisFaceCache):
-            for vIdx, nIdx in zip(faceVertices, faceNormais):
-                v = np.array(vertices[vIdx])
-                if nIdx is not None and nIdx < len(normais):
-                    n = np.array(normais[nIdx])
-                elif normalCache is not None:
-                    n = normalCache
-                else:
-                    v1, v2, v3 = [np.array(vertices[i]) for i in faceVertices[:3]]
-                    n = normalFace(v1, v2, v3)
-                glVertex3fv(v)
-                glVertex3fv(v + n * 0.2)
-        glEnd()
-        glEnable(GL_LIGHTING)
+def desenharNormais():
+    """Emite os segmentos da sobreposição de normais (montados uma vez em enviarObjetoGL) numa só chamada."""
+    global linhasNormais
+    if normaisGL is not None:
+        desenhar_malha_gl(normaisGL, GL_LINES)
+        return
+
+    if linhasNormais is None:
+        linhasNormais = segmentosNormais(*malhaIndexada(0)[:2])
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, linhasNormais)
+    glDrawArrays(GL_LINES, 0, len(linhasNormais))
+    glDisableClientState(GL_VERTEX_ARRAY)
 
 # HUD
 def desenhaTexto(x, y, texto, r=0.0, g=1.0, b=1.0):
@@ -144,12 +348,51 @@ def desenhaTexto(x, y, texto, r=0.0, g=1.0, b=1.0):
     if depthEnabled:
         glEnable(GL_DEPTH_TEST)
 
+def desenhaBarra(x, y, largura, altura, fracao):
+    """Barra de progresso do HUD: moldura e preenchimento até `fracao` (0 a 1)."""
+    glDisable(GL_DEPTH_TEST)
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    gluOrtho2D(0, windowWidth, 0, windowHeight)
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+
+    glPushAttrib(GL_POLYGON_BIT)
+    glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+    glColor3f(0.0, 0.6, 0.0)
+    glRectf(x, y, x + largura * min(max(fracao, 0.0), 1.0), y + altura)
+    glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
+    glColor3f(0.0, 1.0, 0.0)
+    glRectf(x, y, x + largura, y + altura)
+    glPopAttrib()
+
+    glPopMatrix()
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    glEnable(GL_DEPTH_TEST)
+
 # Câmera e exibição
 cameraPos = [0.0, 5.0, 5.0]
 altVisao = 0.0
 
-def display():
-    global rotation
+def escolherNivel():
+    """Nível de detalhe para a câmera e a rotação atuais (ou o forçado pela tecla 'l')."""
+    if nivelForcado is not None:
+        return min(nivelForcado, len(niveis) - 1)
+    if len(niveis) < 2:
+        return 0
+    return nivel_para_camera([len(f) for _, f in niveis], limitesModelo, cameraPos, rotation, windowHeight,
+                             atual=nivelAtual)
+
+def desenharCena():
+    """Limpa a tela e desenha o modelo com a câmera e a rotação atuais (sem HUD). Enquanto o modelo não
+    fica pronto, desenha a malha parcial."""
+    global nivelAtual
+    if carga is None:
+        nivelAtual = escolherNivel()
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
 
@@ -160,17 +403,57 @@ def display():
     glLightfv(GL_LIGHT0, GL_POSITION, [0.0, 10.0, 10.0, 1.0])
 
     glRotatef(rotation, 0, 1, 0)
-    desenharObjeto()
-    rotation = (rotation + 0.3) % 360
+    if carga is None:
+        desenharObjeto()
+    else:
+        desenharPrevia()
+
+def display():
+    global rotation
+    dt = cadencia.passo()
+    if girar:
+        rotation = (rotation + VELOCIDADE_ROTACAO * dt) % 360
+    receberCarga()
+    desenharCena()
 
     glDisable(GL_LIGHTING)
-    desenhaTexto(10, 10, f"Vértices: {len(vertices)} | Polígonos: {len(faces)}", 0.0, 1.0, 0.0)
+    if carga is not None:
+        desenhaHUDCarga()
+    else:
+        desenhaHUD()
     glEnable(GL_LIGHTING)
 
     glutSwapBuffers()
+    cadencia.fim_quadro_glut(girar or carregando(carga))
+
+def desenhaHUD():
+    desenhaTexto(10, 10, f"Vértices: {len(vertices)} | Polígonos: {len(faces)}", 0.0, 1.0, 0.0)
+    if len(niveis) > 1:
+        modoLOD = 'auto' if nivelForcado is None else 'fixo'
+        desenhaTexto(10, 28, f"LOD ({modoLOD}): nível {nivelAtual}/{len(niveis) - 1} | "
+                             f"{len(niveis[nivelAtual][1])} triângulos | l: trocar", 0.0, 1.0, 0.0)
+    if recorte is not None:
+        desenhaTexto(10, 46, f"Recorte ({visibilidade.modoRecorte}): {recorte['triangulos']}/{recorte['total']} "
+                             f"triângulos ({100.0 * recorte['triangulos'] / max(recorte['total'], 1):.0f}%) | "
+                             f"{recorte['faixas']} faixas | {recorte['nos']} nós | {recorte['ms']:.2f} ms | "
+                             f"c: trocar", 0.0, 1.0, 0.0)
+
+def desenhaHUDCarga():
+    """Progresso do carregamento (ou o aviso de cancelado) e o tamanho da malha parcial."""
+    if carregando(carga):
+        fracao = progresso(carga)
+        texto = ("Preparando o modelo..." if carga['fase'] == 'preparando' else
+                 f"Carregando {100.0 * fracao:.0f}%...") + " | ESC: cancelar"
+        desenhaBarra(10, 46, 200, 12, fracao)
+    else:
+        texto = f"Carregamento cancelado ({100.0 * progresso(carga):.0f}% lido)"
+    desenhaTexto(10, 28, texto, 0.0, 1.0, 0.0)
+    desenhaTexto(10, 10, f"Triângulos recebidos: {triangulosPrevia}", 0.0, 1.0, 0.0)
 
 def redimensionar(w, h):
+    global windowWidth, windowHeight
     h = max(h, 1)
+    windowWidth, windowHeight = w, h
     glViewport(0, 0, w, h)
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
@@ -207,10 +490,13 @@ def inicializar():
 
 # Entrada do teclado
 def teclado(key, x, y):
-    global cameraPos, mostrarNormais
+    global cameraPos, mostrarNormais, girar, nivelForcado
     step = 1
 
-    if key == b'q':
+    if key == b'\x1b':
+        if carregando(carga):
+            cancelar(carga)
+    elif key == b'q':
         cameraPos[1] += step
     elif key == b'e':
         cameraPos[1] -= step
@@ -222,7 +508,16 @@ def teclado(key, x, y):
                       GL_FILL)
     elif key == b'n':
         mostrarNormais = not mostrarNormais
-
+    elif key == b'r':
+        girar = not girar
+    elif key == b'l' and carga is None and len(niveis) > 1:
+        nivelForcado = 0 if nivelForcado is None else nivelForcado + 1
+        if nivelForcado >= len(niveis):
+            nivelForcado = None
+    elif key == b'c':
+        modos = visibilidade.MODOS
+        visibilidade.modoRecorte = modos[(modos.index(visibilidade.modoRecorte) + 1) % len(modos)]
+    glutPostRedisplay()
 
 def specialKeys(key, x, y):
     global cameraPos, altVisao
@@ -239,21 +534,35 @@ def specialKeys(key, x, y):
 
 # Execução principal
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python visualizadorObj.py modelo.obj")
+    global carga
+    try:
+        args = opcoes_indexacao(opcoes_normais(opcoes_visibilidade(opcoes_lod(cadencia.opcoes_cadencia(opcoes_gl(opcoes_cache(sys.argv)))))))
+    except ValueError as e:
+        print(f"Erro: {e}.")
+        sys.exit(1)
+    if len(args) < 2:
+        print("Uso: python visualizadorObj.py [--no-cache] [--rebuild-cache] [--no-vbo] [--fps=N] [--no-vsync] [--sob-demanda] [--no-lod] [--lod=F1,F2,...] [--recorte=nenhum|frustum|completo] [--dobra=GRAUS] [--normais-planas] [--soldar=EPS] modelo.obj")
         sys.exit(1)
 
-    caminhoObj = sys.argv[1]
-    carregarObjeto(caminhoObj)
+    caminhoObj = args[1]
+    lod = simplificacao.usarLOD
 
-    glutInit(sys.argv)
+    glutInit(args)
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGBA | GLUT_DEPTH)
     glutInitWindowSize(windowWidth, windowHeight)
     glutCreateWindow(b"Visualizador .OBJ [mvfm]")
 
     inicializar()
+    cadencia.ativar_vsync_glut()
+    # a janela já responde enquanto o modelo é lido em segundo plano
+    try:
+        carga = iniciar_carregamento(caminhoObj, lambda ler: prepararObjeto(caminhoObj, lod, ler),
+                                     parametrosObjeto(lod))
+    except OSError as e:
+        print(f"Erro: {e}.")
+        sys.exit(1)
+    # sem glutIdleFunc: o próximo quadro é agendado pelo próprio display (cadencia.py)
     glutDisplayFunc(display)
-    glutIdleFunc(display)
     glutReshapeFunc(redimensionar)
     glutKeyboardFunc(teclado)
     glutSpecialFunc(specialKeys)
@@ -1,52 +1,186 @@
 # visualizador3DGLFW.py
 # [mvfm] - Visualizador de modelos .OBJ com PyOpenGL + GLFW
-# Criado : 06/11/2025  ||  Última vez Alterado :  11/11/2025
+# Criado : 06/11/2025  ||  Última vez Alterado :  17/10/2026
+#
+# Teclas:
+#    q/e - subir/descer câmera
+#    setas - afastar/aproximar, inclinar visão
+#    w - alterna sólido / wireframe / pontos
+#    r - pausar/retomar a rotação
+#    l - nível de detalhe: automático -> 0 -> 1 -> ... -> automático (nível atual no título da janela)
+#    ESC - cancelar o carregamento (a parte já lida continua na tela) / sair
+#
+# A janela abre antes de o modelo ser lido: a leitura roda em segundo plano (carregamento_progressivo.py),
+# a malha vai aparecendo por blocos e o progresso fica no título da janela.
 
 import glfw
 from OpenGL.GL import *
 from OpenGL.GLU import *
+import functools
 import sys
 
+from cache_malha import carregar_malha, opcoes_cache
+from carregamento_progressivo import iniciar_carregamento, cancelar, carregando, progresso, blocos_prontos
+from carregador_obj import ler_obj
+from malha_gl import criar_malha_gl, desenhar_malha_gl, apagar_malha_gl, opcoes_gl
+from indexacao import indexar, com_solda, parametros_indexacao, opcoes_indexacao
+from normais_suaves import com_normais, parametros_normais, normais_dos_niveis, opcoes_normais
+from simplificacao import opcoes_lod, preparar_lod, parametros_lod, niveis_da_malha, nivel_para_camera
+import simplificacao
+import cadencia
+
 # Variáveis globais
 window_width, window_height = 800, 600
 rotation = 0.0
+girar = True               # alterna com tecla R
+VELOCIDADE_ROTACAO = 18.0  # graus por segundo
 vertices = []
 faces = []
+malha_gl = None  # modelo em VBO/IBO (malha_gl.py); None -> desenho imediato
+
+# níveis de detalhe (simplificacao.py): lista de (vertices, faces), o nível 0 é o modelo completo
+niveis = []
+niveis_indexados = []  # (posicoes, normais, indices) de cada nível, um vértice por par (v, vn) (indexar)
+niveis_gl = []
+limites_modelo = None
+nivel_atual = 0
+nivel_forcado = None  # tecla L; None -> escolhido pela distância da câmera
+
+# carregamento em segundo plano (carregamento_progressivo.py) e os blocos da malha parcial já recebidos
+carga = None
+previa_gl = []  # buffer objects, ou (posicoes, normais) para desenhar com vertex arrays
+triangulos_previa = 0
+falha_carga = False  # a leitura falhou: a janela fecha e o programa sai com erro
 
 cameraPos = [0.0, 5.0, 5.0]
 altVisao = 0.0
 modo = GL_FILL  # modo de desenho (sólido / wireframe / pontos)
 
 
-def carregar_objeto(caminho):
-    """Lê um arquivo .obj e extrai vértices e faces simples (sem materiais/texturas)."""
-    global vertices, faces
-    with open(caminho, 'r') as f:
-        for linha in f:
-            if linha.startswith('v '):
-                _, x, y, z = linha.strip().split()
-                vertices.append((float(x), float(y), float(z)))
-            elif linha.startswith('f '):
-                partes = linha.strip().split()[1:]
-                face = [int(p.split('/')[0]) - 1 for p in partes]
-                faces.append(face)
+def parametros_objeto(lod=False):
+    """Parâmetros do preparo do modelo, para a chave do cache_malha."""
+    return {**(parametros_lod() if lod else {}), **parametros_indexacao(), **parametros_normais()}
+
+
+def carregar_objeto(caminho, lod=False, ler=ler_obj):
+    """Lê um arquivo .obj e extrai vértices, faces e normais (sem materiais/texturas); faces sem 'vn'
+    ganham normais suaves (normais_suaves.py). Com lod=True também monta (ou lê do cache) os níveis de
+    detalhe simplificados. `ler` troca a leitura do arquivo (ex.: pelos blocos já lidos)."""
+    global vertices, faces, niveis, niveis_indexados, limites_modelo, nivel_atual
+    preparar = functools.partial(preparar_lod, ler=ler) if lod else ler
+    obj = carregar_malha(caminho, com_normais(com_solda(preparar)), parametros_objeto(lod))
+    vertices = obj['vertices']
+    faces = obj['faces']  # já trianguladas
+    niveis = niveis_da_malha(obj)
+    niveis_indexados = [indexar_nivel(v, f, n) for (v, f), n in zip(niveis, normais_dos_niveis(obj))]
+    limites_modelo = obj['limites']
+    nivel_atual = 0
+
+
+def indexar_nivel(v, f, normais_nivel):
+    """(posicoes, normais, indices) de um nível; sem normais em todos os cantos, só as posições."""
+    if normais_nivel is None or (normais_nivel[1] < 0).any():
+        return v, None, f
+    posicoes, normais, _, indices = indexar(v, f, *normais_nivel)
+    return posicoes, normais, indices
+
+
+def enviar_objeto_gl():
+    """Envia vértices, normais e índices do modelo para buffer objects (precisa de contexto OpenGL ativo)."""
+    global malha_gl, niveis_gl
+    malha_gl = criar_malha_gl(*niveis_indexados[0])
+    niveis_gl = [malha_gl] + [criar_malha_gl(*nivel) if malha_gl is not None else None
+                              for nivel in niveis_indexados[1:]]
+
+
+def receber_carga():
+    """Envia para a placa os blocos que chegaram desde o último quadro; com o carregamento pronto, troca a
+    malha parcial pelo modelo completo. Se a leitura falhou, mostra o erro e pede o fechamento da janela."""
+    global carga, previa_gl, triangulos_previa, falha_carga
+    if carga is None:
+        return
+    for posicoes, normais in blocos_prontos(carga):
+        previa_gl.append(criar_malha_gl(posicoes, normais) or (posicoes, normais))
+        triangulos_previa += len(posicoes) // 3
+    if carga['fase'] == 'erro':
+        print(f"Erro: {carga['erro']}.")
+        falha_carga = True
+        carga = None
+        glfw.set_window_should_close(glfw.get_current_context(), True)
+        return
+    if carga['fase'] == 'pronto':
+        enviar_objeto_gl()
+        for bloco in previa_gl:
+            if isinstance(bloco, dict):
+                apagar_malha_gl(bloco)
+        previa_gl = []
+        carga = None
+
+
+def desenhar_previa():
+    """Desenha os blocos já recebidos da malha parcial (triângulos soltos, um vértice por canto)."""
+    if modo == GL_FILL:
+        glEnable(GL_LIGHTING)
+    else:
+        glDisable(GL_LIGHTING)
+    for bloco in previa_gl:
+        if isinstance(bloco, dict):
+            desenhar_malha_gl(bloco)
+            continue
+        posicoes, normais = bloco
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, posicoes)
+        glNormalPointer(GL_FLOAT, 0, normais)
+        glDrawArrays(GL_TRIANGLES, 0, len(posicoes))
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
 
 
 def desenhar_objeto():
-    """Renderiza o modelo carregado."""
+    """Renderiza o modelo carregado, no nível de detalhe atual."""
+    v, n, f = niveis_indexados[nivel_atual]
+    # sem normais (--normais-planas num modelo sem 'vn') o modelo fica sem iluminação, como antes
+    if modo == GL_FILL and n is not None:
+        glEnable(GL_LIGHTING)
+    else:
+        glDisable(GL_LIGHTING)
+    if niveis_gl and niveis_gl[nivel_atual] is not None:
+        desenhar_malha_gl(niveis_gl[nivel_atual])
+        return
     glBegin(GL_TRIANGLES)
-    for face in faces:
+    for face in f:
         for vert_idx in face:
-            glVertex3fv(vertices[vert_idx])
+            if n is not None:
+                glNormal3fv(n[vert_idx])
+            glVertex3fv(v[vert_idx])
     glEnd()
 
 
+def escolher_nivel():
+    """Nível de detalhe para a câmera e a rotação atuais (ou o forçado pela tecla L)."""
+    if nivel_forcado is not None:
+        return min(nivel_forcado, len(niveis) - 1)
+    if len(niveis) < 2:
+        return 0
+    return nivel_para_camera([len(f) for _, f in niveis], limites_modelo, cameraPos, rotation, window_height,
+                             atual=nivel_atual)
+
+
 def inicializar():
     """Configurações básicas de OpenGL."""
     glEnable(GL_DEPTH_TEST)
+    glEnable(GL_NORMALIZE)
     glShadeModel(GL_SMOOTH)
     glClearColor(0.1, 0.1, 0.1, 1.0)
 
+    glEnable(GL_LIGHT0)
+    glLightfv(GL_LIGHT0, GL_DIFFUSE, [0.9, 0.9, 0.9, 1.0])
+    glLightfv(GL_LIGHT0, GL_AMBIENT, [0.3, 0.3, 0.3, 1.0])
+    glLightfv(GL_LIGHT0, GL_POSITION, [5.0, 10.0, 5.0, 1.0])  # fixa em relação à câmera
+    glEnable(GL_COLOR_MATERIAL)
+    glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
+
 
 def redimensionar(w, h):
     if h == 0:
@@ -58,10 +192,11 @@ def redimensionar(w, h):
     glMatrixMode(GL_MODELVIEW)
 
 
-def display():
-    """Desenha a cena."""
-    global rotation, cameraPos, altVisao, modo
-
+def desenhar_cena():
+    """Desenha a cena com a câmera e a rotação atuais (a malha parcial enquanto o modelo não fica pronto)."""
+    global nivel_atual
+    if carga is None:
+        nivel_atual = escolher_nivel()
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
 
@@ -72,19 +207,33 @@ def display():
 
     glRotatef(rotation, 0, 1, 0)
     glPolygonMode(GL_FRONT_AND_BACK, modo)
-    desenhar_objeto()
+    if carga is None:
+        desenhar_objeto()
+    else:
+        desenhar_previa()
+
 
-    rotation += 0.3
+def display():
+    """Avança a rotação pelo tempo decorrido e desenha a cena."""
+    global rotation
+    dt = cadencia.passo()
+    if girar:
+        rotation = (rotation + VELOCIDADE_ROTACAO * dt) % 360
+    receber_carga()
+    desenhar_cena()
 
 
 # Input de teclado GLFW
 def key_callback(window, key, scancode, action, mods):
-    global cameraPos, altVisao, modo
+    global cameraPos, altVisao, modo, girar, nivel_forcado
 
     if action == glfw.PRESS or action == glfw.REPEAT:
         step = 0.3
-        if key == glfw.KEY_ESCAPE:
-            glfw.set_window_should_close(window, True)
+        if key == glfw.KEY_ESCAPE and action == glfw.PRESS:
+            if carregando(carga):
+                cancelar(carga)
+            else:
+                glfw.set_window_should_close(window, True)
 
         # Câmera
         elif key == glfw.KEY_Q:
@@ -109,14 +258,43 @@ def key_callback(window, key, scancode, action, mods):
             else:
                 modo = GL_FILL
 
+        elif key == glfw.KEY_R and action == glfw.PRESS:
+            girar = not girar
+
+        elif key == glfw.KEY_L and action == glfw.PRESS and carga is None and len(niveis) > 1:
+            nivel_forcado = 0 if nivel_forcado is None else nivel_forcado + 1
+            if nivel_forcado >= len(niveis):
+                nivel_forcado = None
+
+
+def titulo_janela():
+    """Título com o progresso do carregamento ou, com o modelo pronto, o nível de detalhe."""
+    if carga is not None:
+        if carregando(carga):
+            estado = ("preparando o modelo" if carga['fase'] == 'preparando' else
+                      f"carregando {100.0 * progresso(carga):.0f}%") + " (ESC: cancelar)"
+        else:
+            estado = f"carregamento cancelado ({100.0 * progresso(carga):.0f}% lido)"
+        return f"Visualizador .OBJ [mvfm] - {estado}, {triangulos_previa} triângulos"
+    if len(niveis) > 1:
+        return (f"Visualizador .OBJ [mvfm] - LOD {'auto' if nivel_forcado is None else 'fixo'}: "
+                f"nível {nivel_atual}/{len(niveis) - 1}, {len(niveis[nivel_atual][1])} triângulos")
+    return "Visualizador .OBJ [mvfm]"
+
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python visualizador_obj_glfw.py modelo.obj")
+    global carga
+    try:
+        args = opcoes_indexacao(opcoes_normais(opcoes_lod(cadencia.opcoes_cadencia(opcoes_gl(opcoes_cache(sys.argv))))))
+    except ValueError as e:
+        print(f"Erro: {e}.")
+        sys.exit(1)
+    if len(args) < 2:
+        print("Uso: python visualizador_obj_glfw.py [--no-cache] [--rebuild-cache] [--no-vbo] [--fps=N] [--no-vsync] [--sob-demanda] [--no-lod] [--lod=F1,F2,...] [--dobra=GRAUS] [--normais-planas] [--soldar=EPS] modelo.obj")
         sys.exit(1)
 
-    caminho_obj = sys.argv[1]
-    carregar_objeto(caminho_obj)
+    caminho_obj = args[1]
+    lod = simplificacao.usarLOD
 
     if not glfw.init():
         print("Falha ao inicializar o GLFW")
@@ -129,18 +307,36 @@ def main():
         sys.exit(1)
 
     glfw.make_context_current(window)
+    cadencia.ativar_vsync_glfw()
     glfw.set_key_callback(window, key_callback)
 
     inicializar()
     redimensionar(window_width, window_height)
+    # a janela já responde enquanto o modelo é lido em segundo plano
+    try:
+        carga = iniciar_carregamento(caminho_obj, lambda ler: carregar_objeto(caminho_obj, lod, ler),
+                                     parametros_objeto(lod))
+    except OSError as e:
+        glfw.terminate()
+        print(f"Erro: {e}.")
+        sys.exit(1)
 
     # Loop principal
+    titulo = None
     while not glfw.window_should_close(window):
         display()
         glfw.swap_buffers(window)
-        glfw.poll_events()
+
+        # sem texto na janela GLFW: o progresso e o nível de detalhe vão para o título
+        texto = titulo_janela()
+        if texto != titulo:
+            titulo = texto
+            glfw.set_window_title(window, titulo)
+        cadencia.esperar_eventos_glfw(girar or carregando(carga))
 
     glfw.terminate()
+    if falha_carga:
+        sys.exit(1)
 
 
 if __name__ == "__main__":